@@ -0,0 +1,27 @@
+"""Add contracts counterparty index
+
+Revision ID: 0ae9b84d444f
+Revises: b990435cf99b
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0ae9b84d444f'
+down_revision: Union[str, None] = 'b990435cf99b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Contract status lookup: active contracts of a counterparty, newest first
+    op.create_index('ix_contracts_counterparty_active_date', 'contracts',
+                    ['counterparty_id', 'is_active', 'contract_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contracts_counterparty_active_date', table_name='contracts')
@@ -0,0 +1,72 @@
+"""Add dictionary audit log
+
+Revision ID: 200fb15d09fc
+Revises: 591333d2d212
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '200fb15d09fc'
+down_revision: Union[str, None] = '591333d2d212'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created up front; later months are added by the application
+INITIAL_PARTITION_MONTHS = 3
+
+
+def upgrade() -> None:
+    op.create_table(
+        'dictionary_audit_log',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('dictionary_type', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.String(length=64), nullable=False),
+        sa.Column('entity_name', sa.String(length=255), nullable=True),
+        sa.Column('action', sa.String(length=16), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('changes', postgresql.JSONB(), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    # Indexes on the parent are created on every partition
+    op.create_index(
+        'ix_dictionary_audit_log_entity', 'dictionary_audit_log',
+        ['dictionary_type', 'entity_id', 'created_at']
+    )
+    op.create_index(
+        'ix_dictionary_audit_log_type_created', 'dictionary_audit_log',
+        ['dictionary_type', 'created_at']
+    )
+
+    month = date.today().replace(day=1)
+    for _ in range(INITIAL_PARTITION_MONTHS):
+        next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS dictionary_audit_log_{month:%Y_%m} PARTITION OF dictionary_audit_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    op.create_table(
+        'dictionary_audit_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('dictionary_type', sa.String(length=32), nullable=False),
+        sa.Column('action', sa.String(length=16), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('action_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'dictionary_type', 'action', 'user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dictionary_audit_daily')
+    # Dropping the parent drops its partitions
+    op.drop_table('dictionary_audit_log')
@@ -0,0 +1,45 @@
+"""Add counterparty lookup indexes
+
+Revision ID: 591333d2d212
+Revises: e5c51ba9b5ca
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '591333d2d212'
+down_revision: Union[str, None] = 'e5c51ba9b5ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Substring search on BIN/IIN; the name trigram index already exists
+    op.create_index(
+        'ix_counterparties_tax_id_trgm', 'counterparties', ['tax_id'],
+        postgresql_using='gin', postgresql_ops={'tax_id': 'gin_trgm_ops'}
+    )
+    # Exact and prefix BIN/IIN lookup (tax_id LIKE '1234%')
+    op.create_index(
+        'ix_counterparties_tax_id_prefix', 'counterparties', ['tax_id'],
+        postgresql_ops={'tax_id': 'varchar_pattern_ops'}
+    )
+    # Prefix suggestions for queries too short for trigrams
+    op.execute(
+        "CREATE INDEX ix_counterparties_lower_name_prefix ON counterparties (lower(name) text_pattern_ops)"
+    )
+    # Keyset pagination order
+    op.create_index('ix_counterparties_name_id', 'counterparties', ['name', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_counterparties_name_id', table_name='counterparties')
+    op.drop_index('ix_counterparties_lower_name_prefix', table_name='counterparties')
+    op.drop_index('ix_counterparties_tax_id_prefix', table_name='counterparties')
+    op.drop_index('ix_counterparties_tax_id_trgm', table_name='counterparties')
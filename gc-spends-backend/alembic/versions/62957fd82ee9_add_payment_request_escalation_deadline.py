@@ -0,0 +1,41 @@
+"""Add payment request escalation deadline
+
+Revision ID: 62957fd82ee9
+Revises: 7ff4c6098998
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '62957fd82ee9'
+down_revision: Union[str, None] = '7ff4c6098998'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # created_at + escalation time of the priority (see app.core.priority.ESCALATION_RULES);
+    # only HIGH, URGENT and CRITICAL requests are escalated
+    op.execute("""
+        ALTER TABLE payment_requests ADD COLUMN escalation_due_at timestamp
+        GENERATED ALWAYS AS (
+            CASE priority
+                WHEN 'critical' THEN created_at + interval '15 minutes'
+                WHEN 'urgent' THEN created_at + interval '60 minutes'
+                WHEN 'high' THEN created_at + interval '240 minutes'
+            END
+        ) STORED
+    """)
+    op.add_column('payment_requests', sa.Column('escalated_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_payment_requests_escalation_due_at', 'payment_requests', ['escalation_due_at'],
+                    postgresql_where=sa.text('escalation_due_at IS NOT NULL AND deleted = false'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_requests_escalation_due_at', table_name='payment_requests')
+    op.drop_column('payment_requests', 'escalated_at')
+    op.drop_column('payment_requests', 'escalation_due_at')
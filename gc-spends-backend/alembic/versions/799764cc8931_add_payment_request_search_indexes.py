@@ -0,0 +1,50 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 799764cc8931
+Revises: 948374cbd3fb
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '799764cc8931'
+down_revision: Union[str, None] = '948374cbd3fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Russian stemming for free text, 'simple' config keeps numbers and codes verbatim
+    op.execute("""
+        ALTER TABLE payment_requests ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(number, '') || ' ' || coalesce(doc_number, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(title, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(product_service, '') || ' ' || coalesce(expense_article_text, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(product_service, '') || ' ' || coalesce(expense_article_text, '')), 'D')
+        ) STORED
+    """)
+    op.create_index(
+        'ix_payment_requests_search_vector', 'payment_requests', ['search_vector'],
+        postgresql_using='gin'
+    )
+    # Requests of counterparties matched by name are looked up by counterparty_id
+    op.create_index('ix_payment_requests_counterparty_id', 'payment_requests', ['counterparty_id'])
+    op.create_index(
+        'ix_counterparties_name_trgm', 'counterparties', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_counterparties_name_trgm', table_name='counterparties')
+    op.drop_index('ix_payment_requests_counterparty_id', table_name='payment_requests')
+    op.drop_index('ix_payment_requests_search_vector', table_name='payment_requests')
+    op.drop_column('payment_requests', 'search_vector')
@@ -0,0 +1,34 @@
+"""Add scheduled_job_state and payment_requests.due_date index
+
+Revision ID: 7ff4c6098998
+Revises: 799764cc8931
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7ff4c6098998'
+down_revision: Union[str, None] = '799764cc8931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduled_job_state',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Incremental priority re-scoring selects requests by due date windows
+    op.create_index('ix_payment_requests_due_date', 'payment_requests', ['due_date'],
+                    postgresql_where=sa.text('deleted = false'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_requests_due_date', table_name='payment_requests')
+    op.drop_table('scheduled_job_state')
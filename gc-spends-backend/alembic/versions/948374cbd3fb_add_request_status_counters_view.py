@@ -0,0 +1,61 @@
+"""Add request_status_counters materialized view
+
+Revision ID: 948374cbd3fb
+Revises: 6c7ca75a1298
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '948374cbd3fb'
+down_revision: Union[str, None] = '6c7ca75a1298'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-status request counters for dashboards, one row per (scope, subject, status).
+    # Refreshed periodically by app.core.request_counters.refresh_request_status_counters
+    op.execute("""
+        CREATE MATERIALIZED VIEW request_status_counters AS
+        SELECT 'all'::varchar(32) AS scope,
+               NULL::uuid AS subject_id,
+               pr.status,
+               count(*) AS request_count,
+               coalesce(sum(pr.amount_total), 0) AS amount_total
+        FROM payment_requests pr
+        WHERE pr.deleted = false
+        GROUP BY pr.status
+        UNION ALL
+        SELECT 'creator', pr.created_by_user_id, pr.status, count(*), coalesce(sum(pr.amount_total), 0)
+        FROM payment_requests pr
+        WHERE pr.deleted = false
+        GROUP BY pr.created_by_user_id, pr.status
+        UNION ALL
+        SELECT 'registrar', pr.responsible_registrar_id, pr.status, count(*), coalesce(sum(pr.amount_total), 0)
+        FROM payment_requests pr
+        WHERE pr.deleted = false AND pr.responsible_registrar_id IS NOT NULL
+        GROUP BY pr.responsible_registrar_id, pr.status
+        UNION ALL
+        SELECT 'sub_registrar', sra.sub_registrar_id, pr.status, count(*), coalesce(sum(pr.amount_total), 0)
+        FROM payment_requests pr
+        JOIN (
+            SELECT DISTINCT request_id, sub_registrar_id FROM sub_registrar_assignments
+        ) sra ON sra.request_id = pr.id
+        WHERE pr.deleted = false
+        GROUP BY sra.sub_registrar_id, pr.status
+        WITH DATA
+    """)
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX ux_request_status_counters
+        ON request_status_counters (scope, subject_id, status)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS request_status_counters")
@@ -0,0 +1,43 @@
+"""Add dictionary integrity runs
+
+Revision ID: a33f90fc5000
+Revises: 200fb15d09fc
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a33f90fc5000'
+down_revision: Union[str, None] = '200fb15d09fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'dictionary_integrity_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('dictionary_type', sa.String(length=32), nullable=False),
+        sa.Column('trigger', sa.String(length=16), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=False),
+        sa.Column('duration_ms', sa.Integer(), nullable=False),
+        sa.Column('issue_count', sa.Integer(), nullable=False),
+        sa.Column('issues', postgresql.JSONB(), nullable=False),
+        sa.Column('checks', postgresql.JSONB(), nullable=False),
+    )
+    # Latest run per dictionary
+    op.create_index(
+        'ix_dictionary_integrity_runs_type_started', 'dictionary_integrity_runs',
+        ['dictionary_type', 'started_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dictionary_integrity_runs_type_started', table_name='dictionary_integrity_runs')
+    op.drop_table('dictionary_integrity_runs')
@@ -0,0 +1,44 @@
+"""Add payment request work queue lease
+
+Revision ID: b990435cf99b
+Revises: 62957fd82ee9
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b990435cf99b'
+down_revision: Union[str, None] = '62957fd82ee9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payment_requests', sa.Column('claimed_by_user_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('payment_requests', sa.Column('claim_expires_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key('fk_payment_requests_claimed_by_user_id', 'payment_requests', 'users',
+                          ['claimed_by_user_id'], ['id'])
+    # Registrar queue order: highest score first, then earliest due date
+    op.execute("""
+        CREATE INDEX ix_payment_requests_registrar_queue
+        ON payment_requests (priority_score DESC NULLS LAST, due_date, id)
+        WHERE deleted = false AND distribution_status = 'pending'
+    """)
+    op.create_index('ix_payment_requests_claimed_by_user_id', 'payment_requests', ['claimed_by_user_id'],
+                    postgresql_where=sa.text('claimed_by_user_id IS NOT NULL'))
+    op.create_index('ix_sub_registrar_assignments_sub_registrar_id', 'sub_registrar_assignments',
+                    ['sub_registrar_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sub_registrar_assignments_sub_registrar_id', table_name='sub_registrar_assignments')
+    op.drop_index('ix_payment_requests_claimed_by_user_id', table_name='payment_requests')
+    op.drop_index('ix_payment_requests_registrar_queue', table_name='payment_requests')
+    op.drop_constraint('fk_payment_requests_claimed_by_user_id', 'payment_requests', type_='foreignkey')
+    op.drop_column('payment_requests', 'claim_expires_at')
+    op.drop_column('payment_requests', 'claimed_by_user_id')
@@ -0,0 +1,48 @@
+"""Add import jobs
+
+Revision ID: e5c51ba9b5ca
+Revises: 0ae9b84d444f
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c51ba9b5ca'
+down_revision: Union[str, None] = '0ae9b84d444f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('dictionary_type', sa.String(length=64), nullable=False),
+        sa.Column('mode', sa.String(length=16), server_default=sa.text("'skip'"), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=16), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('imported_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('error_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('errors', sa.JSON(), server_default=sa.text("'[]'"), nullable=False),
+        sa.Column('last_chunk', sa.Integer(), server_default=sa.text('-1'), nullable=False),
+        sa.Column('error_message', sa.String(length=2000), nullable=True),
+        sa.Column('created_by_user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_import_jobs_status', 'import_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+    op.drop_table('import_jobs')
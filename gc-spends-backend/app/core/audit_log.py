@@ -0,0 +1,333 @@
+# app/core/audit_log.py
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.db import SessionLocal
+from app.models import Counterparty, ExpenseArticle, VatRate, Currency, ExchangeRate, DictionaryAuditLog, DictionaryAuditDaily
+
+logger = logging.getLogger(__name__)
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+ACTION_IMPORT = "import"
+
+# Rollup rows need a non-null key; changes without a known user are counted here
+UNKNOWN_USER_ID = uuid.UUID(int=0)
+
+# Audited models: dictionary type and the attribute shown as the entry name
+AUDITED_MODELS: Dict[type, tuple] = {
+    Counterparty: ("counterparties", "name"),
+    ExpenseArticle: ("expense-articles", "name"),
+    VatRate: ("vat-rates", "name"),
+    Currency: ("currencies", "code"),
+    ExchangeRate: ("exchange-rates", "currency_code"),
+}
+# Bookkeeping columns left out of diffs
+IGNORED_FIELDS = {"created_at", "updated_at"}
+
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_SECONDS = 1.0
+AUDIT_QUEUE_SIZE = 50000
+AUDIT_WRITE_ATTEMPTS = 3
+PARTITION_MONTHS_AHEAD = 2
+PARTITION_CHECK_SECONDS = 6 * 3600
+
+_PENDING_KEY = "dictionary_audit_entries"
+
+# User behind the current request or job; set by the API middleware and import jobs
+current_actor: ContextVar[Optional[uuid.UUID]] = ContextVar("dictionary_audit_actor", default=None)
+
+
+@dataclass
+class AuditEntry:
+    dictionary_type: str
+    entity_id: str
+    entity_name: Optional[str]
+    action: str
+    user_id: Optional[uuid.UUID]
+    changes: Optional[Dict[str, Any]]
+    created_at: datetime
+
+
+@contextmanager
+def audit_actor(user_id: Optional[Any]) -> Iterator[None]:
+    """Attribute dictionary changes made inside the block to `user_id`."""
+    token = current_actor.set(_as_uuid(user_id))
+    try:
+        yield
+    finally:
+        current_actor.reset(token)
+
+
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _entity_id(values: Iterable[Any]) -> str:
+    return ":".join(str(value) for value in values)
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """{field: {"old", "new"}} for the fields whose value changed."""
+    return jsonable_encoder({
+        field: {"old": old.get(field), "new": new.get(field)}
+        for field in sorted(set(old) | set(new))
+        if field not in IGNORED_FIELDS and old.get(field) != new.get(field)
+    })
+
+
+def record_changes(session: Session, entries: List[AuditEntry]) -> None:
+    """Queue entries for writing once the session's transaction commits."""
+    session.info.setdefault(_PENDING_KEY, []).extend(entries)
+
+
+def record_bulk_changes(
+    session: Session,
+    model: type,
+    action: str,
+    rows: Iterable[Dict[str, Any]],
+    old_rows: Optional[Dict[tuple, Dict[str, Any]]] = None
+) -> None:
+    """
+    Audit rows written with Core statements, which the flush hook does not see.
+
+    `rows` are the written rows; `old_rows` maps primary key values to the rows
+    before an update, and rows that did not change are not recorded.
+    """
+    dictionary_type, name_field = AUDITED_MODELS[model]
+    key = [column.key for column in model.__table__.primary_key.columns]
+    user_id = current_actor.get()
+    now = datetime.utcnow()
+    entries = []
+    for row in rows:
+        key_values = tuple(row[column] for column in key)
+        changes = _diff((old_rows or {}).get(key_values, {}), row)
+        if old_rows is not None and not changes:
+            continue
+        entries.append(AuditEntry(
+            dictionary_type, _entity_id(key_values), row.get(name_field), action, user_id, changes, now
+        ))
+    record_changes(session, entries)
+
+
+def _state_values(state) -> Dict[str, Any]:
+    # Only loaded attributes: reading expired ones would emit SQL inside the flush
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    entries = []
+    user_id = current_actor.get()
+    now = datetime.utcnow()
+    for objects, action in ((session.new, ACTION_CREATE), (session.dirty, ACTION_UPDATE), (session.deleted, ACTION_DELETE)):
+        for obj in objects:
+            audited = AUDITED_MODELS.get(type(obj))
+            if audited is None:
+                continue
+            dictionary_type, name_field = audited
+            state = inspect(obj)
+            values = _state_values(state)
+            if action == ACTION_CREATE:
+                changes = _diff({}, values)
+            elif action == ACTION_DELETE:
+                changes = _diff(values, {})
+            else:
+                old, new = {}, {}
+                for attr in state.mapper.column_attrs:
+                    history = state.attrs[attr.key].history
+                    if history.has_changes():
+                        old[attr.key] = history.deleted[0] if history.deleted else None
+                        new[attr.key] = history.added[0] if history.added else None
+                changes = _diff(old, new)
+                if not changes:
+                    continue
+            entries.append(AuditEntry(
+                dictionary_type,
+                _entity_id(state.mapper.primary_key_from_instance(obj)),
+                values.get(name_field),
+                action,
+                user_id,
+                changes,
+                now
+            ))
+    if entries:
+        record_changes(session, entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_changes(session: Session) -> None:
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        audit_writer.enqueue(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{DictionaryAuditLog.__tablename__}_{month:%Y_%m}"
+
+
+def ensure_audit_partitions(db: Session, months: Iterable[date]) -> None:
+    """Create the monthly partitions of dictionary_audit_log that do not exist yet."""
+    # Serialises workers creating the same partition
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('dictionary_audit_partitions'))"))
+    for month in sorted({_month_start(month) for month in months}):
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {DictionaryAuditLog.__tablename__} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        ))
+
+
+def create_upcoming_audit_partitions(db: Session) -> None:
+    """Scheduled job: keep partitions for this month and the next ones in place."""
+    month = _month_start(datetime.utcnow().date())
+    months = [month]
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        month = _next_month(month)
+        months.append(month)
+    ensure_audit_partitions(db, months)
+
+
+class AuditWriter:
+    """
+    Writes audit entries off the request path.
+
+    Committed entries go to a bounded queue; a daemon thread takes up to
+    AUDIT_BATCH_SIZE of them, or whatever arrived within AUDIT_FLUSH_SECONDS,
+    and writes them with one multi-row INSERT plus one upsert of the daily
+    rollups, in a single transaction. When the writer falls behind and the
+    queue is full, committing sessions wait for room instead of dropping entries.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_seconds: float = AUDIT_FLUSH_SECONDS, queue_size: int = AUDIT_QUEUE_SIZE):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[AuditEntry]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._partitions: Set[date] = set()
+
+    def enqueue(self, entries: Iterable[AuditEntry]) -> None:
+        self._ensure_thread()
+        for entry in entries:
+            self._queue.put(entry)
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written (or given up on)."""
+        self._queue.join()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dictionary-audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_with_retry(self, batch: List[AuditEntry]) -> None:
+        for attempt in range(1, AUDIT_WRITE_ATTEMPTS + 1):
+            try:
+                self.write(batch)
+                return
+            except Exception as e:
+                if attempt == AUDIT_WRITE_ATTEMPTS:
+                    logger.error(f"Dropped {len(batch)} dictionary audit entries: {e}")
+                else:
+                    logger.warning(f"Writing dictionary audit entries failed, retrying: {e}")
+                    time.sleep(attempt)
+
+    def write(self, batch: List[AuditEntry]) -> None:
+        db = SessionLocal()
+        try:
+            months = {_month_start(entry.created_at.date()) for entry in batch} - self._partitions
+            if months:
+                ensure_audit_partitions(db, months)
+                db.commit()
+                self._partitions |= months
+
+            db.execute(insert(DictionaryAuditLog), [
+                {
+                    "id": uuid.uuid4(),
+                    "created_at": entry.created_at,
+                    "dictionary_type": entry.dictionary_type,
+                    "entity_id": entry.entity_id,
+                    "entity_name": entry.entity_name[:255] if entry.entity_name else entry.entity_name,
+                    "action": entry.action,
+                    "user_id": entry.user_id,
+                    "changes": entry.changes,
+                }
+                for entry in batch
+            ])
+
+            rollups = Counter(
+                (entry.created_at.date(), entry.dictionary_type, entry.action, entry.user_id or UNKNOWN_USER_ID)
+                for entry in batch
+            )
+            upsert = pg_insert(DictionaryAuditDaily).values([
+                {"day": day, "dictionary_type": dictionary_type, "action": action, "user_id": user_id, "action_count": count}
+                for (day, dictionary_type, action, user_id), count in rollups.items()
+            ])
+            db.execute(upsert.on_conflict_do_update(
+                index_elements=["day", "dictionary_type", "action", "user_id"],
+                set_={"action_count": DictionaryAuditDaily.action_count + upsert.excluded.action_count}
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global instance
+audit_writer = AuditWriter()
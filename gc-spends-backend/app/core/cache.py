@@ -0,0 +1,156 @@
+# app/core/cache.py
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.monitoring import performance_metrics
+
+_PENDING_KEY = "cache_invalidate_namespaces"
+
+
+class TTLCache:
+    """
+    Small in-process cache for dashboard style reads.
+
+    Entries live in namespaces; invalidate(namespace) drops a whole namespace,
+    so writers do not need to know which keys readers used. Every invalidation
+    bumps the namespace generation, and a value loaded across a bump is
+    returned but not stored, so a slow loader cannot cache pre-write data.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Hashable, Tuple[float, Any]]] = {}
+        self._generations: Dict[str, int] = {}
+        self._clears = 0
+        self._lock = threading.Lock()
+
+    def _generation(self, namespace: str) -> Tuple[int, int]:
+        # Caller holds the lock
+        return self._clears, self._generations.get(namespace, 0)
+
+    def get_or_set(self, namespace: str, key: Hashable, ttl_seconds: float, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+            generation = self._generation(namespace)
+        if entry is not None and entry[0] > now:
+            performance_metrics.record_cache_operation(hit=True)
+            return entry[1]
+
+        performance_metrics.record_cache_operation(hit=False)
+        value = loader()
+        with self._lock:
+            if self._generation(namespace) == generation:
+                self._entries.setdefault(namespace, {})[key] = (now + ttl_seconds, value)
+        return value
+
+    def get_many_or_set(
+        self,
+        namespace: str,
+        keys: Iterable[Hashable],
+        ttl_seconds: float,
+        loader: Callable[[List[Hashable]], Dict[Hashable, Any]]
+    ) -> Dict[Hashable, Any]:
+        """
+        get_or_set for many keys at once.
+
+        The loader is called once, with only the keys that are missing or expired,
+        and returns a dict; keys it leaves out are not cached and not returned.
+        """
+        now = time.monotonic()
+        values: Dict[Hashable, Any] = {}
+        missing: List[Hashable] = []
+        with self._lock:
+            entries = self._entries.get(namespace, {})
+            generation = self._generation(namespace)
+            for key in keys:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    values[key] = entry[1]
+                elif key not in missing:
+                    missing.append(key)
+        for _ in values:
+            performance_metrics.record_cache_operation(hit=True)
+        for _ in missing:
+            performance_metrics.record_cache_operation(hit=False)
+
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                if self._generation(namespace) == generation:
+                    entries = self._entries.setdefault(namespace, {})
+                    for key, value in loaded.items():
+                        entries[key] = (now + ttl_seconds, value)
+            values.update(loaded)
+        return values
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._entries.pop(namespace, None)
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for listener in _invalidation_listeners:
+            listener(namespace)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._clears += 1
+
+
+# Called with the namespace after every invalidation, for state kept outside TTLCache
+_invalidation_listeners: List[Callable[[str], None]] = []
+
+
+def on_invalidate(listener: Callable[[str], None]) -> None:
+    _invalidation_listeners.append(listener)
+
+
+# Global instance
+cache = TTLCache()
+
+
+def invalidate_on_commit(session: Session, *namespaces: str) -> None:
+    """Invalidate namespaces once the session's transaction commits."""
+    session.info.setdefault(_PENDING_KEY, set()).update(namespaces)
+
+
+_watched: list = []
+
+
+def watch_model(model: type, *namespaces: str) -> None:
+    """Invalidate namespaces whenever a transaction that changed `model` rows commits."""
+    _watched.append((model, namespaces))
+
+
+def invalidate_model_on_commit(session: Session, model: type) -> None:
+    """
+    Invalidate the namespaces watching `model` once the transaction commits.
+
+    For Core bulk writes, which the ORM flush hooks below do not see.
+    """
+    for watched_model, namespaces in _watched:
+        if issubclass(model, watched_model):
+            invalidate_on_commit(session, *namespaces)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(session: Session, flush_context) -> None:
+    if not _watched:
+        return
+    changed = session.new | session.dirty | session.deleted
+    for model, namespaces in _watched:
+        if any(isinstance(obj, model) for obj in changed):
+            invalidate_on_commit(session, *namespaces)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    namespaces: Set[str] = session.info.pop(_PENDING_KEY, set())
+    for namespace in namespaces:
+        cache.invalidate(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
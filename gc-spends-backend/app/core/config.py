@@ -31,6 +31,24 @@ class Settings(BaseSettings):
     # logging
     log_level: str = "INFO"
 
+    # background jobs
+    scheduler_enabled: bool = True
+    request_counters_refresh_seconds: int = 30
+    priority_rescore_interval_seconds: int = 300
+    escalation_check_interval_seconds: int = 60
+    integrity_check_interval_seconds: int = 3600
+
+    # work queues
+    work_queue_lease_seconds: int = 900
+
+    # VAT rate applied to lines created when a request is classified
+    default_vat_rate: float = 0.12
+
+    # dictionary import jobs
+    import_upload_dir: str = "./storage/imports"
+    import_chunk_rows: int = 5000
+    import_workers: int = 2
+
     @field_validator("cors_origins", mode="before")
     @classmethod
     def parse_cors(cls, v: Union[str, List[str]]) -> List[str]:
@@ -0,0 +1,202 @@
+# app/core/dictionary_snapshot.py
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.cache import on_invalidate, watch_model
+from app.core.db import engine
+from app.core.request_stream import listen_for_notifications
+from app.models import Currency, VatRate, ExpenseArticle, Department, Role
+from app.modules.dictionaries.schemas import CurrencyOut, VatRateOut, ExpenseArticleOut
+from app.modules.users.schemas import DepartmentOut, RoleOut
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel telling other workers which dictionary changed
+CHANNEL = "dictionary_changes"
+NAMESPACE_PREFIX = "dictionary_snapshot:"
+# Safety net for changes made outside the application (manual SQL, other services)
+SNAPSHOT_MAX_AGE_SECONDS = 600
+
+# Identifies this process, so it ignores its own notifications
+_PROCESS_ID = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Snapshot:
+    """
+    Immutable copy of a dictionary table: rows in list order, lookup maps by id
+    and code, and the list pre-serialised to JSON. `version` grows every time
+    the dictionary is invalidated.
+    """
+
+    def __init__(self, version: int, items: Sequence[BaseModel], id_field: str, code_field: Optional[str], adapter: TypeAdapter):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.items: Tuple[BaseModel, ...] = tuple(items)
+        self.by_id: Mapping[Any, BaseModel] = MappingProxyType({getattr(item, id_field): item for item in self.items})
+        self.by_code: Mapping[str, BaseModel] = MappingProxyType(
+            {getattr(item, code_field): item for item in self.items} if code_field else {}
+        )
+        self._adapter = adapter
+        self._active = tuple(item for item in self.items if getattr(item, "is_active", True))
+        self._json = {False: adapter.dump_json(list(self.items)), True: adapter.dump_json(list(self._active))}
+
+    def rows(self, active_only: bool = False) -> Tuple[BaseModel, ...]:
+        return self._active if active_only else self.items
+
+    def json(self, active_only: bool = False) -> bytes:
+        """The list as the JSON body a list endpoint would return."""
+        return self._json[active_only]
+
+    def dump_json(self, items: Sequence[BaseModel]) -> bytes:
+        return self._adapter.dump_json(list(items))
+
+
+class _Dictionary:
+    def __init__(self, name: str, model: type, schema: type, order_by: Sequence[Any], id_field: str, code_field: Optional[str]):
+        self.name = name
+        self.model = model
+        self.schema = schema
+        self.order_by = list(order_by)
+        self.id_field = id_field
+        self.code_field = code_field
+        self.adapter = TypeAdapter(List[schema])
+        self.generation = 0
+        self.snapshot: Optional[Snapshot] = None
+        self.load_lock = threading.Lock()
+
+
+class DictionarySnapshots:
+    """
+    Rarely changing dictionaries held in memory as immutable snapshots.
+
+    A dictionary is loaded on first use and served from memory until it is
+    invalidated: by a committed ORM or bulk write in this process (through the
+    cache namespace watching its model), or by a NOTIFY from another worker.
+    Readers never see a partially built snapshot; a snapshot loaded while an
+    invalidation happened is discarded on the next read.
+    """
+
+    def __init__(self):
+        self._dictionaries: Dict[str, _Dictionary] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        model: type,
+        schema: type,
+        order_by: Sequence[Any],
+        id_field: str = "id",
+        code_field: Optional[str] = "code"
+    ) -> None:
+        self._dictionaries[name] = _Dictionary(name, model, schema, order_by, id_field, code_field)
+        watch_model(model, NAMESPACE_PREFIX + name)
+
+    def get(self, db: Session, name: str) -> Snapshot:
+        dictionary = self._dictionaries[name]
+        snapshot = dictionary.snapshot
+        if self._is_current(dictionary, snapshot):
+            return snapshot
+        self._ensure_listener()
+        with dictionary.load_lock:
+            # Another thread may have reloaded it while this one waited
+            snapshot = dictionary.snapshot
+            if self._is_current(dictionary, snapshot):
+                return snapshot
+            version = dictionary.generation
+            rows = db.query(dictionary.model).order_by(*dictionary.order_by).all()
+            snapshot = Snapshot(
+                version,
+                [dictionary.schema.model_validate(row, from_attributes=True) for row in rows],
+                dictionary.id_field,
+                dictionary.code_field,
+                dictionary.adapter
+            )
+            dictionary.snapshot = snapshot
+            return snapshot
+
+    @staticmethod
+    def _is_current(dictionary: _Dictionary, snapshot: Optional[Snapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == dictionary.generation
+            and time.monotonic() - snapshot.loaded_at < SNAPSHOT_MAX_AGE_SECONDS
+        )
+
+    def invalidate(self, name: str, broadcast: bool = True) -> None:
+        dictionary = self._dictionaries.get(name)
+        if dictionary is None:
+            return
+        with self._lock:
+            dictionary.generation += 1
+        if broadcast:
+            self._broadcast(name)
+
+    def invalidate_all(self) -> None:
+        for name in list(self._dictionaries):
+            self.invalidate(name, broadcast=False)
+
+    def version(self, name: str) -> int:
+        return self._dictionaries[name].generation
+
+    def _on_cache_invalidate(self, namespace: str) -> None:
+        if namespace.startswith(NAMESPACE_PREFIX):
+            self.invalidate(namespace[len(NAMESPACE_PREFIX):])
+
+    @staticmethod
+    def _broadcast(name: str) -> None:
+        # Runs after the writing transaction committed, so it needs a connection of its own
+        try:
+            with engine.connect() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANNEL, "payload": json.dumps({"dictionary": name, "origin": _PROCESS_ID})}
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not announce change of dictionary {name}: {e}")
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed dictionary notification: {payload}")
+            return
+        if message.get("origin") != _PROCESS_ID:
+            self.invalidate(message.get("dictionary"), broadcast=False)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen_forever, name="dictionary-change-listener", daemon=True)
+                self._listener.start()
+
+    def _listen_forever(self) -> None:
+        while True:
+            try:
+                listen_for_notifications(CHANNEL, self._dispatch, lambda: True)
+            except Exception as e:
+                logger.error(f"Dictionary change listener failed, reconnecting: {e}")
+                time.sleep(2)
+            # Changes announced while disconnected were missed: reload everything
+            self.invalidate_all()
+
+
+# Global instance
+snapshots = DictionarySnapshots()
+on_invalidate(snapshots._on_cache_invalidate)
+
+snapshots.register("currencies", Currency, CurrencyOut, [Currency.code], id_field="code")
+snapshots.register("vat-rates", VatRate, VatRateOut, [VatRate.rate], code_field=None)
+snapshots.register("expense-articles", ExpenseArticle, ExpenseArticleOut, [ExpenseArticle.name])
+snapshots.register("departments", Department, DepartmentOut, [Department.name])
+snapshots.register("roles", Role, RoleOut, [Role.name])
@@ -0,0 +1,63 @@
+# app/core/directory.py
+import uuid
+from datetime import date
+from typing import List, Optional, Set
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from app.models import User, UserRole, Role
+from app.modules.users.schemas import UserOut
+from app.core.cache import cache, watch_model
+
+ROLE_DIRECTORY_NAMESPACE = "role_directory"
+ROLE_DIRECTORY_TTL_SECONDS = 300
+
+# Role assignments, role codes and user details all change who is listed
+watch_model(UserRole, ROLE_DIRECTORY_NAMESPACE)
+watch_model(Role, ROLE_DIRECTORY_NAMESPACE)
+watch_model(User, ROLE_DIRECTORY_NAMESPACE)
+
+
+def _load_users_with_role(db: Session, role_code: str, as_of: date) -> List[UserOut]:
+    users = db.query(User).join(UserRole, UserRole.user_id == User.id).join(Role, Role.id == UserRole.role_id).filter(
+        func.upper(Role.code) == role_code.upper(),
+        and_(
+            UserRole.valid_from <= as_of,
+            or_(UserRole.valid_to.is_(None), UserRole.valid_to >= as_of)
+        )
+    ).distinct().order_by(User.full_name, User.id).all()
+
+    return [
+        UserOut(id=user.id, full_name=user.full_name, email=user.email, phone=user.phone, is_active=user.is_active)
+        for user in users
+    ]
+
+
+def users_with_role(db: Session, role_code: str, as_of: Optional[date] = None) -> List[UserOut]:
+    """
+    Users holding a role on a date (today by default), with one joined query.
+
+    Role codes are matched case-insensitively. Results are cached and dropped
+    whenever users, roles or role assignments change.
+    """
+    as_of = as_of or date.today()
+    return cache.get_or_set(
+        ROLE_DIRECTORY_NAMESPACE,
+        ("users_with_role", role_code.upper(), as_of),
+        ROLE_DIRECTORY_TTL_SECONDS,
+        lambda: _load_users_with_role(db, role_code, as_of)
+    )
+
+
+def user_ids_with_role(db: Session, role_code: str, as_of: Optional[date] = None) -> Set[uuid.UUID]:
+    return {user.id for user in users_with_role(db, role_code, as_of)}
+
+
+def has_role(db: Session, user_id: uuid.UUID, role_code: str, as_of: Optional[date] = None) -> bool:
+    """Whether a user holds a role on a date; answered from the cached directory."""
+    return user_id in user_ids_with_role(db, role_code, as_of)
+
+
+def current_user_has_role(current_user: UserOut, *role_codes: str) -> bool:
+    """Whether the authenticated user holds any of the roles; uses the roles already loaded with the user."""
+    codes = {code.upper() for code in role_codes}
+    return any(user_role.role.code.upper() in codes for user_role in current_user.user_roles)
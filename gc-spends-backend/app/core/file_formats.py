@@ -0,0 +1,351 @@
+# app/core/file_formats.py
+import csv
+import datetime
+import decimal
+import enum
+import io
+import itertools
+import json
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Union
+import pandas as pd
+from fastapi import HTTPException
+from openpyxl import Workbook, load_workbook
+
+# A readable source is a path on disk or an open binary file (e.g. an upload's spooled file)
+Source = Union[str, BinaryIO]
+
+# CSV/JSON rows buffered before a chunk is sent
+CSV_FLUSH_ROWS = 500
+XLSX_CHUNK_BYTES = 64 * 1024
+# Characters read from a JSON file per step of the incremental parser
+JSON_READ_CHARS = 64 * 1024
+
+
+def cell_value(value: Any) -> Any:
+    """Convert a DB value to something both csv and openpyxl can write."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _text_value(value: Any) -> Optional[str]:
+    """Parsed JSON value as the string a CSV cell would hold; readers hand out text only."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+@contextmanager
+def _open_text(source: Source) -> Iterator[TextIO]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8-sig", newline="") as text:
+            yield text
+    else:
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield text
+        finally:
+            # Leave the caller's file open
+            text.detach()
+
+
+def _records_to_frames(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, chunk_size))
+        if not batch:
+            break
+        yield pd.DataFrame.from_records(
+            [{str(key): _text_value(value) for key, value in record.items()} for record in batch]
+        )
+
+
+# ----------------------------------------------------------------------------
+# Readers: yield DataFrames of at most chunk_size rows, all values as strings
+# ----------------------------------------------------------------------------
+
+def read_csv_chunks(source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(source, dtype=str, encoding="utf-8-sig", chunksize=chunk_size) as reader:
+        for frame in reader:
+            yield frame.reset_index(drop=True)
+
+
+def read_xlsx_chunks(source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(rows, [])]
+        while True:
+            batch = [
+                [None if value is None else str(value) for value in row[:len(header)]]
+                for row in itertools.islice(rows, chunk_size)
+            ]
+            if not batch:
+                break
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_xls_chunks(source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    # openpyxl does not read the legacy format; such files hold at most 65536 rows
+    frame = pd.read_excel(source, dtype=str)
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size].reset_index(drop=True)
+
+
+def _iter_json_array(text: TextIO) -> Iterator[Any]:
+    """
+    Items of a top-level JSON array, decoded one at a time from a sliding
+    buffer, so the whole document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, started = "", 0, False
+    while True:
+        chunk = text.read(JSON_READ_CHARS)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or (started and buffer[position] == ",")):
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("JSON file must contain an array of objects")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                # The item continues in the next chunk
+                break
+            yield item
+        if not chunk:
+            raise ValueError("Unexpected end of JSON file")
+
+
+def _objects(items: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    for number, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Record {number} is not a JSON object")
+        yield item
+
+
+def read_json_chunks(source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    with _open_text(source) as text:
+        yield from _records_to_frames(_objects(_iter_json_array(text)), chunk_size)
+
+
+def read_ndjson_chunks(source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+    with _open_text(source) as text:
+        lines = (json.loads(line) for line in text if line.strip())
+        yield from _records_to_frames(_objects(lines), chunk_size)
+
+
+# ----------------------------------------------------------------------------
+# Row counters: data rows without the header; None when unknown up front
+# ----------------------------------------------------------------------------
+
+def count_csv_rows(source: Source) -> Optional[int]:
+    with _open_text(source) as text:
+        return max(sum(1 for _ in csv.reader(text)) - 1, 0)
+
+
+def count_xlsx_rows(source: Source) -> Optional[int]:
+    workbook = load_workbook(source, read_only=True)
+    try:
+        max_row = workbook.active.max_row
+        return max(max_row - 1, 0) if max_row else None
+    finally:
+        workbook.close()
+
+
+def count_ndjson_rows(source: Source) -> Optional[int]:
+    with _open_text(source) as text:
+        return sum(1 for line in text if line.strip())
+
+
+# ----------------------------------------------------------------------------
+# Writers: yield the encoded file in chunks
+# ----------------------------------------------------------------------------
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Data") -> Iterator[bytes]:
+    # csv.writer stringifies values itself; the app's enums are str subclasses and
+    # are written as their value, so rows go through without per-cell conversion
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, CSV_FLUSH_ROWS))
+        if not batch:
+            break
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_xlsx(header: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Data") -> Iterator[bytes]:
+    """
+    Write rows with openpyxl's write-only mode, which spools rows to disk instead
+    of keeping a cell object per value. An xlsx file is a zip archive and can only
+    be sent once complete, so the finished file is streamed from a temp file.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append([cell_value(value) for value in row])
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(XLSX_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _iter_json_lines(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[List[str]]:
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, CSV_FLUSH_ROWS))
+        if not batch:
+            break
+        yield [json.dumps(dict(zip(header, row)), default=_json_value, ensure_ascii=False) for row in batch]
+
+
+def iter_json(header: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Data") -> Iterator[bytes]:
+    """A JSON array of objects keyed by the header, written a batch of rows at a time."""
+    separator = "["
+    for lines in _iter_json_lines(header, rows):
+        yield (separator + ",\n".join(lines)).encode("utf-8")
+        separator = ",\n"
+    yield ("[]" if separator == "[" else "]").encode("utf-8")
+
+
+def iter_ndjson(header: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Data") -> Iterator[bytes]:
+    for lines in _iter_json_lines(header, rows):
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ----------------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------------
+
+class FileFormat:
+    """A file format the import/export endpoints understand; reader and writer are optional."""
+
+    def __init__(
+        self,
+        name: str,
+        extensions: Sequence[str],
+        media_type: str,
+        reader: Optional[Callable[[Source, int], Iterator[pd.DataFrame]]] = None,
+        writer: Optional[Callable[..., Iterator[bytes]]] = None,
+        counter: Optional[Callable[[Source], Optional[int]]] = None
+    ):
+        self.name = name
+        self.extensions = list(extensions)
+        self.media_type = media_type
+        self.reader = reader
+        self.writer = writer
+        self.counter = counter
+
+    @property
+    def extension(self) -> str:
+        return self.extensions[0]
+
+    def read_chunks(self, source: Source, chunk_size: int) -> Iterator[pd.DataFrame]:
+        return self.reader(source, chunk_size)
+
+    def read_frame(self, source: Source, chunk_size: int = 10000) -> pd.DataFrame:
+        frames = list(self.read_chunks(source, chunk_size))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def count_rows(self, source: Source) -> Optional[int]:
+        return self.counter(source) if self.counter else None
+
+    def write(self, header: Sequence[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Data") -> Iterator[bytes]:
+        return self.writer(header, rows, sheet_name)
+
+
+FILE_FORMATS: Dict[str, FileFormat] = {}
+FORMAT_ALIASES = {"excel": "xlsx", "jsonl": "ndjson"}
+
+
+def register_format(file_format: FileFormat) -> FileFormat:
+    FILE_FORMATS[file_format.name] = file_format
+    return file_format
+
+
+register_format(FileFormat("csv", ["csv"], "text/csv; charset=utf-8", read_csv_chunks, iter_csv, count_csv_rows))
+register_format(FileFormat(
+    "xlsx", ["xlsx"], "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    read_xlsx_chunks, iter_xlsx, count_xlsx_rows
+))
+register_format(FileFormat("xls", ["xls"], "application/vnd.ms-excel", read_xls_chunks))
+register_format(FileFormat("json", ["json"], "application/json", read_json_chunks, iter_json))
+register_format(FileFormat(
+    "ndjson", ["ndjson", "jsonl"], "application/x-ndjson", read_ndjson_chunks, iter_ndjson, count_ndjson_rows
+))
+
+
+def readable_extensions() -> List[str]:
+    return [extension for file_format in FILE_FORMATS.values() if file_format.reader for extension in file_format.extensions]
+
+
+def writable_formats() -> List[str]:
+    return [name for name, file_format in FILE_FORMATS.items() if file_format.writer]
+
+
+def get_writer_format(name: str) -> FileFormat:
+    """Format to export in, by name or alias (e.g. "excel")."""
+    name = FORMAT_ALIASES.get(name.lower(), name.lower())
+    file_format = FILE_FORMATS.get(name)
+    if not file_format or not file_format.writer:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format: {name}. Supported formats: {', '.join(writable_formats())}"
+        )
+    return file_format
+
+
+def format_for_filename(filename: Optional[str]) -> Optional[FileFormat]:
+    """Readable format matching a file's extension; None if the extension is not supported."""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    for file_format in FILE_FORMATS.values():
+        if file_format.reader and extension in file_format.extensions:
+            return file_format
+    return None
@@ -1,9 +1,307 @@
 # app/core/priority.py
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import bisect
+import json
+import threading
+import time
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, List, Optional, Iterable
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, update, insert, func, event, inspect, or_, String
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
-from app.models import PaymentRequest, PaymentPriorityRule, PaymentPriority
+from app.models import PaymentRequest, PaymentPriorityRule, PaymentPriority, ScheduledJobState, RequestEvent
 from app.common.enums import PaymentPriority as PriorityEnum
+from app.core.cache import cache, watch_model, invalidate_on_commit
+
+# Score thresholds for _score_to_priority, highest first
+PRIORITY_THRESHOLDS = [
+    (20.0, PriorityEnum.CRITICAL),
+    (15.0, PriorityEnum.URGENT),
+    (10.0, PriorityEnum.HIGH),
+    (5.0, PriorityEnum.NORMAL),
+]
+
+# Escalation policy. The minutes for HIGH, URGENT and CRITICAL are also encoded in
+# the generated payment_requests.escalation_due_at column (migration 62957fd82ee9)
+ESCALATION_RULES = [
+    {
+        "priority": PriorityEnum.CRITICAL,
+        "escalation_time_minutes": 15,
+        "notification_channels": ["email", "sms", "slack"]
+    },
+    {
+        "priority": PriorityEnum.URGENT,
+        "escalation_time_minutes": 60,
+        "notification_channels": ["email", "slack"]
+    },
+    {
+        "priority": PriorityEnum.HIGH,
+        "escalation_time_minutes": 240,
+        "notification_channels": ["email"]
+    },
+    {
+        "priority": PriorityEnum.NORMAL,
+        "escalation_time_minutes": 1440,  # 24 hours
+        "notification_channels": ["email"]
+    },
+    {
+        "priority": PriorityEnum.LOW,
+        "escalation_time_minutes": 4320,  # 72 hours
+        "notification_channels": []
+    }
+]
+ESCALATION_RULES_BY_PRIORITY = {rule["priority"]: rule for rule in ESCALATION_RULES}
+
+PRIORITY_STATS_NAMESPACE = "priority_statistics"
+PRIORITY_STATS_TTL_SECONDS = 30
+watch_model(PaymentRequest, PRIORITY_STATS_NAMESPACE)
+
+# Columns the rule conditions read
+PRIORITY_COLUMNS = ["id", "number", "amount_total", "due_date", "currency_code", "counterparty_id", "status", "priority", "priority_score"]
+
+
+class PriorityPlan:
+    """
+    Active priority rules compiled once into column-wise scoring steps.
+
+    A request's score is the sum over all rules of their conditions:
+    amount_thresholds and due_date_urgency add the score of the first matching
+    tier, currency/counterparty/status priorities add their score when the
+    request matches, and time_based adds a score that depends only on the
+    current time. score() applies this to whole DataFrames, score_request()
+    to a single request.
+    """
+
+    def __init__(self, rules: Iterable[PaymentPriorityRule]):
+        self.amount_thresholds: List[List[tuple]] = []
+        self.amount_tables: List[tuple] = []
+        self.due_date_urgency: List[tuple] = []
+        self.currency_scores: List[tuple] = []
+        self.counterparty_scores: List[tuple] = []
+        self.status_score_map: Dict[str, float] = {}
+        self.time_based: List[Dict[str, Any]] = []
+        self.rule_count = 0
+
+        for rule in rules:
+            conditions = rule.conditions or {}
+            self.rule_count += 1
+            if 'amount_thresholds' in conditions:
+                thresholds = [
+                    (float(t['min']), float(t['max']), float(t['score']))
+                    for t in conditions['amount_thresholds']
+                ]
+                self.amount_thresholds.append(thresholds)
+                self.amount_tables.append(self._compile_thresholds(thresholds))
+            if 'due_date_urgency' in conditions:
+                config = conditions['due_date_urgency']
+                self.due_date_urgency.append((
+                    (config.get('critical_days', 1), config.get('critical_score', 10.0)),
+                    (config.get('urgent_days', 3), config.get('urgent_score', 5.0)),
+                    (config.get('high_days', 7), config.get('high_score', 2.0)),
+                ))
+            if 'currency_priority' in conditions:
+                config = conditions['currency_priority']
+                self.currency_scores.append((
+                    frozenset(config.get('high_priority_currencies', [])),
+                    config.get('high_priority_score', 3.0)
+                ))
+            if 'counterparty_priority' in conditions:
+                config = conditions['counterparty_priority']
+                # Ids are compared as strings: JSON conditions cannot hold UUID objects
+                self.counterparty_scores.append((
+                    frozenset(str(c) for c in config.get('high_priority_counterparties', [])),
+                    config.get('high_priority_score', 2.0)
+                ))
+            if 'status_priority' in conditions:
+                for status, score in conditions['status_priority'].get('status_scores', {}).items():
+                    self.status_score_map[status] = self.status_score_map.get(status, 0.0) + score
+            if 'time_based' in conditions:
+                self.time_based.append(conditions['time_based'])
+
+    @staticmethod
+    def _compile_thresholds(thresholds: List[tuple]) -> tuple:
+        """
+        Sorted, non-overlapping tiers become a bisect table (lower bounds, upper
+        bounds, scores). Overlapping tiers keep first-match order and are scanned.
+        """
+        ordered = sorted(thresholds)
+        disjoint = all(ordered[i][1] <= ordered[i + 1][0] for i in range(len(ordered) - 1))
+        if not disjoint:
+            return (None, None, thresholds)
+        return ([t[0] for t in ordered], [t[1] for t in ordered], [t[2] for t in ordered])
+
+    @staticmethod
+    def _threshold_score(table: tuple, amount: float) -> float:
+        lows, highs, scores = table
+        if lows is None:
+            for low, high, score in scores:
+                if low <= amount < high:
+                    return score
+            return 0.0
+        index = bisect.bisect_right(lows, amount) - 1
+        if index >= 0 and amount < highs[index]:
+            return scores[index]
+        return 0.0
+
+    def score_request(self, payment_request: PaymentRequest, now: Optional[datetime] = None) -> float:
+        """Score a single request without touching the database."""
+        now = now or datetime.now()
+        score = 0.0
+
+        if self.amount_tables:
+            amount = float(payment_request.amount_total)
+            for table in self.amount_tables:
+                score += self._threshold_score(table, amount)
+
+        if self.due_date_urgency:
+            days_until_due = (payment_request.due_date - now.date()).days
+            for tiers in self.due_date_urgency:
+                for days, tier_score in tiers:
+                    if days_until_due <= days:
+                        score += tier_score
+                        break
+
+        for currencies, currency_score in self.currency_scores:
+            if payment_request.currency_code in currencies:
+                score += currency_score
+
+        if self.counterparty_scores:
+            counterparty_id = str(payment_request.counterparty_id)
+            for counterparties, counterparty_score in self.counterparty_scores:
+                if counterparty_id in counterparties:
+                    score += counterparty_score
+
+        if self.status_score_map:
+            status = getattr(payment_request.status, "value", payment_request.status)
+            score += self.status_score_map.get(status, 0.0)
+
+        return score + self.time_score(now)
+
+    def time_score(self, now: datetime) -> float:
+        """Score of time_based conditions, identical for every request at a given moment."""
+        score = 0.0
+        business_hours = 9 <= now.hour <= 17 and now.weekday() < 5
+        after_hours = now.hour < 9 or now.hour > 17 or now.weekday() >= 5
+        for config in self.time_based:
+            if config.get('business_hours_priority', False) and business_hours:
+                score += config.get('business_hours_score', 1.0)
+            if config.get('after_hours_priority', False) and after_hours:
+                score += config.get('after_hours_score', 2.0)
+        return score
+
+    def score(self, frame: pd.DataFrame, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Score every row of a frame with PRIORITY_COLUMNS.
+
+        Returns:
+            np.ndarray: float scores aligned with the frame rows
+        """
+        now = now or datetime.now()
+        scores = np.zeros(len(frame), dtype=float)
+        if not len(frame) or not self.rule_count:
+            return scores
+
+        if self.amount_thresholds:
+            amount = frame["amount_total"].astype(float).to_numpy()
+            for thresholds in self.amount_thresholds:
+                # np.select takes the first matching threshold, like the loop with break
+                scores += np.select(
+                    [(amount >= low) & (amount < high) for low, high, _ in thresholds],
+                    [score for _, _, score in thresholds],
+                    0.0
+                )
+
+        if self.due_date_urgency:
+            due = pd.to_datetime(frame["due_date"]).to_numpy(dtype="datetime64[D]")
+            days_until_due = (due - np.datetime64(now.date(), "D")).astype(int)
+            for tiers in self.due_date_urgency:
+                scores += np.select(
+                    [days_until_due <= days for days, _ in tiers],
+                    [score for _, score in tiers],
+                    0.0
+                )
+
+        for currencies, score in self.currency_scores:
+            scores += frame["currency_code"].isin(currencies).to_numpy() * score
+
+        if self.counterparty_scores:
+            counterparty_ids = frame["counterparty_id"].astype(str)
+            for counterparties, score in self.counterparty_scores:
+                scores += counterparty_ids.isin(counterparties).to_numpy() * score
+
+        if self.status_score_map:
+            scores += frame["status"].map(self.status_score_map).fillna(0.0).astype(float).to_numpy()
+
+        scores += self.time_score(now)
+        return scores
+
+    @staticmethod
+    def priority_for(score: float) -> PriorityEnum:
+        for threshold, priority in PRIORITY_THRESHOLDS:
+            if score >= threshold:
+                return priority
+        return PriorityEnum.LOW
+
+    def due_date_thresholds(self) -> List[int]:
+        """Day offsets at which a request moves to another due_date_urgency tier."""
+        return sorted({int(days) for tiers in self.due_date_urgency for days, _ in tiers})
+
+    @staticmethod
+    def priorities(scores: np.ndarray) -> np.ndarray:
+        """Vectorised _score_to_priority returning priority values."""
+        return np.select(
+            [scores >= threshold for threshold, _ in PRIORITY_THRESHOLDS],
+            [priority.value for _, priority in PRIORITY_THRESHOLDS],
+            PriorityEnum.LOW.value
+        )
+
+class PriorityRuleCache:
+    """
+    Process-wide cache of the compiled PriorityPlan.
+    
+    The version is bumped by invalidate() whenever rules are created, updated or
+    deleted through the API; ttl_seconds bounds how long other workers keep a
+    plan compiled before a rule change they did not see.
+    """
+    
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._plan: Optional[PriorityPlan] = None
+        self._plan_version = -1
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+    
+    def get_plan(self, db: Session) -> PriorityPlan:
+        plan = self._plan
+        if plan is not None and self._plan_version == self.version and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return plan
+        with self._lock:
+            version = self.version
+            rules = db.query(PaymentPriorityRule).filter(
+                PaymentPriorityRule.is_active == True
+            ).all()
+            self._plan = PriorityPlan(rules)
+            self._plan_version = version
+            self._loaded_at = time.monotonic()
+            return self._plan
+    
+    def invalidate(self) -> int:
+        with self._lock:
+            self.version += 1
+            self._plan = None
+            return self.version
+
+
+# Global instance
+priority_rule_cache = PriorityRuleCache()
+
+
+def invalidate_priority_rules() -> int:
+    """Drop the compiled rules after a rule change. Returns the new rules version."""
+    return priority_rule_cache.invalidate()
+
 
 class PriorityCalculationService:
     """
@@ -20,99 +318,19 @@ class PriorityCalculationService:
         Returns:
             tuple: (priority_enum, score)
         """
-        # Get all active priority rules
-        rules = self.db.query(PaymentPriorityRule).filter(
-            PaymentPriorityRule.is_active == True
-        ).all()
+        # Compiled rules are cached, no DB read unless the rules changed
+        plan = priority_rule_cache.get_plan(self.db)
         
-        if not rules:
+        if not plan.rule_count:
             return PriorityEnum.NORMAL, 0.0
         
-        # Calculate base score
-        base_score = 0.0
-        matched_rules = []
-        
-        for rule in rules:
-            score = self._evaluate_rule(rule, payment_request)
-            if score > 0:
-                base_score += score
-                matched_rules.append(rule)
+        base_score = plan.score_request(payment_request)
         
         # Determine priority based on score
         priority = self._score_to_priority(base_score)
         
         return priority, base_score
     
-    def _evaluate_rule(self, rule: PaymentPriorityRule, payment_request: PaymentRequest) -> float:
-        """
-        Evaluate a single priority rule against a payment request.
-        
-        Returns:
-            float: Score contribution from this rule
-        """
-        conditions = rule.conditions
-        if not conditions:
-            return 0.0
-        
-        score = 0.0
-        
-        # Amount-based scoring
-        if 'amount_thresholds' in conditions:
-            thresholds = conditions['amount_thresholds']
-            amount = float(payment_request.amount_total)
-            
-            for threshold in thresholds:
-                if amount >= threshold['min'] and amount < threshold['max']:
-                    score += threshold['score']
-                    break
-        
-        # Due date urgency scoring
-        if 'due_date_urgency' in conditions:
-            urgency_config = conditions['due_date_urgency']
-            days_until_due = (payment_request.due_date - datetime.now().date()).days
-            
-            if days_until_due <= urgency_config.get('critical_days', 1):
-                score += urgency_config.get('critical_score', 10.0)
-            elif days_until_due <= urgency_config.get('urgent_days', 3):
-                score += urgency_config.get('urgent_score', 5.0)
-            elif days_until_due <= urgency_config.get('high_days', 7):
-                score += urgency_config.get('high_score', 2.0)
-        
-        # Currency-based scoring
-        if 'currency_priority' in conditions:
-            currency_config = conditions['currency_priority']
-            if payment_request.currency_code in currency_config.get('high_priority_currencies', []):
-                score += currency_config.get('high_priority_score', 3.0)
-        
-        # Counterparty-based scoring
-        if 'counterparty_priority' in conditions:
-            counterparty_config = conditions['counterparty_priority']
-            if payment_request.counterparty_id in counterparty_config.get('high_priority_counterparties', []):
-                score += counterparty_config.get('high_priority_score', 2.0)
-        
-        # Status-based scoring
-        if 'status_priority' in conditions:
-            status_config = conditions['status_priority']
-            status_scores = status_config.get('status_scores', {})
-            score += status_scores.get(payment_request.status.value, 0.0)
-        
-        # Time-based scoring (time of day, day of week)
-        if 'time_based' in conditions:
-            time_config = conditions['time_based']
-            now = datetime.now()
-            
-            # Business hours scoring
-            if time_config.get('business_hours_priority', False):
-                if 9 <= now.hour <= 17 and now.weekday() < 5:  # Business hours
-                    score += time_config.get('business_hours_score', 1.0)
-            
-            # Weekend/after hours scoring
-            if time_config.get('after_hours_priority', False):
-                if now.hour < 9 or now.hour > 17 or now.weekday() >= 5:
-                    score += time_config.get('after_hours_score', 2.0)
-        
-        return score
-    
     def _score_to_priority(self, score: float) -> PriorityEnum:
         """
         Convert calculated score to priority enum.
@@ -128,37 +346,192 @@ class PriorityCalculationService:
         else:
             return PriorityEnum.LOW
     
+    def load_plan(self) -> PriorityPlan:
+        """Get the compiled active rules."""
+        return priority_rule_cache.get_plan(self.db)
+    
+    def recalculate_priorities(
+        self,
+        statuses: Optional[List[str]] = None,
+        currency_codes: Optional[List[str]] = None,
+        request_ids: Optional[List[Any]] = None,
+        due_date_from: Optional[date] = None,
+        due_date_to: Optional[date] = None,
+        due_date_windows: Optional[List[tuple]] = None,
+        chunk_size: int = 5000
+    ) -> Dict[str, int]:
+        """
+        Recalculate priority and score for many requests at once.
+        
+        Rules are compiled once, requests are scored chunk by chunk with pandas and
+        only changed rows are written back with one bulk UPDATE per chunk.
+        The caller owns the transaction and must commit.
+        
+        Returns:
+            dict: evaluated, updated and rules_applied counters
+        """
+        plan = self.load_plan()
+        now = datetime.now()
+        if not plan.rule_count:
+            # Same as calculate_priority: without rules stored priorities are left alone
+            return {"evaluated": 0, "updated": 0, "rules_applied": 0, "rules_version": priority_rule_cache.version}
+        
+        evaluated = 0
+        updated = 0
+        filters = dict(
+            statuses=statuses, currency_codes=currency_codes, request_ids=request_ids,
+            due_date_from=due_date_from, due_date_to=due_date_to, due_date_windows=due_date_windows
+        )
+        for frame, scores, priorities, changed in self._score_chunks(plan, now, chunk_size, **filters):
+            previous_priorities = frame["priority"].to_numpy()[changed]
+            changes = [
+                {
+                    "id": request_id,
+                    "priority": PriorityEnum(priority),
+                    "priority_score": float(score),
+                    # A new priority moves escalation_due_at, so the request may escalate again
+                    **({"escalated_at": None} if priority != previous else {})
+                }
+                for request_id, priority, score, previous in zip(
+                    frame["id"].to_numpy()[changed], priorities[changed], scores[changed], previous_priorities
+                )
+            ]
+            if changes:
+                # ORM bulk UPDATE by primary key (executemany)
+                self.db.execute(update(PaymentRequest), changes)
+                invalidate_on_commit(self.db, PRIORITY_STATS_NAMESPACE)
+            
+            evaluated += len(frame)
+            updated += len(changes)
+        
+        return {
+            "evaluated": evaluated,
+            "updated": updated,
+            "rules_applied": plan.rule_count,
+            "rules_version": priority_rule_cache.version
+        }
+    
+    def _score_chunks(
+        self,
+        plan: PriorityPlan,
+        now: datetime,
+        chunk_size: int,
+        statuses: Optional[List[str]] = None,
+        currency_codes: Optional[List[str]] = None,
+        request_ids: Optional[List[Any]] = None,
+        due_date_from: Optional[date] = None,
+        due_date_to: Optional[date] = None,
+        due_date_windows: Optional[List[tuple]] = None
+    ):
+        """
+        Stream the filtered requests chunk by chunk and score each chunk with the plan.
+        
+        Yields:
+            tuple: (frame, scores, priorities, changed mask against the stored values)
+        """
+        query = select(*(getattr(PaymentRequest, column) for column in PRIORITY_COLUMNS))\
+            .where(PaymentRequest.deleted == False)
+        if statuses:
+            query = query.where(PaymentRequest.status.in_(statuses))
+        if currency_codes:
+            query = query.where(PaymentRequest.currency_code.in_(currency_codes))
+        if request_ids:
+            query = query.where(PaymentRequest.id.in_(request_ids))
+        if due_date_from:
+            query = query.where(PaymentRequest.due_date >= due_date_from)
+        if due_date_to:
+            query = query.where(PaymentRequest.due_date <= due_date_to)
+        if due_date_windows:
+            query = query.where(or_(*(
+                PaymentRequest.due_date.between(window_start, window_end)
+                for window_start, window_end in due_date_windows
+            )))
+        
+        result = self.db.execute(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            frame = pd.DataFrame(rows, columns=PRIORITY_COLUMNS)
+            frame["status"] = frame["status"].map(lambda status: getattr(status, "value", status))
+            frame["priority"] = frame["priority"].map(lambda priority: getattr(priority, "value", priority))
+            
+            scores = np.round(plan.score(frame, now), 2)
+            if plan.rule_count:
+                priorities = PriorityPlan.priorities(scores)
+            else:
+                # Same fallback as calculate_priority: no active rules means NORMAL
+                priorities = np.full(len(frame), PriorityEnum.NORMAL.value)
+            previous_scores = pd.to_numeric(frame["priority_score"], errors="coerce").astype(float).to_numpy()
+            changed = (priorities != frame["priority"].to_numpy()) | ~np.isclose(scores, previous_scores)
+            yield frame, scores, priorities, changed
+    
+    def simulate_rules(
+        self,
+        rules: Iterable[Any],
+        include_active: bool = False,
+        max_changes: int = 1000,
+        chunk_size: int = 10000,
+        **filters
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a draft rule set against stored requests without writing anything.
+        
+        Args:
+            rules: draft rules, anything with a `conditions` dict
+            include_active: evaluate the drafts together with the active rules
+            max_changes: maximum number of changed requests listed in the result
+            filters: same request filters as recalculate_priorities
+        
+        Returns:
+            dict: priority distribution before/after and the changed requests
+        """
+        rules = list(rules)
+        if include_active:
+            rules += self.db.query(PaymentPriorityRule).filter(PaymentPriorityRule.is_active == True).all()
+        plan = PriorityPlan(rules)
+        now = datetime.now()
+        
+        before = {priority.value: 0 for priority in PriorityEnum}
+        after = {priority.value: 0 for priority in PriorityEnum}
+        changed_requests = []
+        evaluated = 0
+        changed_count = 0
+        
+        for frame, scores, priorities, changed in self._score_chunks(plan, now, chunk_size, **filters):
+            for priority, count in frame["priority"].value_counts().items():
+                before[priority] = before.get(priority, 0) + int(count)
+            values, counts = np.unique(priorities, return_counts=True)
+            for priority, count in zip(values, counts):
+                after[priority] += int(count)
+            
+            evaluated += len(frame)
+            changed_count += int(changed.sum())
+            room = max_changes - len(changed_requests)
+            if room > 0 and changed.any():
+                for index in np.flatnonzero(changed)[:room]:
+                    row = frame.iloc[index]
+                    changed_requests.append({
+                        "request_id": str(row["id"]),
+                        "number": row["number"],
+                        "previous_priority": row["priority"],
+                        "previous_score": None if pd.isna(row["priority_score"]) else float(row["priority_score"]),
+                        "priority": str(priorities[index]),
+                        "score": float(scores[index])
+                    })
+        
+        return {
+            "evaluated": evaluated,
+            "rules_applied": plan.rule_count,
+            "distribution_before": before,
+            "distribution_after": after,
+            "changed_count": changed_count,
+            "changed": changed_requests,
+            "changed_truncated": changed_count > len(changed_requests)
+        }
+    
     def get_priority_escalation_rules(self) -> List[Dict[str, Any]]:
         """
         Get priority escalation rules for monitoring and alerting.
         """
-        return [
-            {
-                "priority": PriorityEnum.CRITICAL,
-                "escalation_time_minutes": 15,
-                "notification_channels": ["email", "sms", "slack"]
-            },
-            {
-                "priority": PriorityEnum.URGENT,
-                "escalation_time_minutes": 60,
-                "notification_channels": ["email", "slack"]
-            },
-            {
-                "priority": PriorityEnum.HIGH,
-                "escalation_time_minutes": 240,
-                "notification_channels": ["email"]
-            },
-            {
-                "priority": PriorityEnum.NORMAL,
-                "escalation_time_minutes": 1440,  # 24 hours
-                "notification_channels": ["email"]
-            },
-            {
-                "priority": PriorityEnum.LOW,
-                "escalation_time_minutes": 4320,  # 72 hours
-                "notification_channels": []
-            }
-        ]
+        return [dict(rule) for rule in ESCALATION_RULES]
     
     def should_escalate(self, payment_request: PaymentRequest) -> bool:
         """
@@ -167,33 +540,77 @@ class PriorityCalculationService:
         if not payment_request.priority:
             return False
         
-        escalation_rules = self.get_priority_escalation_rules()
+        rule = ESCALATION_RULES_BY_PRIORITY.get(PriorityEnum(payment_request.priority))
+        if not rule:
+            return False
+        
+        time_since_created = datetime.now() - payment_request.created_at
+        return time_since_created >= timedelta(minutes=rule["escalation_time_minutes"])
+    
+    def get_overdue_escalations(self, skip: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get requests whose escalation deadline has passed, oldest deadline first.
         
-        for rule in escalation_rules:
-            if rule["priority"] == payment_request.priority:
-                time_since_created = datetime.now() - payment_request.created_at
-                escalation_time = timedelta(minutes=rule["escalation_time_minutes"])
-                
-                return time_since_created >= escalation_time
+        Reads only the overdue range of ix_payment_requests_escalation_due_at.
+        """
+        query = self.db.query(PaymentRequest).filter(
+            PaymentRequest.deleted == False,
+            PaymentRequest.escalation_due_at != None,
+            PaymentRequest.escalation_due_at <= func.now()
+        )
+        requests = query.order_by(PaymentRequest.escalation_due_at, PaymentRequest.id)\
+            .offset(skip).limit(limit).all()
         
-        return False
+        return {
+            "items": requests,
+            "total": query.count()
+        }
     
-    def get_priority_statistics(self) -> Dict[str, Any]:
+    def get_priority_statistics(self, breakdown: bool = False) -> Dict[str, Any]:
         """
         Get statistics about payment request priorities.
+        
+        Computed with a single grouped query and cached briefly; the cache is
+        dropped when a transaction changing payment requests commits.
+        
+        Args:
+            breakdown: also return counts and amounts per priority, status and currency
         """
-        stats = {}
+        return cache.get_or_set(
+            PRIORITY_STATS_NAMESPACE, ("statistics", breakdown), PRIORITY_STATS_TTL_SECONDS,
+            lambda: self._load_priority_statistics(breakdown)
+        )
+    
+    def _load_priority_statistics(self, breakdown: bool) -> Dict[str, Any]:
+        group_columns = [PaymentRequest.priority]
+        if breakdown:
+            group_columns += [PaymentRequest.status, PaymentRequest.currency_code]
         
-        for priority in PriorityEnum:
-            count = self.db.query(PaymentRequest).filter(
-                PaymentRequest.priority == priority,
-                PaymentRequest.deleted == False
-            ).count()
-            
-            stats[priority.value] = {
-                "count": count,
-                "percentage": 0  # Will be calculated after getting all counts
-            }
+        rows = self.db.query(
+            *group_columns,
+            func.count(PaymentRequest.id).label("count"),
+            func.coalesce(func.sum(PaymentRequest.amount_total), 0).label("amount_total")
+        ).filter(
+            PaymentRequest.deleted == False
+        ).group_by(*group_columns).all()
+        
+        stats = {
+            priority.value: {"count": 0, "percentage": 0, "amount_total": 0.0}
+            for priority in PriorityEnum
+        }
+        details = []
+        for row in rows:
+            priority = PriorityEnum(row.priority).value
+            stats[priority]["count"] += row.count
+            stats[priority]["amount_total"] += float(row.amount_total)
+            if breakdown:
+                details.append({
+                    "priority": priority,
+                    "status": getattr(row.status, "value", row.status),
+                    "currency_code": row.currency_code,
+                    "count": row.count,
+                    "amount_total": float(row.amount_total)
+                })
         
         total = sum(stat["count"] for stat in stats.values())
         
@@ -203,8 +620,156 @@ class PriorityCalculationService:
                     (stats[priority]["count"] / total) * 100, 2
                 )
         
+        if breakdown:
+            stats["breakdown"] = details
         return stats
 
+
+PRIORITY_INPUT_FIELDS = ("amount_total", "due_date", "currency_code", "counterparty_id", "status")
+
+
+@event.listens_for(Session, "before_flush")
+def _score_changed_requests(session: Session, flush_context, instances) -> None:
+    """Keep priority and priority_score current when a request is created or its scoring inputs change."""
+    targets = [obj for obj in session.new if isinstance(obj, PaymentRequest)]
+    targets += [
+        obj for obj in session.dirty
+        if isinstance(obj, PaymentRequest)
+        and any(inspect(obj).attrs[field].history.has_changes() for field in PRIORITY_INPUT_FIELDS)
+    ]
+    if targets:
+        plan = priority_rule_cache.get_plan(session)
+        if plan.rule_count:
+            now = datetime.now()
+            for obj in targets:
+                if obj.due_date is None or obj.amount_total is None:
+                    continue
+                score = round(plan.score_request(obj, now), 2)
+                obj.priority = PriorityPlan.priority_for(score)
+                obj.priority_score = score
+    
+    # escalation_due_at follows the priority, so a re-prioritised request may escalate again
+    for obj in session.dirty:
+        if isinstance(obj, PaymentRequest) and inspect(obj).attrs["priority"].history.has_changes():
+            obj.escalated_at = None
+
+
+PRIORITY_RESCORE_JOB = "priority_rescore"
+
+
+def _rules_fingerprint(db: Session) -> str:
+    """Changes whenever a rule is created, updated or deleted, in any worker."""
+    return db.query(func.md5(func.coalesce(func.string_agg(
+        PaymentPriorityRule.id.cast(String) + ":" + PaymentPriorityRule.updated_at.cast(String),
+        aggregate_order_by(",", PaymentPriorityRule.id)
+    ), ""))).scalar()
+
+
+def rescore_stale_priorities(db: Session) -> Dict[str, Any]:
+    """
+    Scheduled incremental re-scoring.
+    
+    Scores depend on the clock through due_date_urgency (days until due) and
+    time_based rules. Between runs on different days only requests whose due
+    date crossed a tier boundary can change; they are found by due date windows
+    on ix_payment_requests_due_date. A full recalculation runs only on the first
+    run, after a rule change or when the time_based score changes.
+    """
+    state_row = db.query(ScheduledJobState).filter(
+        ScheduledJobState.name == PRIORITY_RESCORE_JOB
+    ).with_for_update().first()
+    previous = state_row.state if state_row else {}
+    
+    service = PriorityCalculationService(db)
+    plan = service.load_plan()
+    now = datetime.now()
+    today = now.date()
+    current = {
+        "date": today.isoformat(),
+        "rules": _rules_fingerprint(db),
+        "time_score": plan.time_score(now),
+    }
+    
+    if previous.get("rules") != current["rules"] or previous.get("time_score") != current["time_score"]:
+        result = service.recalculate_priorities()
+        result["mode"] = "full"
+    elif previous.get("date") != current["date"] and plan.due_date_thresholds():
+        last_run = date.fromisoformat(previous["date"])
+        # A request crosses threshold d on the day when due_date - today becomes d
+        windows = [
+            (last_run + timedelta(days=days + 1), today + timedelta(days=days))
+            for days in plan.due_date_thresholds()
+        ]
+        result = service.recalculate_priorities(due_date_windows=windows)
+        result["mode"] = "incremental"
+    else:
+        result = {"evaluated": 0, "updated": 0, "mode": "noop"}
+    
+    if state_row:
+        state_row.state = current
+    else:
+        db.add(ScheduledJobState(name=PRIORITY_RESCORE_JOB, state=current))
+    return result
+
+
+def emit_due_escalations(db: Session, batch_size: int = 500) -> int:
+    """
+    Scheduled job: record an ESCALATION event for every request whose escalation
+    deadline has passed and mark it escalated.
+    
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so concurrent runs never emit
+    the same escalation twice.
+    
+    Returns:
+        int: number of escalated requests
+    """
+    escalated = 0
+    while True:
+        due = db.query(
+            PaymentRequest.id,
+            PaymentRequest.priority,
+            PaymentRequest.created_by_user_id,
+            PaymentRequest.escalation_due_at
+        ).filter(
+            PaymentRequest.deleted == False,
+            PaymentRequest.escalated_at == None,
+            PaymentRequest.escalation_due_at != None,
+            PaymentRequest.escalation_due_at <= func.now()
+        ).order_by(PaymentRequest.escalation_due_at)\
+         .limit(batch_size)\
+         .with_for_update(skip_locked=True)\
+         .all()
+        if not due:
+            break
+        
+        events = []
+        for row in due:
+            priority = PriorityEnum(row.priority)
+            channels = ESCALATION_RULES_BY_PRIORITY[priority]["notification_channels"]
+            events.append({
+                "request_id": row.id,
+                "event_type": "ESCALATION",
+                "actor_user_id": row.created_by_user_id,
+                "payload": json.dumps({
+                    "priority": priority.value,
+                    "escalation_due_at": row.escalation_due_at.isoformat(),
+                    "notification_channels": channels
+                })
+            })
+        db.execute(insert(RequestEvent), events)
+        db.execute(
+            update(PaymentRequest)
+            .where(PaymentRequest.id.in_([row.id for row in due]))
+            .values(escalated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        escalated += len(due)
+        if len(due) < batch_size:
+            break
+    
+    return escalated
+
+
 def create_default_priority_rules(db: Session) -> None:
     """
     Create default priority rules for the system.
@@ -283,3 +848,4 @@ def create_default_priority_rules(db: Session) -> None:
             db.add(rule)
     
     db.commit()
+    invalidate_priority_rules()
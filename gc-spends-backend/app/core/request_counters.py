@@ -0,0 +1,48 @@
+# app/core/request_counters.py
+import uuid
+from typing import Dict, Optional
+from sqlalchemy import MetaData, Table, Column, String, Integer, Numeric, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+# Materialized view created by migration 948374cbd3fb; kept out of Base.metadata
+# so autogenerate does not try to manage it as a table.
+request_status_counters = Table(
+    "request_status_counters",
+    MetaData(),
+    Column("scope", String(32)),
+    Column("subject_id", UUID(as_uuid=True)),
+    Column("status", String(32)),
+    Column("request_count", Integer),
+    Column("amount_total", Numeric(18, 2)),
+)
+
+SCOPE_ALL = "all"
+SCOPE_CREATOR = "creator"
+SCOPE_REGISTRAR = "registrar"
+SCOPE_SUB_REGISTRAR = "sub_registrar"
+
+
+def get_status_counts(db: Session, scope: str = SCOPE_ALL, subject_id: Optional[uuid.UUID] = None) -> Dict[str, int]:
+    """
+    Get request counts per status for one scope.
+
+    Reads at most one row per status, whatever the size of payment_requests.
+    Counts lag behind writes by up to the refresh interval.
+    """
+    query = select(
+        request_status_counters.c.status,
+        request_status_counters.c.request_count
+    ).where(request_status_counters.c.scope == scope)
+
+    if scope == SCOPE_ALL:
+        query = query.where(request_status_counters.c.subject_id.is_(None))
+    else:
+        query = query.where(request_status_counters.c.subject_id == subject_id)
+
+    return {row.status: int(row.request_count) for row in db.execute(query)}
+
+
+def refresh_request_status_counters(db: Session) -> None:
+    """Recompute the counters without blocking dashboard reads."""
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY request_status_counters"))
@@ -0,0 +1,201 @@
+# app/core/request_stream.py
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from app.core.db import engine
+from app.models import PaymentRequest, SubRegistrarAssignment
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel carrying request create/status-change notifications
+CHANNEL = "request_changes"
+
+EVENT_CREATED = "created"
+EVENT_STATUS_CHANGED = "status_changed"
+# A request was assigned to a sub-registrar; lets streams keep their assignment sets current
+EVENT_ASSIGNED = "assigned"
+
+
+def _status_value(status: Any) -> Optional[str]:
+    if status is None:
+        return None
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def build_notification(
+    event_type: str,
+    request_id: Any,
+    number: Optional[str],
+    created_by_user_id: Any,
+    previous_status: Any,
+    status: Any
+) -> Dict[str, Any]:
+    return {
+        "event": event_type,
+        "request_id": str(request_id),
+        "number": number,
+        "created_by_user_id": str(created_by_user_id) if created_by_user_id else None,
+        "previous_status": _status_value(previous_status),
+        "status": _status_value(status),
+    }
+
+
+def build_assignment_notification(request_id: Any, sub_registrar_id: Any) -> Dict[str, Any]:
+    return {
+        "event": EVENT_ASSIGNED,
+        "request_id": str(request_id),
+        "sub_registrar_id": str(sub_registrar_id) if sub_registrar_id else None,
+    }
+
+
+def publish_request_changes(db: Session, notifications: Iterable[Dict[str, Any]]) -> None:
+    """
+    Queue notifications with pg_notify inside the current transaction.
+
+    Postgres delivers them to listeners only when the transaction commits,
+    so rolled back changes are never announced.
+    """
+    payloads = [json.dumps(n) for n in notifications]
+    if not payloads:
+        return
+    db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": CHANNEL, "payloads": payloads}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_request_changes(session: Session, flush_context) -> None:
+    """Announce new payment requests, status changes and sub-registrar assignments made through the ORM."""
+    notifications: List[Dict[str, Any]] = []
+
+    # Assignments first, so a stream knows the request before its status change arrives
+    for obj in session.new:
+        if isinstance(obj, SubRegistrarAssignment):
+            notifications.append(build_assignment_notification(obj.request_id, obj.sub_registrar_id))
+
+    for obj in session.new:
+        if isinstance(obj, PaymentRequest):
+            notifications.append(build_notification(
+                EVENT_CREATED, obj.id, obj.number, obj.created_by_user_id, None, obj.status
+            ))
+
+    for obj in session.dirty:
+        if not isinstance(obj, PaymentRequest):
+            continue
+        history = inspect(obj).attrs.status.history
+        if not history.added:
+            continue
+        previous = history.deleted[0] if history.deleted else None
+        if _status_value(previous) == _status_value(obj.status):
+            continue
+        notifications.append(build_notification(
+            EVENT_STATUS_CHANGED, obj.id, obj.number, obj.created_by_user_id, previous, obj.status
+        ))
+
+    if notifications:
+        publish_request_changes(session, notifications)
+
+
+class RequestChangeBroker:
+    """
+    Fans out request notifications from one LISTEN connection to every
+    connected SSE client in this process.
+    """
+
+    def __init__(self, channel: str = CHANNEL, queue_size: int = 100):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: Set[tuple] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.add((loop, queue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen_forever, name="request-change-listener", daemon=True)
+                self._thread.start()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed request notification: {payload}")
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, message)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: Dict[str, Any]) -> None:
+        # A slow client loses notifications instead of growing memory without bound
+        if not queue.full():
+            queue.put_nowait(message)
+
+    def _listen_forever(self) -> None:
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Request change listener failed, reconnecting: {e}")
+                time.sleep(2)
+
+    def _listen(self) -> None:
+        listen_for_notifications(self.channel, self.dispatch, lambda: self.subscriber_count > 0)
+
+
+def listen_for_notifications(channel: str, handle: Callable[[str], None], keep_listening: Callable[[], bool]) -> None:
+    """
+    LISTEN on a channel over a dedicated connection and pass each payload to
+    `handle` until keep_listening() returns False (checked at least every 5s).
+    Connection errors propagate so the caller can reconnect.
+    """
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        if callable(getattr(conn, "notifies", None)):
+            # psycopg 3
+            conn.autocommit = True
+            conn.execute(f"LISTEN {channel}")
+            while keep_listening():
+                for notify in conn.notifies(timeout=5.0):
+                    handle(notify.payload)
+        else:
+            # psycopg2
+            conn.set_isolation_level(0)
+            conn.cursor().execute(f"LISTEN {channel}")
+            while keep_listening():
+                if select.select([conn], [], [], 5.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    handle(conn.notifies.pop(0).payload)
+    finally:
+        raw.invalidate()
+
+
+# Global instance
+broker = RequestChangeBroker()
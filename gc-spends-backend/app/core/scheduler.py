@@ -0,0 +1,92 @@
+# app/core/scheduler.py
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """A function run every `interval_seconds` in its own DB session."""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[Session], None], exclusive: bool = True):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.exclusive = exclusive
+        self.thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> bool:
+        """
+        Run the job once.
+
+        Exclusive jobs take a transaction-level advisory lock first, so when several
+        API workers are running only one of them executes the job at a time.
+
+        Returns:
+            bool: False if another worker holds the lock and the run was skipped
+        """
+        db = SessionLocal()
+        try:
+            if self.exclusive:
+                acquired = db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"),
+                    {"name": f"scheduler:{self.name}"}
+                ).scalar()
+                if not acquired:
+                    db.rollback()
+                    return False
+            self.func(db)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Scheduled job {self.name} failed: {e}")
+            return False
+        finally:
+            db.close()
+
+
+class Scheduler:
+    """
+    Minimal in-process scheduler running periodic jobs on daemon threads.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self._stop = threading.Event()
+        self._started = False
+
+    def add_job(self, name: str, interval_seconds: float, func: Callable[[Session], None], exclusive: bool = True) -> PeriodicJob:
+        job = PeriodicJob(name, interval_seconds, func, exclusive)
+        self.jobs[name] = job
+        if self._started:
+            self._start_job(job)
+        return job
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        self._stop.clear()
+        for job in self.jobs.values():
+            self._start_job(job)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._started = False
+
+    def _start_job(self, job: PeriodicJob) -> None:
+        def loop():
+            while not self._stop.wait(job.interval_seconds):
+                job.run_once()
+
+        job.thread = threading.Thread(target=loop, name=f"scheduler-{job.name}", daemon=True)
+        job.thread.start()
+
+
+# Global instance
+scheduler = Scheduler()
@@ -35,6 +35,16 @@ def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     return sub
 
+def user_id_from_token(token: Optional[str]) -> Optional[str]:
+    """Subject of a valid token, or None; for callers that must not fail on a bad token"""
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 def get_current_user(
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db)
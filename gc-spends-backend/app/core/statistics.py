@@ -0,0 +1,31 @@
+# app/core/statistics.py
+from typing import Any, Dict, Optional
+from sqlalchemy import Select, func, select, true
+from sqlalchemy.orm import Session
+
+
+def filtered_counts(model: Any, counts: Dict[str, Optional[Any]], *where: Any) -> Select:
+    """
+    One aggregate over a table: a count(*) FILTER (WHERE ...) per named condition,
+    or a plain count(*) where the condition is None. `where` narrows all counts.
+    """
+    columns = [
+        (func.count() if condition is None else func.count().filter(condition)).label(name)
+        for name, condition in counts.items()
+    ]
+    return select(*columns).select_from(model).where(*where)
+
+
+def collect_counts(db: Session, *aggregates: Select) -> Dict[str, int]:
+    """
+    Run aggregates built by filtered_counts in a single round trip.
+
+    Each aggregate returns exactly one row, so they are cross joined into one
+    SELECT; labels must be unique across aggregates.
+    """
+    subqueries = [aggregate.subquery() for aggregate in aggregates]
+    query = select(*[column for subquery in subqueries for column in subquery.c]).select_from(subqueries[0])
+    for subquery in subqueries[1:]:
+        query = query.join(subquery, true())
+    row = db.execute(query).one()
+    return {name: int(value) for name, value in row._mapping.items()}
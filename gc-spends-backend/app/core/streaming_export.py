@@ -0,0 +1,40 @@
+# app/core/streaming_export.py
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+from app.core.db import SessionLocal
+from app.core.file_formats import get_writer_format
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def stream_query(query_factory: Callable[[Session], Query]) -> Iterator[Any]:
+    """
+    Iterate a query through a server-side cursor in its own session.
+
+    The request's session is closed before a StreamingResponse body runs, so the
+    export opens (and closes) a session of its own.
+    """
+    db = SessionLocal()
+    try:
+        for row in query_factory(db).yield_per(EXPORT_BATCH_SIZE):
+            yield row
+    finally:
+        db.close()
+
+
+def export_response(
+    header: List[str],
+    rows: Iterable[Sequence[Any]],
+    file_format: str,
+    filename: str,
+    sheet_name: str = "Data"
+) -> StreamingResponse:
+    """StreamingResponse for an export; memory use does not grow with the row count."""
+    file_format = get_writer_format(file_format)
+    return StreamingResponse(
+        file_format.write(header, rows, sheet_name),
+        media_type=file_format.media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{file_format.extension}"}
+    )
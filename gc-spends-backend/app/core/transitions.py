@@ -0,0 +1,176 @@
+# app/core/transitions.py
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Optional
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.orm import Session
+from app.models import PaymentRequest, RequestEvent
+from app.common.enums import RequestStatus
+from app.core.cache import invalidate_on_commit
+from app.core.priority import PriorityCalculationService, PRIORITY_STATS_NAMESPACE
+from app.core.request_stream import EVENT_STATUS_CHANGED, build_notification, publish_request_changes
+
+
+@dataclass(frozen=True)
+class Transition:
+    """
+    Workflow action: statuses it may start from, status it leads to and the
+    event recorded for it.
+    """
+    from_statuses: tuple
+    to_status: str
+    event_type: str
+    default_comment: str
+
+
+# Same status rules as the single-request /submit, /approve, /reject and
+# /add-to-registry endpoints in requests/router.py
+TRANSITIONS: Dict[str, Transition] = {
+    "submit": Transition(
+        from_statuses=(RequestStatus.DRAFT.value,),
+        to_status=RequestStatus.SUBMITTED.value,
+        event_type="SUBMITTED",
+        default_comment="Заявка отправлена на рассмотрение"
+    ),
+    "approve": Transition(
+        from_statuses=(RequestStatus.CLASSIFIED.value,),
+        to_status=RequestStatus.CLASSIFIED.value,
+        event_type="APPROVED",
+        default_comment="Заявка утверждена"
+    ),
+    "reject": Transition(
+        from_statuses=(RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value),
+        to_status=RequestStatus.REJECTED.value,
+        event_type="REJECTED",
+        default_comment="Заявка отклонена"
+    ),
+    "add-to-registry": Transition(
+        from_statuses=(RequestStatus.CLASSIFIED.value,),
+        to_status=RequestStatus.IN_REGISTER.value,
+        event_type="ADDED_TO_REGISTRY",
+        default_comment="Заявка добавлена в реестр"
+    ),
+}
+
+
+def _status_value(status: Any) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def apply_batch_transition(
+    db: Session,
+    request_ids: Iterable[uuid.UUID],
+    action: str,
+    actor_user_id: uuid.UUID,
+    comment: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Apply one workflow action to many requests.
+
+    All transitions are validated with a single locking SELECT, applied with one
+    set-based UPDATE and recorded with one bulk INSERT of request events.
+    The caller owns the transaction and must commit.
+
+    Returns:
+        list: per-request outcomes in the order the ids were given
+    """
+    transition = TRANSITIONS[action]
+    ids = list(dict.fromkeys(request_ids))
+    if not ids:
+        return []
+
+    rows = db.execute(
+        select(
+            PaymentRequest.id,
+            PaymentRequest.number,
+            PaymentRequest.created_by_user_id,
+            PaymentRequest.status,
+            PaymentRequest.deleted
+        )
+        .where(PaymentRequest.id.in_(ids))
+        .with_for_update()
+    ).all()
+    current = {row.id: row for row in rows}
+
+    outcomes: Dict[uuid.UUID, Dict[str, Any]] = {}
+    eligible = []
+    for request_id in ids:
+        row = current.get(request_id)
+        if row is None or row.deleted:
+            outcomes[request_id] = {
+                "request_id": request_id,
+                "success": False,
+                "error": "Request not found"
+            }
+            continue
+
+        previous_status = _status_value(row.status)
+        if previous_status not in transition.from_statuses:
+            outcomes[request_id] = {
+                "request_id": request_id,
+                "success": False,
+                "previous_status": previous_status,
+                "status": previous_status,
+                "error": f"Action '{action}' is not allowed for requests in status {previous_status}"
+            }
+            continue
+
+        outcomes[request_id] = {
+            "request_id": request_id,
+            "success": True,
+            "previous_status": previous_status,
+            "status": transition.to_status
+        }
+        eligible.append(request_id)
+
+    if eligible:
+        updated_ids = set(db.execute(
+            update(PaymentRequest)
+            .where(
+                PaymentRequest.id.in_(eligible),
+                PaymentRequest.status.in_(transition.from_statuses)
+            )
+            .values(status=transition.to_status, updated_at=func.now())
+            .returning(PaymentRequest.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all())
+
+        for request_id in eligible:
+            if request_id not in updated_ids:
+                outcomes[request_id].update(
+                    success=False,
+                    status=outcomes[request_id]["previous_status"],
+                    error="Request status was changed concurrently"
+                )
+
+        events = [
+            {
+                "request_id": request_id,
+                "event_type": transition.event_type,
+                "actor_user_id": actor_user_id,
+                "payload": comment or transition.default_comment
+            }
+            for request_id in eligible if request_id in updated_ids
+        ]
+        if events:
+            db.execute(insert(RequestEvent), events)
+
+        # Core UPDATE bypasses the ORM flush hooks: re-score and announce the changes here
+        if updated_ids:
+            PriorityCalculationService(db).recalculate_priorities(request_ids=list(updated_ids))
+            invalidate_on_commit(db, PRIORITY_STATS_NAMESPACE)
+
+        publish_request_changes(db, [
+            build_notification(
+                EVENT_STATUS_CHANGED,
+                request_id,
+                current[request_id].number,
+                current[request_id].created_by_user_id,
+                outcomes[request_id]["previous_status"],
+                transition.to_status
+            )
+            for request_id in eligible
+            if request_id in updated_ids and outcomes[request_id]["previous_status"] != transition.to_status
+        ])
+
+    return [outcomes[request_id] for request_id in ids]
@@ -0,0 +1,112 @@
+# app/core/work_queue.py
+import uuid
+from datetime import timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.orm import Session
+from app.models import PaymentRequest, SubRegistrarAssignment
+from app.common.enums import RequestStatus, DistributionStatus, SubRegistrarAssignmentStatus
+
+QUEUE_REGISTRAR = "registrar"
+QUEUE_SUB_REGISTRAR = "sub-registrar"
+QUEUES = (QUEUE_REGISTRAR, QUEUE_SUB_REGISTRAR)
+
+
+def _queue_filters(queue: str, user_id: uuid.UUID) -> list:
+    """Requests that belong to a queue, regardless of claims."""
+    filters = [PaymentRequest.deleted == False]
+    if queue == QUEUE_REGISTRAR:
+        # Approved or classified requests still waiting for distribution
+        filters += [
+            PaymentRequest.status.in_([RequestStatus.APPROVED.value, RequestStatus.CLASSIFIED.value]),
+            PaymentRequest.distribution_status == DistributionStatus.PENDING.value
+        ]
+    elif queue == QUEUE_SUB_REGISTRAR:
+        # Requests with an open assignment for this sub-registrar
+        filters.append(PaymentRequest.id.in_(
+            select(SubRegistrarAssignment.request_id).where(
+                SubRegistrarAssignment.sub_registrar_id == user_id,
+                SubRegistrarAssignment.status.in_([
+                    SubRegistrarAssignmentStatus.ASSIGNED.value,
+                    SubRegistrarAssignmentStatus.IN_PROGRESS.value
+                ])
+            )
+        ))
+    else:
+        raise ValueError(f"Unknown queue: {queue}")
+    return filters
+
+
+def _queue_order() -> list:
+    return [PaymentRequest.priority_score.desc().nulls_last(), PaymentRequest.due_date, PaymentRequest.id]
+
+
+def claim_next(db: Session, queue: str, user_id: uuid.UUID, limit: int, lease_seconds: int) -> List[PaymentRequest]:
+    """
+    Claim the next `limit` unclaimed requests of a queue for a user.
+
+    Candidate rows are locked with FOR UPDATE SKIP LOCKED, so concurrent callers
+    never wait on each other and never receive the same request. Requests whose
+    lease expired are claimable again. The caller must commit.
+    """
+    candidates = select(PaymentRequest.id).where(
+        *_queue_filters(queue, user_id),
+        or_(
+            PaymentRequest.claimed_by_user_id == None,
+            PaymentRequest.claim_expires_at < func.now()
+        )
+    ).order_by(*_queue_order()).limit(limit).with_for_update(skip_locked=True)
+
+    claimed_ids = db.execute(
+        update(PaymentRequest)
+        .where(PaymentRequest.id.in_(candidates.scalar_subquery()))
+        .values(
+            claimed_by_user_id=user_id,
+            claim_expires_at=func.now() + timedelta(seconds=lease_seconds)
+        )
+        .returning(PaymentRequest.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not claimed_ids:
+        return []
+
+    return db.query(PaymentRequest).filter(
+        PaymentRequest.id.in_(claimed_ids)
+    ).order_by(*_queue_order()).populate_existing().all()
+
+
+def get_claims(db: Session, queue: str, user_id: uuid.UUID) -> List[PaymentRequest]:
+    """Unexpired claims of a user in a queue, in queue order."""
+    return db.query(PaymentRequest).filter(
+        *_queue_filters(queue, user_id),
+        PaymentRequest.claimed_by_user_id == user_id,
+        PaymentRequest.claim_expires_at >= func.now()
+    ).order_by(*_queue_order()).all()
+
+
+def renew_claims(db: Session, request_ids: List[uuid.UUID], user_id: uuid.UUID, lease_seconds: int) -> List[uuid.UUID]:
+    """Extend the lease of unexpired claims held by the user. Returns the renewed ids."""
+    return db.execute(
+        update(PaymentRequest)
+        .where(
+            PaymentRequest.id.in_(request_ids),
+            PaymentRequest.claimed_by_user_id == user_id,
+            PaymentRequest.claim_expires_at >= func.now()
+        )
+        .values(claim_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        .returning(PaymentRequest.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+
+def release_claims(db: Session, request_ids: Optional[List[uuid.UUID]], user_id: uuid.UUID) -> List[uuid.UUID]:
+    """Give claims back to the queue. With request_ids=None all claims of the user are released."""
+    query = update(PaymentRequest).where(PaymentRequest.claimed_by_user_id == user_id)
+    # An empty list releases nothing
+    if request_ids is not None:
+        query = query.where(PaymentRequest.id.in_(request_ids))
+    return db.execute(
+        query.values(claimed_by_user_id=None, claim_expires_at=None)
+        .returning(PaymentRequest.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
@@ -27,8 +27,15 @@ from app.modules.file_management.router import router as file_management_router
 from app.modules.monitoring.router import router as monitoring_router
 from app.modules.registrar_assignment import router as registrar_assignment_router
 from app.modules.sub_registrar_assignment_data import router as sub_registrar_assignment_data_router
+from app.modules.work_queue.router import router as work_queue_router
 from app.core.idempotency import IdempotencyMiddleware
 from app.core.monitoring import monitoring_middleware
+from app.core.scheduler import scheduler
+from app.core.request_counters import refresh_request_status_counters
+from app.core.priority import rescore_stale_priorities, emit_due_escalations, PRIORITY_RESCORE_JOB
+from app.core.audit_log import audit_actor, audit_writer, create_upcoming_audit_partitions, PARTITION_CHECK_SECONDS
+from app.core.security import user_id_from_token
+from app.modules.dictionaries.integrity import run_scheduled_integrity_checks
 
 app = FastAPI(
     title="GC Spends API",
@@ -177,7 +184,8 @@ app.add_middleware(
     expose_headers=[
         "X-Process-Time",
         "X-Request-ID",
-        "X-Total-Count"
+        "X-Total-Count",
+        "X-Next-Cursor"
     ],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
@@ -203,7 +211,8 @@ api.add_middleware(
     expose_headers=[
         "X-Process-Time",
         "X-Request-ID", 
-        "X-Total-Count"
+        "X-Total-Count",
+        "X-Next-Cursor"
     ],
     max_age=3600,
 )
@@ -267,6 +276,33 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+# Attribute dictionary changes to the calling user (see app.core.audit_log)
+@api.middleware("http")
+async def bind_audit_actor(request: Request, call_next):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    with audit_actor(user_id_from_token(token) if scheme.lower() == "bearer" else None):
+        return await call_next(request)
+
+@app.on_event("startup")
+def start_background_jobs():
+    if not settings.scheduler_enabled:
+        return
+    # Keeps request statistics (request_status_counters view) current
+    scheduler.add_job("request_status_counters", settings.request_counters_refresh_seconds, refresh_request_status_counters)
+    # Re-scores requests whose due date moved into another priority window
+    scheduler.add_job(PRIORITY_RESCORE_JOB, settings.priority_rescore_interval_seconds, rescore_stale_priorities)
+    # Records ESCALATION events for requests past their escalation deadline
+    scheduler.add_job("priority_escalations", settings.escalation_check_interval_seconds, emit_due_escalations)
+    scheduler.add_job("dictionary_audit_partitions", PARTITION_CHECK_SECONDS, create_upcoming_audit_partitions).run_once()
+    scheduler.add_job("dictionary_integrity_checks", settings.integrity_check_interval_seconds, run_scheduled_integrity_checks)
+    scheduler.start()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    scheduler.stop()
+    # Write out audit entries still queued
+    audit_writer.flush()
+
 # Add explicit OPTIONS handler for API
 @api.options("/{path:path}")
 async def options_handler(path: str):
@@ -305,6 +341,7 @@ api.include_router(file_management_router)
 api.include_router(monitoring_router)
 api.include_router(registrar_assignment_router)
 api.include_router(sub_registrar_assignment_data_router)
+api.include_router(work_queue_router)
 
 app.mount(settings.api_prefix, api)
 
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import uuid
 from datetime import date, datetime  # <-- use Python type for annotations
-from sqlalchemy import String, Boolean, Date as SA_Date, DateTime as SA_DateTime, ForeignKey, Numeric, text, JSON, Enum as SQLEnum
+from sqlalchemy import String, Boolean, Date as SA_Date, DateTime as SA_DateTime, ForeignKey, Numeric, text, JSON, Enum as SQLEnum, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
 from app.common.enums import (
@@ -199,11 +200,39 @@ class PaymentRequest(Base):
     # Phase 2: Priority management
     priority: Mapped[PaymentPriority] = mapped_column(SQLEnum(PaymentPriority, name="payment_priority", values_callable=lambda obj: [e.value for e in obj]), server_default=text("'normal'"))
     priority_score: Mapped[float | None] = mapped_column(Numeric(5, 2), nullable=True)  # Calculated priority score
+    # Escalation deadline, maintained by Postgres (see migration 62957fd82ee9)
+    escalation_due_at: Mapped[datetime | None] = mapped_column(
+        SA_DateTime,
+        Computed(
+            "CASE priority "
+            "WHEN 'critical' THEN created_at + interval '15 minutes' "
+            "WHEN 'urgent' THEN created_at + interval '60 minutes' "
+            "WHEN 'high' THEN created_at + interval '240 minutes' END",
+            persisted=True
+        )
+    )
+    escalated_at: Mapped[datetime | None] = mapped_column(SA_DateTime, nullable=True)  # Set when the ESCALATION event is emitted
+    # Work queue lease (see app.core.work_queue)
+    claimed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    claim_expires_at: Mapped[datetime | None] = mapped_column(SA_DateTime, nullable=True)
     # Split request fields
     original_request_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("payment_requests.id"), nullable=True)  # Reference to original request if this is a split
     split_sequence: Mapped[int | None] = mapped_column(nullable=True)  # Sequence number for split requests (1, 2, 3, etc.)
     is_split_request: Mapped[bool] = mapped_column(Boolean, server_default=text("false"))  # Flag to indicate if this is a split request
     deleted: Mapped[bool] = mapped_column(Boolean, server_default=text("false"))  # Soft delete flag
+    # Full-text search document, maintained by Postgres (see migration 799764cc8931)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(number, '') || ' ' || coalesce(doc_number, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(product_service, '') || ' ' || coalesce(expense_article_text, '')), 'C') || "
+            "setweight(to_tsvector('simple', coalesce(product_service, '') || ' ' || coalesce(expense_article_text, '')), 'D')",
+            persisted=True
+        ),
+        deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(SA_DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at: Mapped[datetime] = mapped_column(SA_DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
     
@@ -428,6 +457,70 @@ class PaymentPriorityRule(Base):
     # Relationships
     creator: Mapped["User"] = relationship("User")
 
+class ScheduledJobState(Base):
+    __tablename__ = "scheduled_job_state"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)  # Job name in app.core.scheduler
+    state: Mapped[dict] = mapped_column(JSON)  # Job specific progress marker
+    updated_at: Mapped[datetime] = mapped_column(SA_DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+
+class ImportJob(Base):
+    """Background dictionary import (see app.modules.dictionaries.import_jobs)"""
+    __tablename__ = "import_jobs"
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    dictionary_type: Mapped[str] = mapped_column(String(64))
+    mode: Mapped[str] = mapped_column(String(16), server_default=text("'skip'"))  # skip | update
+    filename: Mapped[str] = mapped_column(String(255))
+    file_path: Mapped[str] = mapped_column(String(500))  # Upload stored on disk
+    status: Mapped[str] = mapped_column(String(16), server_default=text("'pending'"))  # pending | running | completed | failed
+    chunk_size: Mapped[int]
+    total_rows: Mapped[int | None] = mapped_column(nullable=True)
+    processed_rows: Mapped[int] = mapped_column(server_default=text("0"))
+    imported_count: Mapped[int] = mapped_column(server_default=text("0"))
+    error_count: Mapped[int] = mapped_column(server_default=text("0"))
+    errors: Mapped[list] = mapped_column(JSON, server_default=text("'[]'"))  # First errors only
+    last_chunk: Mapped[int] = mapped_column(server_default=text("-1"))  # Last committed chunk, resume point
+    error_message: Mapped[str | None] = mapped_column(String(2000), nullable=True)
+    created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(SA_DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at: Mapped[datetime] = mapped_column(SA_DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+    finished_at: Mapped[datetime | None] = mapped_column(SA_DateTime, nullable=True)
+
+class DictionaryAuditLog(Base):
+    """Append-only log of dictionary changes, written by app.core.audit_log"""
+    __tablename__ = "dictionary_audit_log"
+    # Monthly range partitions (dictionary_audit_log_YYYY_MM) are created by app.core.audit_log
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    created_at: Mapped[datetime] = mapped_column(SA_DateTime, primary_key=True)
+    dictionary_type: Mapped[str] = mapped_column(String(32))  # counterparties | expense-articles | vat-rates | currencies | exchange-rates
+    entity_id: Mapped[str] = mapped_column(String(64))  # Primary key values joined with ':'
+    entity_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    action: Mapped[str] = mapped_column(String(16))  # create | update | delete | import
+    user_id: Mapped[uuid.UUID | None] = mapped_column(nullable=True)  # No FK: rows outlive users and are written in batches
+    changes: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # {field: {"old": ..., "new": ...}}
+
+class DictionaryAuditDaily(Base):
+    """Per-day action counts of dictionary_audit_log, maintained by the audit writer"""
+    __tablename__ = "dictionary_audit_daily"
+    day: Mapped[date] = mapped_column(SA_Date, primary_key=True)
+    dictionary_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    action: Mapped[str] = mapped_column(String(16), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)  # Nil UUID for changes without a known user
+    action_count: Mapped[int] = mapped_column(server_default=text("0"))
+
+class DictionaryIntegrityRun(Base):
+    """Result of one run of the dictionary integrity checks (see app.modules.dictionaries.integrity)"""
+    __tablename__ = "dictionary_integrity_runs"
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    dictionary_type: Mapped[str] = mapped_column(String(32))
+    trigger: Mapped[str] = mapped_column(String(16))  # manual | scheduled
+    started_at: Mapped[datetime] = mapped_column(SA_DateTime)
+    finished_at: Mapped[datetime] = mapped_column(SA_DateTime)
+    duration_ms: Mapped[int]
+    issue_count: Mapped[int]
+    issues: Mapped[list] = mapped_column(JSONB)  # Issues as returned by the integrity endpoint
+    checks: Mapped[list] = mapped_column(JSONB)  # Per check: name, status, duration_ms, issue_count, truncated
+
 class FileValidationRule(Base):
     __tablename__ = "file_validation_rules"
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func, desc, or_
 from app.core.db import get_db
+from app.core.statistics import filtered_counts, collect_counts
 from app.models import User, Role, UserRole, PaymentRequest, Position, Department, UserPosition
 from . import schemas
 import uuid
@@ -14,10 +15,16 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/statistics", response_model=schemas.SystemStatistics)
 def get_system_statistics(db: Session = Depends(get_db)):
     """Get system-wide statistics for admin dashboard"""
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    total_roles = db.query(Role).count()
-    total_requests = db.query(PaymentRequest).filter(PaymentRequest.deleted == False).count()
+    counts = collect_counts(
+        db,
+        filtered_counts(User, {"total_users": None, "active_users": User.is_active == True}),
+        filtered_counts(Role, {"total_roles": None}),
+        filtered_counts(PaymentRequest, {"total_requests": None}, PaymentRequest.deleted == False)
+    )
+    total_users = counts["total_users"]
+    active_users = counts["active_users"]
+    total_roles = counts["total_roles"]
+    total_requests = counts["total_requests"]
     
     # Simple health check - in production this would be more sophisticated
     system_health = "healthy" if total_users > 0 else "warning"
@@ -471,8 +478,9 @@ def bulk_delete_users(payload: schemas.BulkUserDelete, db: Session = Depends(get
 @router.get("/roles/statistics", response_model=schemas.RoleStatistics)
 def get_role_statistics(db: Session = Depends(get_db)):
     """Get role usage statistics"""
-    total_roles = db.query(Role).count()
-    active_roles = db.query(Role).filter(Role.is_active == True).count()
+    counts = collect_counts(db, filtered_counts(Role, {"total": None, "active": Role.is_active == True}))
+    total_roles = counts["total"]
+    active_roles = counts["active"]
     
     # Get role usage counts
     role_usage = db.query(
@@ -1,68 +1,226 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 from app.core.db import get_db
-from app.models import User, PaymentRequest, ExpenseArticle, Counterparty
+from app.core.audit_log import AUDITED_MODELS, UNKNOWN_USER_ID
+from .integrity import get_latest_run, run_integrity_checks, run_to_dict, TRIGGER_MANUAL
+from app.models import User, DictionaryAuditLog, DictionaryAuditDaily
 from . import schemas
+import base64
+import json
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
 
 router = APIRouter(prefix="/dictionaries/audit", tags=["dictionaries-audit"])
 
-@router.get("/history/{dictionary_type}")
+AUDITED_DICTIONARIES = {dictionary_type for dictionary_type, _ in AUDITED_MODELS.values()}
+RECENT_ACTIVITY_DAYS = 7
+SYSTEM_USER_NAME = "system"
+
+def _check_dictionary_type(dictionary_type: str) -> None:
+    if dictionary_type not in AUDITED_DICTIONARIES:
+        raise HTTPException(status_code=400, detail=f"Unsupported dictionary type: {dictionary_type}")
+
+def _parse_day(value: Optional[str], name: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}, expected YYYY-MM-DD")
+
+def _parse_user_id(value: Optional[str]) -> Optional[uuid.UUID]:
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+
+def _encode_audit_cursor(created_at: datetime, entry_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), str(entry_id)]).encode()).decode()
+
+def _decode_audit_cursor(cursor: str):
+    try:
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(entry_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _user_names(db: Session, user_ids: Iterable[Optional[uuid.UUID]]) -> Dict[uuid.UUID, str]:
+    ids = {user_id for user_id in user_ids if user_id is not None and user_id != UNKNOWN_USER_ID}
+    if not ids:
+        return {}
+    return dict(db.query(User.id, User.full_name).filter(User.id.in_(ids)).all())
+
+@router.get("/history/{dictionary_type}", response_model=schemas.AuditHistoryOut)
 def get_dictionary_audit_history(
     dictionary_type: str,
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     action: Optional[str] = Query(None, description="Filter by action type"),
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    entity_id: Optional[str] = Query(None, description="Filter by dictionary entry ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Get audit history for a specific dictionary type"""
-    
-    # TODO: Implement real audit log query from database
-    # For now, return empty results until audit logging is implemented
-    return {
-        "entries": [],
-        "total": 0,
-        "page": page,
-        "limit": limit,
-        "total_pages": 0
-    }
+    """
+    Get audit history for a specific dictionary type, newest first.
+
+    Pages are read by keyset on (created_at, id): pass next_cursor from the
+    previous page as `cursor`. Without a cursor, `page` falls back to OFFSET.
+    `total` is summed from the daily rollups rather than counted in the log.
+    """
+    _check_dictionary_type(dictionary_type)
+    start = _parse_day(start_date, "start_date")
+    end = _parse_day(end_date, "end_date")
+    actor_id = _parse_user_id(user_id)
+
+    log = DictionaryAuditLog
+    filters = [log.dictionary_type == dictionary_type]
+    if start:
+        filters.append(log.created_at >= start)
+    if end:
+        filters.append(log.created_at < end + timedelta(days=1))
+    if action:
+        filters.append(log.action == action)
+    if actor_id:
+        filters.append(log.user_id == actor_id)
+    if entity_id:
+        filters.append(log.entity_id == entity_id)
+
+    query = db.query(log).filter(*filters).order_by(log.created_at.desc(), log.id.desc())
+    if cursor:
+        cursor_created_at, cursor_id = _decode_audit_cursor(cursor)
+        query = query.filter(tuple_(log.created_at, log.id) < tuple_(cursor_created_at, cursor_id))
+    else:
+        query = query.offset((page - 1) * limit)
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_audit_cursor(rows[-1].created_at, rows[-1].id)
+
+    if entity_id:
+        # One entry's history is small and served by the entity index
+        total = db.query(func.count()).select_from(log).filter(*filters).scalar()
+    else:
+        daily = DictionaryAuditDaily
+        rollup_filters = [daily.dictionary_type == dictionary_type]
+        if start:
+            rollup_filters.append(daily.day >= start)
+        if end:
+            rollup_filters.append(daily.day <= end)
+        if action:
+            rollup_filters.append(daily.action == action)
+        if actor_id:
+            rollup_filters.append(daily.user_id == actor_id)
+        total = db.query(func.coalesce(func.sum(daily.action_count), 0)).filter(*rollup_filters).scalar()
+    total = int(total)
+
+    names = _user_names(db, (row.user_id for row in rows))
+    entries = [
+        schemas.AuditEntryOut(
+            id=row.id,
+            action=row.action,
+            item_id=row.entity_id,
+            item_name=row.entity_name,
+            user_id=row.user_id,
+            user_name=names.get(row.user_id, SYSTEM_USER_NAME),
+            timestamp=row.created_at,
+            changes=row.changes
+        )
+        for row in rows
+    ]
+    return schemas.AuditHistoryOut(
+        entries=entries,
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit,
+        next_cursor=next_cursor
+    )
 
-@router.get("/statistics/{dictionary_type}")
+@router.get("/statistics/{dictionary_type}", response_model=schemas.AuditStatisticsOut)
 def get_dictionary_audit_statistics(
     dictionary_type: str,
     db: Session = Depends(get_db)
 ):
-    """Get audit statistics for a dictionary type"""
-    
-    # TODO: Implement real statistics calculation from audit logs
-    # For now, return empty statistics until audit logging is implemented
-    return {
-        "total_actions": 0,
-        "actions_by_type": {},
-        "actions_by_user": {},
-        "recent_activity": 0,
-        "data_integrity_issues": 0
-    }
+    """
+    Get audit statistics for a dictionary type.
+
+    Read from the daily rollups: one row per day, action and user, so the cost
+    does not grow with the size of the log.
+    """
+    _check_dictionary_type(dictionary_type)
+    daily = DictionaryAuditDaily
+    since = datetime.utcnow().date() - timedelta(days=RECENT_ACTIVITY_DAYS)
+    rows = db.query(
+        daily.action,
+        daily.user_id,
+        func.sum(daily.action_count).label("total"),
+        func.coalesce(func.sum(daily.action_count).filter(daily.day >= since), 0).label("recent")
+    ).filter(daily.dictionary_type == dictionary_type).group_by(daily.action, daily.user_id).all()
 
-@router.get("/integrity/{dictionary_type}")
+    names = _user_names(db, (row.user_id for row in rows))
+    actions_by_type: Dict[str, int] = {}
+    actions_by_user: Dict[str, int] = {}
+    recent_activity = 0
+    for row in rows:
+        count = int(row.total)
+        actions_by_type[row.action] = actions_by_type.get(row.action, 0) + count
+        user_name = names.get(row.user_id, SYSTEM_USER_NAME)
+        actions_by_user[user_name] = actions_by_user.get(user_name, 0) + count
+        recent_activity += int(row.recent)
+
+    integrity = get_latest_run(db, dictionary_type)
+    return schemas.AuditStatisticsOut(
+        total_actions=sum(actions_by_type.values()),
+        actions_by_type=actions_by_type,
+        actions_by_user=actions_by_user,
+        recent_activity=recent_activity,
+        data_integrity_issues=integrity["total"] if integrity else 0
+    )
+
+def _integrity_report(report: Dict, severity: Optional[str]) -> schemas.IntegrityReportOut:
+    issues = report["issues"]
+    if severity:
+        issues = [issue for issue in issues if issue["severity"] == severity]
+    return schemas.IntegrityReportOut(**{**report, "issues": issues, "total": len(issues)})
+
+@router.get("/integrity/{dictionary_type}", response_model=schemas.IntegrityReportOut)
 def get_data_integrity_issues(
     dictionary_type: str,
     severity: Optional[str] = Query(None, description="Filter by severity level"),
     db: Session = Depends(get_db)
 ):
-    """Get data integrity issues for a dictionary type"""
-    
-    # TODO: Implement real data integrity checks
-    # For now, return empty results until integrity checking is implemented
-    return {
-        "issues": [],
-        "total": 0
-    }
+    """
+    Get data integrity issues for a dictionary type.
+
+    Returns the result of the latest check run (scheduled or manual); the
+    checks are run once here only if they have never run for this dictionary.
+    """
+    _check_dictionary_type(dictionary_type)
+    report = get_latest_run(db, dictionary_type)
+    if report is None:
+        run = run_integrity_checks(db, dictionary_type, TRIGGER_MANUAL)
+        db.commit()
+        report = run_to_dict(run)
+    return _integrity_report(report, severity)
+
+@router.post("/integrity/{dictionary_type}/run", response_model=schemas.IntegrityReportOut)
+def run_data_integrity_checks(
+    dictionary_type: str,
+    db: Session = Depends(get_db)
+):
+    """Run the integrity checks of a dictionary type now and return the new result"""
+    _check_dictionary_type(dictionary_type)
+    run = run_integrity_checks(db, dictionary_type, TRIGGER_MANUAL)
+    db.commit()
+    return _integrity_report(run_to_dict(run), None)
 
 @router.post("/export/{dictionary_type}")
 def export_dictionary_audit_log(
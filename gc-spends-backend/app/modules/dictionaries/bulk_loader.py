@@ -0,0 +1,197 @@
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import Integer, insert, text
+from sqlalchemy import column as sql_column, table as sql_table
+from sqlalchemy.orm import Session
+from app.models import Counterparty, ExpenseArticle, VatRate, Currency, ExchangeRate
+from app.core.cache import invalidate_model_on_commit
+from app.core.audit_log import ACTION_IMPORT, ACTION_UPDATE, record_bulk_changes
+
+MODE_SKIP = "skip"
+MODE_UPDATE = "update"
+IMPORT_MODES = (MODE_SKIP, MODE_UPDATE)
+
+# Описание загружаемых справочников: ключ, по которому ищутся существующие записи,
+# и колонки, которые пишутся из файла
+DICTIONARY_TABLES = {
+    'counterparties': {
+        'model': Counterparty,
+        'key': ['name'],
+        'columns': ['name', 'tax_id', 'category', 'is_active'],
+        'duplicate_message': "Контрагент с таким названием уже существует",
+    },
+    'expense-articles': {
+        'model': ExpenseArticle,
+        'key': ['code'],
+        'columns': ['code', 'name', 'description', 'is_active'],
+        'duplicate_message': "Статья расходов с таким кодом уже существует",
+        # expense_articles.code имеет уникальный индекс
+        'on_conflict': True,
+    },
+    'vat-rates': {
+        'model': VatRate,
+        'key': ['rate'],
+        'columns': ['rate', 'name', 'is_active'],
+        'duplicate_message': "Ставка НДС с таким значением уже существует",
+    },
+    'currencies': {
+        'model': Currency,
+        'key': ['code'],
+        'columns': ['code', 'scale'],
+        'duplicate_message': "Валюта с таким кодом уже существует",
+        'on_conflict': True,
+    },
+    'exchange-rates': {
+        'model': ExchangeRate,
+        'key': ['date', 'currency_code'],
+        'columns': ['date', 'currency_code', 'rate'],
+        'duplicate_message': "Курс валюты на эту дату уже загружен",
+        'on_conflict': True,
+        # Строки со ссылкой на отсутствующую запись отклоняются до вставки
+        'references': [('currency_code', 'currencies', 'code', "Валюта с таким кодом не найдена")],
+    },
+}
+
+STAGING_BATCH_SIZE = 5000
+
+
+class BulkLoadResult:
+    """Итог загрузки; позиции - индексы во входном списке строк"""
+
+    def __init__(self):
+        self.inserted: List[Tuple[int, Dict[str, Any]]] = []
+        self.updated: List[Tuple[int, Dict[str, Any]]] = []
+        self.conflicts: List[int] = []
+        # (позиция, поле, сообщение) для строк, отклоненных проверкой ссылок
+        self.rejected: List[Tuple[int, str, str]] = []
+
+
+def bulk_load(
+    db: Session,
+    dictionary_type: str,
+    items: Iterable[Dict[str, Any]],
+    mode: str = MODE_SKIP,
+    audit_action: str = ACTION_IMPORT
+) -> BulkLoadResult:
+    """
+    Множественная загрузка записей справочника.
+
+    Строки складываются во временную таблицу (многострочный INSERT), существующие
+    записи находятся одним соединением по ключу, новые вставляются одним
+    INSERT ... SELECT с анти-соединением. В режиме skip существующие записи
+    возвращаются как конфликты, в режиме update - обновляются из файла.
+    Строки со ссылками на отсутствующие записи (курсы неизвестных валют)
+    возвращаются в rejected. Ключ может быть составным. Ключи внутри items должны быть уникальны. Коммит выполняет вызывающий код.
+    
+    Вставленные записи попадают в журнал аудита с действием audit_action,
+    обновленные - как update с прежними и новыми значениями измененных полей.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode: {mode}")
+    table = DICTIONARY_TABLES[dictionary_type]
+    target = table['model'].__tablename__
+    target_columns = table['model'].__table__.columns
+    key = table['key']
+    # Таблицы с суррогатным id получают его здесь; у валют и курсов ключ естественный
+    has_id = 'id' in target_columns
+    columns = (['id'] if has_id else []) + table['columns']
+    column_list = ", ".join(columns)
+    key_match = " AND ".join(f"t.{column} = s.{column}" for column in key)
+    staging = f"dictionary_import_{uuid.uuid4().hex[:12]}"
+
+    rows = [
+        {'ord': ord_, **({'id': uuid.uuid4()} if has_id else {}), **{column: item.get(column) for column in table['columns']}}
+        for ord_, item in enumerate(items)
+    ]
+    result = BulkLoadResult()
+    if not rows:
+        return result
+
+    db.execute(text(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT 0 AS ord, {column_list} FROM {target} WITH NO DATA"
+    ))
+    # Один многострочный INSERT ... VALUES на пачку, а не executemany построчно
+    staging_table = sql_table(
+        staging, sql_column('ord', Integer), *[sql_column(column, target_columns[column].type) for column in columns]
+    )
+    for start in range(0, len(rows), STAGING_BATCH_SIZE):
+        db.execute(insert(staging_table).values(rows[start:start + STAGING_BATCH_SIZE]))
+
+    for column, ref_table, ref_column, message in table.get('references', []):
+        missing = db.execute(text(
+            f"DELETE FROM {staging} s WHERE s.{column} IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM {ref_table} r WHERE r.{ref_column} = s.{column}) RETURNING s.ord"
+        )).scalars().all()
+        result.rejected += [(ord_, column, message) for ord_ in missing]
+
+    # Существующие записи с тем же ключом; для обновления - вместе с прежними
+    # значениями, которые нужны журналу аудита
+    primary_key = [column.key for column in table['model'].__table__.primary_key.columns]
+    old_rows = {}
+    if mode == MODE_UPDATE:
+        existing = db.execute(text(
+            f"SELECT s.ord, t.* FROM {staging} s JOIN {target} t ON {key_match}"
+        )).mappings().all()
+        existing_ords = {row['ord'] for row in existing}
+        old_rows = {tuple(row[column] for column in primary_key): _without_ord(row) for row in existing}
+    else:
+        existing_ords = {
+            row.ord for row in db.execute(text(
+                f"SELECT DISTINCT s.ord FROM {staging} s JOIN {target} t ON {key_match}"
+            ))
+        }
+
+    if mode == MODE_UPDATE and existing_ords:
+        assignments = [f"{column} = s.{column}" for column in table['columns'] if column not in key]
+        if 'updated_at' in target_columns:
+            assignments.append("updated_at = CURRENT_TIMESTAMP")
+        if assignments:
+            updated = db.execute(text(
+                f"UPDATE {target} t SET {', '.join(assignments)} "
+                f"FROM {staging} s WHERE {key_match} "
+                f"RETURNING s.ord, t.*"
+            ))
+            seen = set()
+            for row in updated.mappings():
+                if row['ord'] not in seen:
+                    seen.add(row['ord'])
+                    result.updated.append((row['ord'], _without_ord(row)))
+
+    on_conflict = f" ON CONFLICT ({', '.join(key)}) DO NOTHING" if table.get('on_conflict') else ""
+    inserted = db.execute(text(
+        f"INSERT INTO {target} ({column_list}) "
+        f"SELECT {', '.join('s.' + column for column in columns)} FROM {staging} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {key_match}) "
+        f"ORDER BY s.ord{on_conflict} "
+        f"RETURNING *"
+    ))
+    # Вставленные строки сопоставляются с входными по id, а без id - по ключу
+    # (ключи внутри items уникальны)
+    match = ['id'] if has_id else key
+    ord_by_match = {tuple(row[column] for column in match): row['ord'] for row in rows}
+    for row in inserted.mappings():
+        result.inserted.append((ord_by_match[tuple(row[column] for column in match)], dict(row)))
+
+    # Остальные строки не вставлены: ключ уже был в таблице (или появился
+    # в параллельной транзакции и отсечен ON CONFLICT)
+    handled = (
+        {ord_ for ord_, _ in result.inserted}
+        | {ord_ for ord_, _ in result.updated}
+        | {ord_ for ord_, _, _ in result.rejected}
+    )
+    result.conflicts = [row['ord'] for row in rows if row['ord'] not in handled]
+    result.inserted.sort(key=lambda entry: entry[0])
+    result.rejected.sort()
+
+    if result.inserted or result.updated:
+        invalidate_model_on_commit(db, table['model'])
+        record_bulk_changes(db, table['model'], audit_action, (row for _, row in result.inserted))
+        record_bulk_changes(db, table['model'], ACTION_UPDATE, (row for _, row in result.updated), old_rows)
+    return result
+
+
+def _without_ord(row) -> Dict[str, Any]:
+    values = dict(row)
+    values.pop('ord', None)
+    return values
@@ -1,317 +1,293 @@
 import pandas as pd
-import io
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO
 from fastapi import UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import uuid
 from datetime import datetime
+from app.models import Counterparty, ExpenseArticle, VatRate, Currency, ExchangeRate
+from app.core.file_formats import format_for_filename, readable_extensions
+from app.core.streaming_export import export_response, stream_query
+
+CURRENCY_CODE_PATTERN = r'[A-Z]{3}'
+
+# Правила проверки колонок по типам справочников. Колонка без 'type' - текстовая;
+# 'default' подставляется, если колонки нет в файле.
+# Проверки выполняются по порядку; строка получает только первую ошибку, как и раньше.
+DICTIONARY_COLUMNS = {
+    'counterparties': [
+        {'field': 'name', 'required': 'Название контрагента обязательно',
+         'max_length': (255, 'Название контрагента слишком длинное (максимум 255 символов)')},
+        {'field': 'tax_id', 'max_length': (64, 'БИН/ИИН слишком длинный (максимум 64 символа)')},
+        {'field': 'category', 'max_length': (128, 'Категория слишком длинная (максимум 128 символов)')},
+    ],
+    'expense-articles': [
+        {'field': 'code', 'upper': True, 'required': 'Код статьи расходов обязателен'},
+        {'field': 'name', 'required': 'Название статьи расходов обязательно'},
+        {'field': 'code', 'max_length': (64, 'Код статьи расходов слишком длинный (максимум 64 символа)')},
+        {'field': 'name', 'max_length': (255, 'Название статьи расходов слишком длинное (максимум 255 символов)')},
+        {'field': 'description', 'max_length': (1000, 'Описание слишком длинное (максимум 1000 символов)')},
+    ],
+    'vat-rates': [
+        {'field': 'name', 'required': 'Название ставки НДС обязательно'},
+        {'field': 'rate', 'type': 'number', 'default': 0.0, 'range': (0, 1, 'Ставка НДС должна быть от 0 до 1')},
+        {'field': 'name', 'max_length': (64, 'Название ставки НДС слишком длинное (максимум 64 символа)')},
+    ],
+    'currencies': [
+        {'field': 'code', 'upper': True, 'required': 'Код валюты обязателен',
+         'pattern': (CURRENCY_CODE_PATTERN, 'Код валюты должен состоять из трех латинских букв (ISO 4217)')},
+        {'field': 'scale', 'type': 'integer', 'default': 2,
+         'range': (0, 6, 'Точность валюты должна быть целым числом от 0 до 6')},
+    ],
+    'exchange-rates': [
+        {'field': 'date', 'type': 'date', 'required': 'Дата курса обязательна (ГГГГ-ММ-ДД или ДД.ММ.ГГГГ)'},
+        {'field': 'currency_code', 'upper': True, 'required': 'Код валюты обязателен',
+         'pattern': (CURRENCY_CODE_PATTERN, 'Код валюты должен состоять из трех латинских букв (ISO 4217)')},
+        {'field': 'rate', 'type': 'number', 'positive': 'Курс валюты должен быть положительным числом'},
+        {'field': 'rate', 'range': (0, 9999.999999, 'Курс валюты слишком большой (максимум 9999.999999)')},
+    ],
+}
+
+# Колонки, уникальные в пределах справочника: повторы внутри файла отклоняются
+DICTIONARY_KEYS = {
+    'counterparties': ['name'],
+    'expense-articles': ['code'],
+    'vat-rates': ['rate'],
+    'currencies': ['code'],
+    'exchange-rates': ['date', 'currency_code'],
+}
+
+# Колонки результата в порядке модели
+DICTIONARY_FIELDS = {
+    'counterparties': ['name', 'tax_id', 'category', 'is_active'],
+    'expense-articles': ['code', 'name', 'description', 'is_active'],
+    'vat-rates': ['rate', 'name', 'is_active'],
+    'currencies': ['code', 'scale'],
+    'exchange-rates': ['date', 'currency_code', 'rate'],
+}
+
+FALSE_VALUES = {'false', '0', 'no', 'нет', 'n'}
+
+ERROR_COLUMNS = ['row', 'field', 'message']
+
+# Экспорт: модель, колонки (как в *Out схемах), сортировка, имя файла
+DICTIONARY_EXPORTS = {
+    'counterparties': (Counterparty, ['id', 'name', 'tax_id', 'category', 'is_active'], 'name', 'counterparties'),
+    'expense-articles': (ExpenseArticle, ['id', 'code', 'name', 'description', 'is_active'], 'name', 'expense_articles'),
+    'vat-rates': (VatRate, ['id', 'rate', 'name', 'is_active'], 'rate', 'vat_rates'),
+    'currencies': (Currency, ['code', 'scale'], 'code', 'currencies'),
+    'exchange-rates': (ExchangeRate, ['date', 'currency_code', 'rate'], 'date', 'exchange_rates'),
+}
+
+# Шаблоны импорта: колонки и примеры строк
+IMPORT_TEMPLATES = {
+    'counterparties': (
+        ['name', 'tax_id', 'category', 'is_active'],
+        [
+            ['ООО "Поставщик 1"', '123456789012', 'Поставщик СХ', True],
+            ['ИП Иванов И.И.', '870101300234', 'Поставщик Услуг', True],
+            ['АО "Покупатель"', '098765432112', 'Покупатель', False]
+        ]
+    ),
+    'expense-articles': (
+        ['code', 'name', 'description', 'is_active'],
+        [
+            ['EI001', 'Закупка товаров', 'Закупка товаров для торговли', True],
+            ['EI002', 'Оплата услуг', 'Оплата различных услуг', True],
+            ['EI003', 'Командировочные расходы', 'Расходы на командировки', False]
+        ]
+    ),
+    'vat-rates': (
+        ['rate', 'name', 'is_active'],
+        [
+            [0.0, '0%', True],
+            [0.12, '12%', True],
+            [0.16, '16%', True],
+            [0.20, '20%', False]
+        ]
+    ),
+    'currencies': (
+        ['code', 'scale'],
+        [
+            ['KZT', 2],
+            ['USD', 2],
+            ['EUR', 2]
+        ]
+    ),
+    'exchange-rates': (
+        ['date', 'currency_code', 'rate'],
+        [
+            ['2025-01-31', 'USD', 520.5],
+            ['2025-01-31', 'EUR', 540.25]
+        ]
+    ),
+}
+
+
+def _parse_typed(values: pd.Series, kind: str) -> pd.Series:
+    """Разбор строковой колонки в число, целое или дату; нераспознанные значения становятся пропусками"""
+    text = values.astype('string').str.strip()
+    if kind == 'date':
+        # ISO (в том числе дата-время из Excel), затем ДД.ММ.ГГГГ
+        parsed = pd.to_datetime(text, format='ISO8601', errors='coerce')
+        parsed = parsed.fillna(pd.to_datetime(text, format='%d.%m.%Y', errors='coerce'))
+        return parsed.dt.date.astype(object).where(parsed.notna(), None)
+    numbers = pd.to_numeric(text.str.replace(',', '.', regex=False), errors='coerce')
+    if kind == 'integer':
+        return numbers.where(numbers % 1 == 0).astype('Int64')
+    return numbers
+
 
 class FileProcessor:
     """Класс для обработки файлов импорта/экспорта справочников"""
     
-    SUPPORTED_FORMATS = ['csv', 'xlsx', 'xls']
+    SUPPORTED_FORMATS = readable_extensions()
+    # Предел для синхронного импорта, который держит весь файл в памяти и грузит его одной транзакцией
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
     
     @classmethod
-    async def validate_file(cls, file: UploadFile) -> Tuple[bool, str]:
-        """Валидация загружаемого файла"""
+    async def validate_file(cls, file: UploadFile, max_size: Optional[int] = MAX_FILE_SIZE) -> Tuple[bool, str]:
+        """Валидация загружаемого файла; max_size=None снимает ограничение размера (импорт задачами)"""
         # Проверка размера файла
-        if file.size and file.size > cls.MAX_FILE_SIZE:
-            return False, f"Файл слишком большой. Максимальный размер: {cls.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
+        if max_size is not None and file.size and file.size > max_size:
+            return False, (
+                f"Файл слишком большой. Максимальный размер: {max_size / 1024 / 1024:.1f}MB. "
+                f"Большие файлы загружайте через /dictionaries/import/jobs"
+            )
         
         # Проверка формата файла
-        file_extension = file.filename.split('.')[-1].lower() if file.filename else ''
-        if file_extension not in cls.SUPPORTED_FORMATS:
+        if format_for_filename(file.filename) is None:
             return False, f"Неподдерживаемый формат файла. Поддерживаемые форматы: {', '.join(cls.SUPPORTED_FORMATS)}"
         
         return True, ""
     
-    @classmethod
-    async def process_counterparties_file(cls, file: UploadFile) -> Tuple[List[Dict], List[Dict]]:
-        """Обработка файла с контрагентами"""
-        try:
-            # Чтение файла
-            content = await file.read()
-            
-            # Определение формата и чтение данных
-            if file.filename.endswith('.csv'):
-                df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            else:  # Excel файлы
-                df = pd.read_excel(io.BytesIO(content))
-            
-            # Валидация и обработка данных
-            processed_items = []
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Очистка и валидация данных
-                    item = {
-                        'name': str(row.get('name', '')).strip(),
-                        'tax_id': str(row.get('tax_id', '')).strip() if pd.notna(row.get('tax_id')) else None,
-                        'category': str(row.get('category', '')).strip() if pd.notna(row.get('category')) else None,
-                        'is_active': bool(row.get('is_active', True))
-                    }
-                    
-                    # Валидация обязательных полей
-                    if not item['name']:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название контрагента обязательно'
-                        })
-                        continue
-                    
-                    # Валидация длины полей
-                    if len(item['name']) > 255:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название контрагента слишком длинное (максимум 255 символов)'
-                        })
-                        continue
-                    
-                    if item['tax_id'] and len(item['tax_id']) > 64:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'tax_id',
-                            'message': 'БИН/ИИН слишком длинный (максимум 64 символа)'
-                        })
-                        continue
-                    
-                    if item['category'] and len(item['category']) > 128:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'category',
-                            'message': 'Категория слишком длинная (максимум 128 символов)'
-                        })
-                        continue
-                    
-                    processed_items.append(item)
-                    
-                except Exception as e:
-                    errors.append({
-                        'row': index + 1,
-                        'field': 'general',
-                        'message': f'Ошибка обработки строки: {str(e)}'
-                    })
-            
-            return processed_items, errors
-            
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Ошибка обработки файла: {str(e)}")
+    @staticmethod
+    def read_frame(source: BinaryIO, filename: str) -> pd.DataFrame:
+        """Чтение файла любого поддерживаемого формата в DataFrame; все значения читаются как строки"""
+        return format_for_filename(filename).read_frame(source)
     
     @classmethod
-    async def process_expense_articles_file(cls, file: UploadFile) -> Tuple[List[Dict], List[Dict]]:
-        """Обработка файла со статьями расходов"""
-        try:
-            # Чтение файла
-            content = await file.read()
-            
-            # Определение формата и чтение данных
-            if file.filename.endswith('.csv'):
-                df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            else:  # Excel файлы
-                df = pd.read_excel(io.BytesIO(content))
-            
-            # Валидация и обработка данных
-            processed_items = []
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Очистка и валидация данных
-                    item = {
-                        'code': str(row.get('code', '')).strip().upper(),
-                        'name': str(row.get('name', '')).strip(),
-                        'description': str(row.get('description', '')).strip() if pd.notna(row.get('description')) else None,
-                        'is_active': bool(row.get('is_active', True))
-                    }
-                    
-                    # Валидация обязательных полей
-                    if not item['code']:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'code',
-                            'message': 'Код статьи расходов обязателен'
-                        })
-                        continue
-                    
-                    if not item['name']:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название статьи расходов обязательно'
-                        })
-                        continue
-                    
-                    # Валидация длины полей
-                    if len(item['code']) > 64:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'code',
-                            'message': 'Код статьи расходов слишком длинный (максимум 64 символа)'
-                        })
-                        continue
-                    
-                    if len(item['name']) > 255:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название статьи расходов слишком длинное (максимум 255 символов)'
-                        })
-                        continue
-                    
-                    if item['description'] and len(item['description']) > 1000:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'description',
-                            'message': 'Описание слишком длинное (максимум 1000 символов)'
-                        })
-                        continue
-                    
-                    processed_items.append(item)
-                    
-                except Exception as e:
-                    errors.append({
-                        'row': index + 1,
-                        'field': 'general',
-                        'message': f'Ошибка обработки строки: {str(e)}'
-                    })
-            
-            return processed_items, errors
-            
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Ошибка обработки файла: {str(e)}")
+    def validate_frame(cls, dictionary_type: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Векторная очистка и проверка строк справочника.
+        
+        Возвращает (valid, errors): valid содержит очищенные колонки справочника
+        и номер строки файла в колонке 'row', errors - колонки row, field, message.
+        """
+        df = df.rename(columns=lambda column: str(column).strip())
+        row_numbers = pd.Series(range(1, len(df) + 1), index=df.index)
+        clean = pd.DataFrame(index=df.index)
+        
+        rules = DICTIONARY_COLUMNS[dictionary_type]
+        typed = {rule['field']: rule for rule in rules if 'type' in rule}
+        for column in DICTIONARY_FIELDS[dictionary_type]:
+            if column == 'is_active':
+                values = df.get(column, pd.Series(pd.NA, index=df.index, dtype=object))
+                clean[column] = ~values.astype('string').str.strip().str.lower().isin(FALSE_VALUES).fillna(False)
+            elif column in typed:
+                if column in df.columns:
+                    clean[column] = _parse_typed(df[column], typed[column]['type'])
+                else:
+                    clean[column] = typed[column].get('default')
+            else:
+                values = df.get(column, pd.Series(pd.NA, index=df.index, dtype=object)).astype('string').str.strip()
+                clean[column] = values.mask(values == '')
+        for rule in rules:
+            if rule.get('upper'):
+                clean[rule['field']] = clean[rule['field']].str.upper()
+        
+        checks = []
+        for rule in rules:
+            values = clean[rule['field']]
+            if 'required' in rule:
+                checks.append((values.isna(), rule['field'], rule['required']))
+            if 'max_length' in rule:
+                max_length, message = rule['max_length']
+                checks.append(((values.str.len() > max_length).fillna(False), rule['field'], message))
+            if 'pattern' in rule:
+                pattern, message = rule['pattern']
+                checks.append(((~values.str.fullmatch(pattern)).fillna(False), rule['field'], message))
+            if 'range' in rule:
+                low, high, message = rule['range']
+                checks.append((values.isna() | (values < low).fillna(False) | (values > high).fillna(False), rule['field'], message))
+            if 'positive' in rule:
+                checks.append((values.isna() | (values <= 0).fillna(False), rule['field'], rule['positive']))
+        
+        failed = pd.Series(False, index=df.index)
+        error_frames = []
+        
+        def record(mask: pd.Series, field: str, message: str) -> None:
+            nonlocal failed
+            new_errors = mask.astype(bool) & ~failed
+            if new_errors.any():
+                error_frames.append(pd.DataFrame({'row': row_numbers[new_errors], 'field': field, 'message': message}))
+            failed |= new_errors
+        
+        for mask, field, message in checks:
+            record(mask, field, message)
+        
+        # Повторы ключа среди прошедших проверку строк: первая строка остается
+        key = DICTIONARY_KEYS[dictionary_type]
+        passed = clean[~failed]
+        duplicated = passed.duplicated(subset=key, keep='first').reindex(df.index, fill_value=False)
+        record(duplicated, ', '.join(key), 'Значение повторяется в файле')
+        
+        errors = (
+            pd.concat(error_frames).sort_values('row', kind='stable').reset_index(drop=True)
+            if error_frames else pd.DataFrame(columns=ERROR_COLUMNS)
+        )
+        valid = clean.loc[~failed, DICTIONARY_FIELDS[dictionary_type]].copy()
+        valid['row'] = row_numbers[~failed]
+        return valid, errors
     
     @classmethod
-    async def process_vat_rates_file(cls, file: UploadFile) -> Tuple[List[Dict], List[Dict]]:
-        """Обработка файла со ставками НДС"""
+    async def process_file(cls, dictionary_type: str, file: UploadFile) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Чтение и проверка файла справочника.
+        
+        Разбор и проверка выполняются в пуле потоков, чтобы не блокировать event loop;
+        файл читается из временного файла загрузки без копирования в память.
+        """
+        if dictionary_type not in DICTIONARY_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+        
+        def parse() -> Tuple[pd.DataFrame, pd.DataFrame]:
+            file.file.seek(0)
+            return cls.validate_frame(dictionary_type, cls.read_frame(file.file, file.filename))
+        
         try:
-            # Чтение файла
-            content = await file.read()
-            
-            # Определение формата и чтение данных
-            if file.filename.endswith('.csv'):
-                df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            else:  # Excel файлы
-                df = pd.read_excel(io.BytesIO(content))
-            
-            # Валидация и обработка данных
-            processed_items = []
-            errors = []
-            
-            for index, row in df.iterrows():
-                try:
-                    # Очистка и валидация данных
-                    item = {
-                        'rate': float(row.get('rate', 0)),
-                        'name': str(row.get('name', '')).strip(),
-                        'is_active': bool(row.get('is_active', True))
-                    }
-                    
-                    # Валидация обязательных полей
-                    if not item['name']:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название ставки НДС обязательно'
-                        })
-                        continue
-                    
-                    # Валидация ставки НДС
-                    if item['rate'] < 0 or item['rate'] > 1:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'rate',
-                            'message': 'Ставка НДС должна быть от 0 до 1'
-                        })
-                        continue
-                    
-                    # Валидация длины полей
-                    if len(item['name']) > 64:
-                        errors.append({
-                            'row': index + 1,
-                            'field': 'name',
-                            'message': 'Название ставки НДС слишком длинное (максимум 64 символа)'
-                        })
-                        continue
-                    
-                    processed_items.append(item)
-                    
-                except Exception as e:
-                    errors.append({
-                        'row': index + 1,
-                        'field': 'general',
-                        'message': f'Ошибка обработки строки: {str(e)}'
-                    })
-            
-            return processed_items, errors
-            
+            return await run_in_threadpool(parse)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Ошибка обработки файла: {str(e)}")
     
-    @classmethod
-    def export_to_csv(cls, data: List[Dict], filename: str) -> bytes:
-        """Экспорт данных в CSV формат"""
-        try:
-            df = pd.DataFrame(data)
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False, encoding='utf-8')
-            return csv_buffer.getvalue().encode('utf-8')
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Ошибка экспорта в CSV: {str(e)}")
-    
-    @classmethod
-    def export_to_excel(cls, data: List[Dict], filename: str) -> bytes:
-        """Экспорт данных в Excel формат"""
-        try:
-            df = pd.DataFrame(data)
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Data')
-            return excel_buffer.getvalue()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Ошибка экспорта в Excel: {str(e)}")
+    @staticmethod
+    def frame_to_items(valid: pd.DataFrame) -> List[Dict]:
+        """Строки DataFrame в словари; пропуски становятся None"""
+        items = valid.drop(columns=['row']).astype(object)
+        return items.where(items.notna(), None).to_dict('records')
     
     @classmethod
-    def get_import_template(cls, dictionary_type: str) -> Tuple[bytes, str]:
-        """Получение шаблона для импорта"""
-        templates = {
-            'counterparties': {
-                'columns': ['name', 'tax_id', 'category', 'is_active'],
-                'sample_data': [
-                    ['ООО "Поставщик 1"', '123456789012', 'Поставщик СХ', True],
-                    ['ИП Иванов И.И.', '870101300234', 'Поставщик Услуг', True],
-                    ['АО "Покупатель"', '098765432112', 'Покупатель', False]
-                ]
-            },
-            'expense-articles': {
-                'columns': ['code', 'name', 'description', 'is_active'],
-                'sample_data': [
-                    ['EI001', 'Закупка товаров', 'Закупка товаров для торговли', True],
-                    ['EI002', 'Оплата услуг', 'Оплата различных услуг', True],
-                    ['EI003', 'Командировочные расходы', 'Расходы на командировки', False]
-                ]
-            },
-            'vat-rates': {
-                'columns': ['rate', 'name', 'is_active'],
-                'sample_data': [
-                    [0.0, '0%', True],
-                    [0.12, '12%', True],
-                    [0.16, '16%', True],
-                    [0.20, '20%', False]
-                ]
-            }
-        }
-        
-        if dictionary_type not in templates:
+    def export_dictionary(cls, dictionary_type: str, file_format: str = "csv", active_only: bool = True) -> StreamingResponse:
+        """Потоковый экспорт справочника в любом формате реестра через серверный курсор"""
+        if dictionary_type not in DICTIONARY_EXPORTS:
             raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+        model, columns, order_by, filename = DICTIONARY_EXPORTS[dictionary_type]
         
-        template = templates[dictionary_type]
-        df = pd.DataFrame(template['sample_data'], columns=template['columns'])
-        
-        excel_buffer = io.BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Template')
+        def query(db):
+            query = db.query(*[getattr(model, column) for column in columns])
+            # У валют и курсов нет признака активности
+            if active_only and hasattr(model, 'is_active'):
+                query = query.filter(model.is_active == True)
+            return query.order_by(getattr(model, order_by), *model.__table__.primary_key.columns)
         
-        return excel_buffer.getvalue(), f"{dictionary_type}_template.xlsx"
+        return export_response(columns, stream_query(query), file_format, filename)
+    
+    @classmethod
+    def get_import_template(cls, dictionary_type: str, file_format: str = "xlsx") -> StreamingResponse:
+        """Шаблон для импорта с примерами строк в выбранном формате"""
+        if dictionary_type not in IMPORT_TEMPLATES:
+            raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+        columns, sample_data = IMPORT_TEMPLATES[dictionary_type]
+        return export_response(
+            columns, sample_data, file_format, f"{dictionary_type}_template", sheet_name='Template'
+        )
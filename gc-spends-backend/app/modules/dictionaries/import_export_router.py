@@ -1,99 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, UploadFile, File, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.db import get_db
-from app.models import User, ExpenseArticle, Counterparty
+from app.core.security import get_current_user_id
 from . import schemas
+from .file_processor import FileProcessor
+from .bulk_loader import MODE_SKIP
+from .import_jobs import prepare_import_job, run_import_job, submit_import_job
 import uuid
-import csv
-import json
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from io import StringIO, BytesIO
-import pandas as pd
 
 router = APIRouter(prefix="/dictionaries/import-export", tags=["dictionaries-import-export"])
 
-@router.post("/import/{dictionary_type}")
+@router.post("/import/{dictionary_type}", response_model=schemas.ImportJobOut)
 async def import_dictionary_data(
     dictionary_type: str,
     file: UploadFile = File(...),
-    include_inactive: bool = Query(False, description="Include inactive records"),
-    db: Session = Depends(get_db)
+    mode: str = Query(MODE_SKIP, description="skip existing records or update them"),
+    background: bool = Query(False, description="Return right away and process the file in the background"),
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id)
 ):
-    """Import dictionary data from file"""
-    
-    try:
-        # Read file content
-        content = await file.read()
-        
-        # Determine file format
-        file_extension = file.filename.split('.')[-1].lower()
-        
-        if file_extension == 'csv':
-            # Parse CSV
-            csv_content = content.decode('utf-8')
-            csv_reader = csv.DictReader(StringIO(csv_content))
-            data = list(csv_reader)
-        elif file_extension in ['xlsx', 'xls']:
-            # Parse Excel
-            df = pd.read_excel(BytesIO(content))
-            data = df.to_dict('records')
-        elif file_extension == 'json':
-            # Parse JSON
-            data = json.loads(content.decode('utf-8'))
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-        
-        # TODO: Implement real import logic based on dictionary type
-        # For now, return a placeholder response
-        return {
-            "message": f"Import functionality for {dictionary_type} is not yet implemented",
-            "total_processed": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "success_records": [],
-            "errors": []
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+    """
+    Import dictionary data from a CSV, XLSX, XLS, JSON or NDJSON file.
+
+    Counterparties, expense articles, VAT rates, currencies and exchange rates
+    are supported. The upload is saved to disk and imported by the same chunked
+    job as /dictionaries/import/jobs; without `background` the call waits for
+    the job to finish and returns its result.
+    """
+    job = await prepare_import_job(db, dictionary_type, mode, file, uuid.UUID(current_user_id))
+    if background:
+        submit_import_job(job.id)
+    else:
+        await run_in_threadpool(run_import_job, job.id)
+        db.refresh(job)
+    return job
 
 @router.get("/export/{dictionary_type}")
-async def export_dictionary_data(
+def export_dictionary_data(
     dictionary_type: str,
-    format: str = Query("csv", description="Export format (csv, xlsx, json)"),
-    include_inactive: bool = Query(False, description="Include inactive records"),
-    date_range: Optional[str] = Query(None, description="Date range filter"),
-    db: Session = Depends(get_db)
+    format: str = Query("csv", description="Export format (csv, xlsx, json, ndjson)"),
+    include_inactive: bool = Query(False, description="Include inactive records")
 ):
     """Export dictionary data to file"""
-    
-    try:
-        # TODO: Implement real export logic based on dictionary type
-        # For now, return a placeholder response
-        return {
-            "content": "",
-            "filename": f"{dictionary_type}_export_{datetime.now().strftime('%Y%m%d')}.{format}",
-            "content_type": "text/plain"
-        }
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    return FileProcessor.export_dictionary(dictionary_type, format, active_only=not include_inactive)
 
 @router.get("/template/{dictionary_type}")
-async def get_import_template(
+def get_import_template(
     dictionary_type: str,
-    format: str = Query("csv", description="Template format (csv, xlsx, json)")
+    format: str = Query("csv", description="Template format (csv, xlsx, json, ndjson)")
 ):
     """Get import template for dictionary type"""
-    
-    # TODO: Implement real template generation based on dictionary type
-    # For now, return a placeholder response
-    return {
-        "content": f"Template for {dictionary_type} is not yet implemented",
-        "filename": f"{dictionary_type}_template.{format}",
-        "content_type": "text/plain"
-    }
-
-# TODO: Implement real validation, processing, and data retrieval functions
-# These will be implemented when the actual dictionary management system is built
+    return FileProcessor.get_import_template(dictionary_type, format)
@@ -0,0 +1,183 @@
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Tuple
+import pandas as pd
+from fastapi import UploadFile, HTTPException
+from sqlalchemy import update, func, or_, and_
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.audit_log import audit_actor
+from app.core.file_formats import format_for_filename
+from app.models import ImportJob
+from .bulk_loader import bulk_load, DICTIONARY_TABLES, IMPORT_MODES
+from .file_processor import FileProcessor
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Ошибки сверх лимита считаются, но не сохраняются
+MAX_STORED_ERRORS = 1000
+# Задача в статусе running или pending без обновлений дольше этого срока считается
+# прерванной (pending - потерянной из очереди воркеров при перезапуске)
+STALE_JOB_MINUTES = 10
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=settings.import_workers, thread_name_prefix="dictionary-import")
+
+
+async def save_upload(file: UploadFile) -> str:
+    """Сохранение загрузки на диск частями, без чтения файла в память целиком"""
+    os.makedirs(settings.import_upload_dir, exist_ok=True)
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    path = os.path.join(settings.import_upload_dir, f"{uuid.uuid4()}{extension}")
+    with open(path, "wb") as output:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            output.write(chunk)
+    return path
+
+
+def count_rows(path: str, filename: str):
+    """Число строк данных (без заголовка); None, если его нельзя узнать заранее"""
+    return format_for_filename(filename).count_rows(path)
+
+
+def iter_chunks(path: str, filename: str, chunk_size: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Файл по частям из chunk_size строк: (номер части, DataFrame строковых значений)"""
+    return enumerate(format_for_filename(filename).read_chunks(path, chunk_size))
+
+
+async def prepare_import_job(db, dictionary_type: str, mode: str, file: UploadFile, user_id: Optional[uuid.UUID]) -> ImportJob:
+    """Проверка параметров, сохранение файла и создание задачи импорта в статусе pending"""
+    # Задачи читают файл частями, поэтому размер не ограничен
+    is_valid, error_message = await FileProcessor.validate_file(file, max_size=None)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+    if dictionary_type not in DICTIONARY_TABLES:
+        raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+    if mode not in IMPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"Неподдерживаемый режим импорта: {mode}")
+
+    file_path = await save_upload(file)
+    job = ImportJob(
+        dictionary_type=dictionary_type,
+        mode=mode,
+        filename=file.filename,
+        file_path=file_path,
+        chunk_size=settings.import_chunk_rows,
+        created_by_user_id=user_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def submit_import_job(job_id: uuid.UUID) -> None:
+    _executor.submit(run_import_job, job_id)
+
+
+def run_import_job(job_id: uuid.UUID) -> None:
+    """
+    Выполнение задачи импорта.
+
+    Каждая часть файла проверяется, загружается bulk_load и коммитится вместе
+    с прогрессом задачи, поэтому после сбоя задача продолжается с части,
+    следующей за last_chunk. Задачу забирает только один воркер: статус
+    pending -> running меняется условным UPDATE.
+    """
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == JOB_PENDING)
+            .values(status=JOB_RUNNING, error_message=None)
+            .returning(ImportJob.id)
+        ).scalar()
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.get(ImportJob, job_id)
+        if job.total_rows is None:
+            job.total_rows = count_rows(job.file_path, job.filename)
+            db.commit()
+
+        table = DICTIONARY_TABLES[job.dictionary_type]
+        for chunk_index, frame in iter_chunks(job.file_path, job.filename, job.chunk_size):
+            if chunk_index <= job.last_chunk:
+                continue
+            offset = chunk_index * job.chunk_size
+            valid, errors = FileProcessor.validate_frame(job.dictionary_type, frame)
+            valid['row'] += offset
+            errors['row'] += offset
+
+            items = FileProcessor.frame_to_items(valid)
+            # Поток задачи не видит пользователя запроса: изменения приписываются автору задачи
+            with audit_actor(job.created_by_user_id):
+                result = bulk_load(db, job.dictionary_type, items, job.mode)
+            rows = valid['row'].tolist()
+            chunk_errors = errors.to_dict('records') + [
+                {'row': rows[position], 'field': ', '.join(table['key']), 'message': table['duplicate_message']}
+                for position in result.conflicts
+            ] + [
+                {'row': rows[position], 'field': field, 'message': message}
+                for position, field, message in result.rejected
+            ]
+
+            job.imported_count += len(result.inserted) + len(result.updated)
+            job.error_count += len(chunk_errors)
+            if len(job.errors) < MAX_STORED_ERRORS:
+                job.errors = (job.errors + sorted(chunk_errors, key=lambda error: error['row']))[:MAX_STORED_ERRORS]
+            job.processed_rows = offset + len(frame)
+            job.last_chunk = chunk_index
+            db.commit()
+
+        job.status = JOB_COMPLETED
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        os.remove(job.file_path)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Import job {job_id} failed: {e}")
+        db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(status=JOB_FAILED, error_message=str(e)[:2000])
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def mark_for_resume(db, job_id: uuid.UUID) -> bool:
+    """
+    Вернуть упавшую, зависшую или потерянную задачу в очередь. False, если задачу нельзя продолжить.
+
+    Обновление сдвигает updated_at, поэтому повторный вызов в течение
+    STALE_JOB_MINUTES не отправит ту же задачу второй раз.
+    """
+    stale_before = func.now() - timedelta(minutes=STALE_JOB_MINUTES)
+    resumed = db.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status == JOB_FAILED,
+                and_(ImportJob.status.in_([JOB_RUNNING, JOB_PENDING]), ImportJob.updated_at < stale_before)
+            )
+        )
+        .values(status=JOB_PENDING)
+        .returning(ImportJob.id)
+    ).scalar()
+    db.commit()
+    return resumed is not None
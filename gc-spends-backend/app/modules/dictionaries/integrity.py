@@ -0,0 +1,345 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.core.cache import cache, invalidate_on_commit
+from app.models import DictionaryIntegrityRun
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_HIGH = "high"
+SEVERITY_MEDIUM = "medium"
+SEVERITY_LOW = "low"
+SEVERITY_ORDER = {SEVERITY_HIGH: 0, SEVERITY_MEDIUM: 1, SEVERITY_LOW: 2}
+
+TRIGGER_MANUAL = "manual"
+TRIGGER_SCHEDULED = "scheduled"
+
+# Ограничение времени одной проверки; проверка, не уложившаяся в него, пропускается
+CHECK_TIMEOUT_MS = 5000
+# Проблем одной проверки, сохраняемых в результате прогона
+ISSUES_PER_CHECK = 500
+# Прогонов каждого справочника, хранимых в таблице
+RUNS_KEPT = 50
+
+INTEGRITY_NAMESPACE = "dictionary_integrity"
+INTEGRITY_TTL_SECONDS = 60
+
+# Заявки в этих статусах уже не используют справочники
+CLOSED_REQUEST_STATUSES = "('paid-full', 'rejected', 'cancelled', 'closed')"
+
+# Курсы валют указываются в тенге, поэтому для нее курсы не нужны
+NATIONAL_CURRENCY = "KZT"
+
+# SQLSTATE query_canceled: сработал statement_timeout
+_QUERY_CANCELED = "57014"
+
+
+class IntegrityCheck:
+    """
+    Проверка целостности справочника - один SQL-запрос.
+
+    Запрос возвращает по строке на проблему с колонками item_id, item_name
+    и occurrences, а также колонками, нужными для описания и severity.
+    Параметр :limit ограничивает число строк, :national_currency - код тенге.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dictionary_type: str,
+        issue_type: str,
+        sql: str,
+        severity: Callable[[Mapping[str, Any]], str],
+        describe: Callable[[Mapping[str, Any]], str],
+        suggestion: str,
+        affected_fields: List[str]
+    ):
+        self.name = name
+        self.dictionary_type = dictionary_type
+        self.issue_type = issue_type
+        self.sql = text(sql)
+        self.severity = severity
+        self.describe = describe
+        self.suggestion = suggestion
+        self.affected_fields = affected_fields
+
+    def issue(self, row: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": f"{self.name}:{row['item_id']}",
+            "type": self.issue_type,
+            "severity": self.severity(row),
+            "item_id": row['item_id'],
+            "item_name": row['item_name'],
+            "description": self.describe(row),
+            "suggestion": self.suggestion,
+            "affected_fields": self.affected_fields,
+            "related_ids": list(row.get('related_ids') or []),
+        }
+
+
+INTEGRITY_CHECKS: Dict[str, List[IntegrityCheck]] = {}
+
+
+def register_check(check: IntegrityCheck) -> None:
+    INTEGRITY_CHECKS.setdefault(check.dictionary_type, []).append(check)
+
+
+def _duplicates_sql(table: str, group_by: str, where: str = "TRUE") -> str:
+    # Первая по времени создания запись группы считается основной
+    return f"""
+        SELECT (array_agg(id::text ORDER BY created_at, id))[1] AS item_id,
+               min(name) AS item_name,
+               count(*) AS occurrences,
+               count(*) FILTER (WHERE is_active) AS active_count,
+               array_agg(id::text ORDER BY created_at, id) AS related_ids
+        FROM {table}
+        WHERE {where}
+        GROUP BY {group_by}
+        HAVING count(*) > 1
+        ORDER BY count(*) DESC, min(name)
+        LIMIT :limit
+    """
+
+
+def _duplicate_severity(row: Mapping[str, Any]) -> str:
+    # Дубликаты среди активных записей попадают в новые заявки
+    return SEVERITY_HIGH if row['active_count'] > 1 else SEVERITY_LOW
+
+
+register_check(IntegrityCheck(
+    "counterparty_duplicate_name", "counterparties", "duplicate",
+    _duplicates_sql("counterparties", "lower(btrim(name))"),
+    _duplicate_severity,
+    lambda row: f"Контрагентов с названием «{row['item_name']}»: {row['occurrences']}",
+    "Объедините дубликаты и деактивируйте лишние записи",
+    ["name"]
+))
+
+register_check(IntegrityCheck(
+    "counterparty_duplicate_tax_id", "counterparties", "duplicate",
+    _duplicates_sql("counterparties", "btrim(tax_id)", "tax_id IS NOT NULL AND btrim(tax_id) <> ''"),
+    lambda row: SEVERITY_HIGH if row['active_count'] > 1 else SEVERITY_MEDIUM,
+    lambda row: f"БИН/ИИН контрагента «{row['item_name']}» указан у {row['occurrences']} записей",
+    "Проверьте БИН/ИИН и объедините записи одного контрагента",
+    ["tax_id"]
+))
+
+register_check(IntegrityCheck(
+    "counterparty_invalid_tax_id", "counterparties", "invalid",
+    """
+        SELECT id::text AS item_id, name AS item_name, 1 AS occurrences, is_active, tax_id
+        FROM counterparties
+        WHERE tax_id IS NOT NULL AND btrim(tax_id) <> '' AND tax_id !~ '^[0-9]{12}$'
+        ORDER BY name, id
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_MEDIUM if row['is_active'] else SEVERITY_LOW,
+    lambda row: f"БИН/ИИН «{row['tax_id']}» не состоит из 12 цифр",
+    "Исправьте БИН/ИИН контрагента",
+    ["tax_id"]
+))
+
+register_check(IntegrityCheck(
+    "counterparty_inactive_in_use", "counterparties", "orphaned",
+    f"""
+        SELECT c.id::text AS item_id, c.name AS item_name, count(*) AS occurrences
+        FROM counterparties c
+        JOIN payment_requests r ON r.counterparty_id = c.id
+        WHERE NOT c.is_active AND r.status NOT IN {CLOSED_REQUEST_STATUSES}
+        GROUP BY c.id, c.name
+        ORDER BY count(*) DESC, c.name
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_HIGH,
+    lambda row: f"Неактивный контрагент используется в незакрытых заявках: {row['occurrences']}",
+    "Активируйте контрагента или замените его в заявках",
+    ["is_active"]
+))
+
+register_check(IntegrityCheck(
+    "expense_article_inactive_in_use", "expense-articles", "orphaned",
+    f"""
+        SELECT a.id::text AS item_id, a.name AS item_name, count(*) AS occurrences,
+               count(*) FILTER (WHERE l.status NOT IN {CLOSED_REQUEST_STATUSES}) AS open_count
+        FROM expense_articles a
+        JOIN payment_request_lines l ON l.article_id = a.id
+        WHERE NOT a.is_active
+        GROUP BY a.id, a.name
+        ORDER BY count(*) FILTER (WHERE l.status NOT IN {CLOSED_REQUEST_STATUSES}) DESC, count(*) DESC, a.name
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_HIGH if row['open_count'] > 0 else SEVERITY_LOW,
+    lambda row: (
+        f"Неактивная статья указана в строках заявок: {row['occurrences']}, "
+        f"из них в незакрытых: {row['open_count']}"
+    ),
+    "Активируйте статью или переклассифицируйте строки заявок",
+    ["is_active"]
+))
+
+register_check(IntegrityCheck(
+    "expense_article_duplicate_name", "expense-articles", "duplicate",
+    _duplicates_sql("expense_articles", "lower(btrim(name))"),
+    lambda row: SEVERITY_MEDIUM if row['active_count'] > 1 else SEVERITY_LOW,
+    lambda row: f"Статей расходов с названием «{row['item_name']}»: {row['occurrences']}",
+    "Переименуйте статьи или деактивируйте лишние",
+    ["name"]
+))
+
+register_check(IntegrityCheck(
+    "vat_rate_duplicate_value", "vat-rates", "duplicate",
+    _duplicates_sql("vat_rates", "rate"),
+    _duplicate_severity,
+    lambda row: f"Ставок НДС с тем же значением, что у «{row['item_name']}»: {row['occurrences']}",
+    "Оставьте одну активную ставку с этим значением",
+    ["rate"]
+))
+
+register_check(IntegrityCheck(
+    "vat_rate_invalid_value", "vat-rates", "invalid",
+    """
+        SELECT id::text AS item_id, name AS item_name, 1 AS occurrences, rate
+        FROM vat_rates
+        WHERE rate < 0 OR rate > 1
+        ORDER BY rate, id
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_HIGH,
+    lambda row: f"Ставка НДС {row['rate']} вне диапазона от 0 до 1",
+    "Укажите ставку долей единицы, например 0.12 для 12%",
+    ["rate"]
+))
+
+register_check(IntegrityCheck(
+    "currency_without_rates", "currencies", "missing",
+    f"""
+        SELECT c.code AS item_id, c.code AS item_name, count(*) AS occurrences
+        FROM currencies c
+        JOIN payment_requests r ON r.currency_code = c.code
+        WHERE c.code <> :national_currency
+          AND r.status NOT IN {CLOSED_REQUEST_STATUSES}
+          AND NOT EXISTS (SELECT 1 FROM exchange_rates e WHERE e.currency_code = c.code)
+        GROUP BY c.code
+        ORDER BY count(*) DESC, c.code
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_HIGH,
+    lambda row: f"Для валюты {row['item_id']} нет ни одного курса, а незакрытых заявок в ней: {row['occurrences']}",
+    "Загрузите курсы валюты",
+    ["code"]
+))
+
+register_check(IntegrityCheck(
+    "exchange_rate_invalid_value", "exchange-rates", "invalid",
+    """
+        SELECT date::text || ':' || currency_code AS item_id, currency_code AS item_name, 1 AS occurrences, date, rate
+        FROM exchange_rates
+        WHERE rate <= 0
+        ORDER BY date DESC, currency_code
+        LIMIT :limit
+    """,
+    lambda row: SEVERITY_HIGH,
+    lambda row: f"Курс {row['item_name']} на {row['date']:%d.%m.%Y} не положителен: {row['rate']}",
+    "Загрузите корректный курс на эту дату",
+    ["rate"]
+))
+
+
+def _is_timeout(error: DBAPIError) -> bool:
+    orig = error.orig
+    return (getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)) == _QUERY_CANCELED
+
+
+def run_integrity_checks(db: Session, dictionary_type: str, trigger: str = TRIGGER_MANUAL) -> DictionaryIntegrityRun:
+    """
+    Прогон проверок справочника с сохранением результата.
+
+    Каждая проверка - один запрос в своей точке сохранения с локальным
+    statement_timeout: проверка, превысившая CHECK_TIMEOUT_MS или упавшая,
+    отмечается в checks и не мешает остальным. Коммит выполняет вызывающий код;
+    после него кэш последнего прогона сбрасывается.
+    """
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    previous_timeout = db.execute(text("SELECT current_setting('statement_timeout')")).scalar()
+    issues: List[Dict[str, Any]] = []
+    checks: List[Dict[str, Any]] = []
+
+    for check in INTEGRITY_CHECKS.get(dictionary_type, []):
+        check_started = time.perf_counter()
+        status = "ok"
+        rows = []
+        savepoint = db.begin_nested()
+        try:
+            db.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": str(CHECK_TIMEOUT_MS)})
+            rows = db.execute(check.sql, {"limit": ISSUES_PER_CHECK + 1, "national_currency": NATIONAL_CURRENCY}).mappings().all()
+            savepoint.commit()
+        except DBAPIError as e:
+            savepoint.rollback()
+            status = "timeout" if _is_timeout(e) else "failed"
+            logger.warning(f"Integrity check {check.name} {status}: {e}")
+        issues += [check.issue(row) for row in rows[:ISSUES_PER_CHECK]]
+        checks.append({
+            "name": check.name,
+            "status": status,
+            "duration_ms": int((time.perf_counter() - check_started) * 1000),
+            "issue_count": min(len(rows), ISSUES_PER_CHECK),
+            "truncated": len(rows) > ISSUES_PER_CHECK,
+        })
+
+    db.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": previous_timeout})
+    issues.sort(key=lambda issue: SEVERITY_ORDER[issue["severity"]])
+
+    run = DictionaryIntegrityRun(
+        dictionary_type=dictionary_type,
+        trigger=trigger,
+        started_at=started_at,
+        finished_at=datetime.utcnow(),
+        duration_ms=int((time.perf_counter() - started) * 1000),
+        issue_count=len(issues),
+        issues=issues,
+        checks=checks
+    )
+    db.add(run)
+    db.flush()
+    db.execute(text(
+        "DELETE FROM dictionary_integrity_runs WHERE dictionary_type = :dictionary_type AND id NOT IN "
+        "(SELECT id FROM dictionary_integrity_runs WHERE dictionary_type = :dictionary_type "
+        "ORDER BY started_at DESC LIMIT :kept)"
+    ), {"dictionary_type": dictionary_type, "kept": RUNS_KEPT})
+    invalidate_on_commit(db, INTEGRITY_NAMESPACE)
+    return run
+
+
+def run_scheduled_integrity_checks(db: Session) -> None:
+    """Периодическая задача: прогон проверок всех справочников"""
+    for dictionary_type in INTEGRITY_CHECKS:
+        run_integrity_checks(db, dictionary_type, TRIGGER_SCHEDULED)
+
+
+def run_to_dict(run: DictionaryIntegrityRun) -> Dict[str, Any]:
+    return {
+        "run_id": run.id,
+        "dictionary_type": run.dictionary_type,
+        "trigger": run.trigger,
+        "checked_at": run.finished_at,
+        "duration_ms": run.duration_ms,
+        "issues": run.issues,
+        "total": run.issue_count,
+        "checks": run.checks,
+    }
+
+
+def get_latest_run(db: Session, dictionary_type: str) -> Optional[Dict[str, Any]]:
+    """Последний прогон справочника (из кэша) или None, если проверки еще не запускались"""
+    def load():
+        run = db.query(DictionaryIntegrityRun).filter(
+            DictionaryIntegrityRun.dictionary_type == dictionary_type
+        ).order_by(DictionaryIntegrityRun.started_at.desc()).first()
+        return run_to_dict(run) if run else None
+
+    return cache.get_or_set(INTEGRITY_NAMESPACE, dictionary_type, INTEGRITY_TTL_SECONDS, load)
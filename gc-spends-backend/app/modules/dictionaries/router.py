@@ -1,76 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, case, tuple_
 from app.core.db import get_db
-from app.models import Counterparty, Currency, VatRate, ExpenseArticle
+from app.models import Counterparty, VatRate, ExpenseArticle, ImportJob
 from .schemas import (
-    CounterpartyOut, CurrencyOut, VatRateOut, ExpenseArticleOut,
+    CounterpartyOut, CounterpartySuggestOut, CurrencyOut, VatRateOut, ExpenseArticleOut,
     CounterpartyCreate, CounterpartyUpdate,
     ExpenseArticleCreate, ExpenseArticleUpdate,
     VatRateCreate, VatRateUpdate,
     BulkCreateRequest, BulkUpdateRequest, BulkDeleteRequest,
-    BulkOperationResponse, ImportResponse
+    BulkOperationResponse, ImportResponse, ImportJobOut
 )
 from .file_processor import FileProcessor
+from .bulk_loader import bulk_load, DICTIONARY_TABLES, IMPORT_MODES, MODE_SKIP
+from .import_jobs import prepare_import_job, submit_import_job, mark_for_resume
+from app.core.security import get_current_user_id
+from app.core.dictionary_snapshot import snapshots
+from app.core.statistics import filtered_counts, collect_counts
+from app.core.audit_log import ACTION_CREATE
+from starlette.concurrency import run_in_threadpool
+import base64
 import uuid
+from datetime import datetime, timedelta
 from typing import List, Optional
 import json
 
 router = APIRouter(prefix="/dictionaries", tags=["dictionaries"])
 
+# Триграммный индекс помогает только запросам от трех символов
+TRIGRAM_MIN_LENGTH = 3
+
+# Запись считается недавно обновленной в течение этого срока
+RECENTLY_UPDATED_DAYS = 7
+
+def _dictionary_statistics(db: Session, model) -> dict:
+    """Всего, активных и недавно обновленных записей справочника - одним запросом"""
+    week_ago = datetime.now() - timedelta(days=RECENTLY_UPDATED_DAYS)
+    counts = collect_counts(db, filtered_counts(model, {
+        "total": None,
+        "active": model.is_active == True,
+        "recently_updated": model.updated_at >= week_ago,
+    }))
+    return {
+        "totalItems": counts["total"],
+        "activeItems": counts["active"],
+        "inactiveItems": counts["total"] - counts["active"],
+        "recentlyUpdated": counts["recently_updated"]
+    }
+
+def _json_response(content: bytes) -> Response:
+    """Готовый JSON из снимка справочника отдается без повторной сериализации"""
+    return Response(content=content, media_type="application/json")
+
 # ============================================================================
 # COUNTERPARTIES ENDPOINTS
 # ============================================================================
 
 @router.get("/counterparties/statistics")
-async def get_counterparties_statistics(db: Session = Depends(get_db)):
+def get_counterparties_statistics(db: Session = Depends(get_db)):
     """Получение статистики по контрагентам"""
-    from datetime import datetime, timedelta
-    
-    total_items = db.query(Counterparty).count()
-    active_items = db.query(Counterparty).filter(Counterparty.is_active == True).count()
-    inactive_items = total_items - active_items
-    
-    # Недавно обновленные (за последние 7 дней)
-    week_ago = datetime.now() - timedelta(days=7)
-    recently_updated = db.query(Counterparty).filter(
-        Counterparty.updated_at >= week_ago
-    ).count()
-    
-    return {
-        "totalItems": total_items,
-        "activeItems": active_items,
-        "inactiveItems": inactive_items,
-        "recentlyUpdated": recently_updated
-    }
+    return _dictionary_statistics(db, Counterparty)
+
+def _encode_counterparty_cursor(name: str, counterparty_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([name, str(counterparty_id)]).encode()).decode()
+
+def _decode_counterparty_cursor(cursor: str):
+    try:
+        name, counterparty_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), uuid.UUID(counterparty_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор")
+
+def _like_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _counterparty_search_filter(search: str):
+    """
+    Условие поиска контрагента.
+    
+    Цифры - это БИН/ИИН: точное совпадение или префикс по btree-индексу
+    (плюс подстрока в названии). Остальной текст ищется как подстрока в названии
+    и БИН/ИИН; оба условия обслуживаются триграммными GIN-индексами.
+    """
+    search = search.strip()
+    if search.isdigit():
+        return or_(
+            Counterparty.tax_id.like(f"{search}%"),
+            Counterparty.name.ilike(f"%{search}%")
+        )
+    return or_(
+        Counterparty.name.ilike(f"%{search}%"),
+        Counterparty.tax_id.ilike(f"%{search}%")
+    )
 
 @router.get("/counterparties", response_model=List[CounterpartyOut])
 def get_counterparties(
+    response: Response,
     active_only: bool = True,
     search: Optional[str] = None,
     category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Размер страницы; без него возвращается весь список"),
+    cursor: Optional[str] = Query(None, description="Заголовок X-Next-Cursor предыдущей страницы"),
     db: Session = Depends(get_db)
 ):
-    """Получение списка контрагентов с возможностью фильтрации"""
+    """
+    Получение списка контрагентов с возможностью фильтрации.
+    
+    С limit список отдается страницами по ключу (name, id): курсор следующей
+    страницы возвращается в заголовке X-Next-Cursor, на последней странице его нет.
+    """
     query = db.query(Counterparty)
     
     if active_only:
         query = query.filter(Counterparty.is_active == True)
     
-    if search:
-        query = query.filter(
-            or_(
-                Counterparty.name.ilike(f"%{search}%"),
-                Counterparty.tax_id.ilike(f"%{search}%")
-            )
-        )
+    if search and search.strip():
+        query = query.filter(_counterparty_search_filter(search))
     
     if category:
         query = query.filter(Counterparty.category == category)
     
-    counterparties = query.order_by(Counterparty.name).all()
+    if cursor:
+        cursor_name, cursor_id = _decode_counterparty_cursor(cursor)
+        query = query.filter(tuple_(Counterparty.name, Counterparty.id) > tuple_(cursor_name, cursor_id))
+    
+    query = query.order_by(Counterparty.name, Counterparty.id)
+    if limit is None:
+        counterparties = query.all()
+    else:
+        counterparties = query.limit(limit + 1).all()
+        if len(counterparties) > limit:
+            counterparties = counterparties[:limit]
+            last = counterparties[-1]
+            response.headers["X-Next-Cursor"] = _encode_counterparty_cursor(last.name, last.id)
     return [CounterpartyOut.model_validate(cp.__dict__) for cp in counterparties]
 
+@router.get("/counterparties/suggest", response_model=List[CounterpartySuggestOut])
+def suggest_counterparties(
+    q: str = Query(..., min_length=1, max_length=255, description="Начало названия или БИН/ИИН"),
+    limit: int = Query(10, ge=1, le=50),
+    active_only: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Автодополнение контрагентов: только id, название и БИН/ИИН.
+    
+    Цифры ищутся как префикс БИН/ИИН (точное совпадение первым). Текст короче
+    трех символов ищется как начало названия, длиннее - как подстрока по
+    триграммному индексу; совпадения с начала названия идут первыми.
+    """
+    q = q.strip()
+    if not q:
+        return []
+    query = db.query(Counterparty.id, Counterparty.name, Counterparty.tax_id)
+    if active_only:
+        query = query.filter(Counterparty.is_active == True)
+    
+    if q.isdigit():
+        query = query.filter(Counterparty.tax_id.like(f"{q}%")).order_by(
+            Counterparty.tax_id != q, Counterparty.tax_id, Counterparty.id
+        )
+    else:
+        name_prefix = func.lower(Counterparty.name).like(f"{_like_escape(q.lower())}%")
+        if len(q) < TRIGRAM_MIN_LENGTH:
+            query = query.filter(name_prefix).order_by(Counterparty.name, Counterparty.id)
+        else:
+            query = query.filter(Counterparty.name.ilike(f"%{_like_escape(q)}%")).order_by(
+                case((name_prefix, 0), else_=1),
+                func.similarity(Counterparty.name, q).desc(),
+                Counterparty.name,
+                Counterparty.id
+            )
+    
+    return [CounterpartySuggestOut.model_validate(row) for row in query.limit(limit).all()]
+
 @router.get("/counterparties/{counterparty_id}", response_model=CounterpartyOut)
 def get_counterparty(counterparty_id: uuid.UUID, db: Session = Depends(get_db)):
     """Получение контрагента по ID"""
@@ -161,76 +264,16 @@ def delete_counterparty(counterparty_id: uuid.UUID, db: Session = Depends(get_db
 @router.post("/counterparties/bulk", response_model=BulkOperationResponse)
 def bulk_create_counterparties(request: BulkCreateRequest, db: Session = Depends(get_db)):
     """Массовое создание контрагентов"""
-    success_count = 0
-    error_count = 0
-    errors = []
-    created_items = []
-    
-    for index, item_data in enumerate(request.items):
-        try:
-            # Валидация данных
-            counterparty_data = CounterpartyCreate(**item_data)
-            
-            # Проверка на дубликат
-            existing = db.query(Counterparty).filter(Counterparty.name == counterparty_data.name).first()
-            if existing:
-                errors.append({
-                    "index": index,
-                    "item": item_data,
-                    "error": "Контрагент с таким названием уже существует"
-                })
-                error_count += 1
-                continue
-            
-            # Создание контрагента
-            new_counterparty = Counterparty(**counterparty_data.dict())
-            db.add(new_counterparty)
-            db.commit()
-            db.refresh(new_counterparty)
-            
-            created_items.append(CounterpartyOut.model_validate(new_counterparty.__dict__).dict())
-            success_count += 1
-            
-        except Exception as e:
-            errors.append({
-                "index": index,
-                "item": item_data,
-                "error": str(e)
-            })
-            error_count += 1
-    
-    return BulkOperationResponse(
-        success_count=success_count,
-        error_count=error_count,
-        errors=errors,
-        created_items=created_items
-    )
+    return _bulk_create(db, 'counterparties', request.items, CounterpartyCreate, CounterpartyOut)
 
 # ============================================================================
 # EXPENSE ARTICLES ENDPOINTS
 # ============================================================================
 
 @router.get("/expense-articles/statistics")
-async def get_expense_articles_statistics(db: Session = Depends(get_db)):
+def get_expense_articles_statistics(db: Session = Depends(get_db)):
     """Получение статистики по статьям расходов"""
-    from datetime import datetime, timedelta
-    
-    total_items = db.query(ExpenseArticle).count()
-    active_items = db.query(ExpenseArticle).filter(ExpenseArticle.is_active == True).count()
-    inactive_items = total_items - active_items
-    
-    # Недавно обновленные (за последние 7 дней)
-    week_ago = datetime.now() - timedelta(days=7)
-    recently_updated = db.query(ExpenseArticle).filter(
-        ExpenseArticle.updated_at >= week_ago
-    ).count()
-    
-    return {
-        "totalItems": total_items,
-        "activeItems": active_items,
-        "inactiveItems": inactive_items,
-        "recentlyUpdated": recently_updated
-    }
+    return _dictionary_statistics(db, ExpenseArticle)
 
 @router.get("/expense-articles", response_model=List[ExpenseArticleOut])
 def get_expense_articles(
@@ -238,30 +281,24 @@ def get_expense_articles(
     search: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Получение списка статей расходов с возможностью фильтрации"""
-    query = db.query(ExpenseArticle)
-    
-    if active_only:
-        query = query.filter(ExpenseArticle.is_active == True)
+    """Получение списка статей расходов с возможностью фильтрации (из снимка справочника)"""
+    snapshot = snapshots.get(db, "expense-articles")
+    if not search:
+        return _json_response(snapshot.json(active_only))
     
-    if search:
-        query = query.filter(
-            or_(
-                ExpenseArticle.name.ilike(f"%{search}%"),
-                ExpenseArticle.code.ilike(f"%{search}%")
-            )
-        )
-    
-    articles = query.order_by(ExpenseArticle.name).all()
-    return [ExpenseArticleOut.model_validate(art.__dict__) for art in articles]
+    needle = search.lower()
+    return _json_response(snapshot.dump_json([
+        article for article in snapshot.rows(active_only)
+        if needle in article.name.lower() or needle in article.code.lower()
+    ]))
 
 @router.get("/expense-articles/{article_id}", response_model=ExpenseArticleOut)
 def get_expense_article(article_id: uuid.UUID, db: Session = Depends(get_db)):
     """Получение статьи расходов по ID"""
-    article = db.query(ExpenseArticle).filter(ExpenseArticle.id == article_id).first()
+    article = snapshots.get(db, "expense-articles").by_id.get(article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Статья расходов не найдена")
-    return ExpenseArticleOut.model_validate(article.__dict__)
+    return article
 
 @router.post("/expense-articles", response_model=ExpenseArticleOut, status_code=201)
 def create_expense_article(article: ExpenseArticleCreate, db: Session = Depends(get_db)):
@@ -325,76 +362,16 @@ def delete_expense_article(article_id: uuid.UUID, db: Session = Depends(get_db))
 @router.post("/expense-articles/bulk", response_model=BulkOperationResponse)
 def bulk_create_expense_articles(request: BulkCreateRequest, db: Session = Depends(get_db)):
     """Массовое создание статей расходов"""
-    success_count = 0
-    error_count = 0
-    errors = []
-    created_items = []
-    
-    for index, item_data in enumerate(request.items):
-        try:
-            # Валидация данных
-            article_data = ExpenseArticleCreate(**item_data)
-            
-            # Проверка на дубликат
-            existing = db.query(ExpenseArticle).filter(ExpenseArticle.code == article_data.code).first()
-            if existing:
-                errors.append({
-                    "index": index,
-                    "item": item_data,
-                    "error": "Статья расходов с таким кодом уже существует"
-                })
-                error_count += 1
-                continue
-            
-            # Создание статьи расходов
-            new_article = ExpenseArticle(**article_data.dict())
-            db.add(new_article)
-            db.commit()
-            db.refresh(new_article)
-            
-            created_items.append(ExpenseArticleOut.model_validate(new_article.__dict__).dict())
-            success_count += 1
-            
-        except Exception as e:
-            errors.append({
-                "index": index,
-                "item": item_data,
-                "error": str(e)
-            })
-            error_count += 1
-    
-    return BulkOperationResponse(
-        success_count=success_count,
-        error_count=error_count,
-        errors=errors,
-        created_items=created_items
-    )
+    return _bulk_create(db, 'expense-articles', request.items, ExpenseArticleCreate, ExpenseArticleOut)
 
 # ============================================================================
 # VAT RATES ENDPOINTS
 # ============================================================================
 
 @router.get("/vat-rates/statistics")
-async def get_vat_rates_statistics(db: Session = Depends(get_db)):
+def get_vat_rates_statistics(db: Session = Depends(get_db)):
     """Получение статистики по ставкам НДС"""
-    from datetime import datetime, timedelta
-    
-    total_items = db.query(VatRate).count()
-    active_items = db.query(VatRate).filter(VatRate.is_active == True).count()
-    inactive_items = total_items - active_items
-    
-    # Недавно обновленные (за последние 7 дней)
-    week_ago = datetime.now() - timedelta(days=7)
-    recently_updated = db.query(VatRate).filter(
-        VatRate.updated_at >= week_ago
-    ).count()
-    
-    return {
-        "totalItems": total_items,
-        "activeItems": active_items,
-        "inactiveItems": inactive_items,
-        "recentlyUpdated": recently_updated
-    }
+    return _dictionary_statistics(db, VatRate)
 
 @router.get("/vat-rates", response_model=List[VatRateOut])
 def get_vat_rates(
@@ -402,25 +379,23 @@ def get_vat_rates(
     search: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Получение списка ставок НДС с возможностью фильтрации"""
-    query = db.query(VatRate)
-    
-    if active_only:
-        query = query.filter(VatRate.is_active == True)
+    """Получение списка ставок НДС с возможностью фильтрации (из снимка справочника)"""
+    snapshot = snapshots.get(db, "vat-rates")
+    if not search:
+        return _json_response(snapshot.json(active_only))
     
-    if search:
-        query = query.filter(VatRate.name.ilike(f"%{search}%"))
-    
-    vat_rates = query.order_by(VatRate.rate).all()
-    return [VatRateOut.model_validate(vr.__dict__) for vr in vat_rates]
+    needle = search.lower()
+    return _json_response(snapshot.dump_json([
+        vat_rate for vat_rate in snapshot.rows(active_only) if needle in vat_rate.name.lower()
+    ]))
 
 @router.get("/vat-rates/{vat_rate_id}", response_model=VatRateOut)
 def get_vat_rate(vat_rate_id: uuid.UUID, db: Session = Depends(get_db)):
     """Получение ставки НДС по ID"""
-    vat_rate = db.query(VatRate).filter(VatRate.id == vat_rate_id).first()
+    vat_rate = snapshots.get(db, "vat-rates").by_id.get(vat_rate_id)
     if not vat_rate:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ставка НДС не найдена")
-    return VatRateOut.model_validate(vat_rate.__dict__)
+    return vat_rate
 
 @router.post("/vat-rates", response_model=VatRateOut, status_code=201)
 def create_vat_rate(vat_rate: VatRateCreate, db: Session = Depends(get_db)):
@@ -488,16 +463,15 @@ def delete_vat_rate(vat_rate_id: uuid.UUID, db: Session = Depends(get_db)):
 @router.get("/currencies", response_model=List[CurrencyOut])
 def get_currencies(db: Session = Depends(get_db)):
     """Получение списка валют"""
-    currencies = db.query(Currency).order_by(Currency.code).all()
-    return [CurrencyOut.model_validate(curr.__dict__) for curr in currencies]
+    return _json_response(snapshots.get(db, "currencies").json())
 
 @router.get("/currencies/{currency_code}", response_model=CurrencyOut)
 def get_currency(currency_code: str, db: Session = Depends(get_db)):
     """Получение валюты по коду"""
-    currency = db.query(Currency).filter(Currency.code == currency_code).first()
+    currency = snapshots.get(db, "currencies").by_id.get(currency_code)
     if not currency:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Валюта не найдена")
-    return CurrencyOut.model_validate(currency.__dict__)
+    return currency
 
 # ============================================================================
 # PRIORITIES ENDPOINT (Static data)
@@ -520,98 +494,42 @@ def get_priorities():
 async def import_dictionary_data(
     dictionary_type: str,
     file: UploadFile = File(...),
+    mode: str = MODE_SKIP,
     db: Session = Depends(get_db)
 ):
-    """Импорт данных справочника из файла"""
+    """
+    Импорт данных справочника из файла.
+    
+    mode=skip пропускает записи, которые уже есть в справочнике (по названию
+    контрагента, коду статьи, значению ставки, коду валюты или дате и валюте
+    курса), mode=update обновляет их.
+    """
     # Валидация файла
     is_valid, error_message = await FileProcessor.validate_file(file)
     if not is_valid:
         raise HTTPException(status_code=400, detail=error_message)
+    if dictionary_type not in DICTIONARY_TABLES:
+        raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+    if mode not in IMPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"Неподдерживаемый режим импорта: {mode}")
     
-    # Обработка файла в зависимости от типа справочника
-    if dictionary_type == "counterparties":
-        processed_items, errors = await FileProcessor.process_counterparties_file(file)
-        
-        # Создание записей в базе данных
-        success_count = 0
-        for item in processed_items:
-            try:
-                # Проверка на дубликат
-                existing = db.query(Counterparty).filter(Counterparty.name == item['name']).first()
-                if existing:
-                    errors.append({
-                        "item": item,
-                        "error": "Контрагент с таким названием уже существует"
-                    })
-                    continue
-                
-                new_counterparty = Counterparty(**item)
-                db.add(new_counterparty)
-                success_count += 1
-            except Exception as e:
-                errors.append({
-                    "item": item,
-                    "error": str(e)
-                })
-        
-        db.commit()
-        
-    elif dictionary_type == "expense-articles":
-        processed_items, errors = await FileProcessor.process_expense_articles_file(file)
-        
-        # Создание записей в базе данных
-        success_count = 0
-        for item in processed_items:
-            try:
-                # Проверка на дубликат
-                existing = db.query(ExpenseArticle).filter(ExpenseArticle.code == item['code']).first()
-                if existing:
-                    errors.append({
-                        "item": item,
-                        "error": "Статья расходов с таким кодом уже существует"
-                    })
-                    continue
-                
-                new_article = ExpenseArticle(**item)
-                db.add(new_article)
-                success_count += 1
-            except Exception as e:
-                errors.append({
-                    "item": item,
-                    "error": str(e)
-                })
-        
-        db.commit()
-        
-    elif dictionary_type == "vat-rates":
-        processed_items, errors = await FileProcessor.process_vat_rates_file(file)
-        
-        # Создание записей в базе данных
-        success_count = 0
-        for item in processed_items:
-            try:
-                # Проверка на дубликат
-                existing = db.query(VatRate).filter(VatRate.rate == item['rate']).first()
-                if existing:
-                    errors.append({
-                        "item": item,
-                        "error": "Ставка НДС с таким значением уже существует"
-                    })
-                    continue
-                
-                new_vat_rate = VatRate(**item)
-                db.add(new_vat_rate)
-                success_count += 1
-            except Exception as e:
-                errors.append({
-                    "item": item,
-                    "error": str(e)
-                })
-        
+    # Обработка файла
+    valid, validation_errors = await FileProcessor.process_file(dictionary_type, file)
+    processed_items = FileProcessor.frame_to_items(valid)
+    errors = validation_errors.to_dict('records')
+    
+    # Создание записей в базе данных (в пуле потоков, чтобы не блокировать event loop)
+    def load():
+        result = bulk_load(db, dictionary_type, processed_items, mode)
         db.commit()
-        
-    else:
-        raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
+        return result
+    
+    result = await run_in_threadpool(load)
+    
+    duplicate_message = DICTIONARY_TABLES[dictionary_type]['duplicate_message']
+    errors += [{"item": processed_items[index], "error": duplicate_message} for index in result.conflicts]
+    errors += [{"item": processed_items[index], "error": message} for index, _, message in result.rejected]
+    success_count = len(result.inserted) + len(result.updated)
     
     return ImportResponse(
         success=success_count > 0,
@@ -620,71 +538,98 @@ async def import_dictionary_data(
         errors=errors
     )
 
+@router.post("/import/jobs", response_model=ImportJobOut, status_code=202)
+async def create_import_job(
+    dictionary_type: str,
+    file: UploadFile = File(...),
+    mode: str = MODE_SKIP,
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Фоновый импорт справочника из файла любого размера.
+    
+    Файл сохраняется на диск, обработка идет частями по import_chunk_rows строк
+    с коммитом каждой части; прогресс - GET /dictionaries/import/jobs/{job_id}.
+    """
+    job = await prepare_import_job(db, dictionary_type, mode, file, uuid.UUID(current_user_id))
+    submit_import_job(job.id)
+    return job
+
+@router.get("/import/jobs/{job_id}", response_model=ImportJobOut)
+def get_import_job(job_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Состояние и прогресс задачи импорта"""
+    job = db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача импорта не найдена")
+    return job
+
+@router.post("/import/jobs/{job_id}/resume", response_model=ImportJobOut)
+def resume_import_job(job_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Продолжение упавшей или прерванной задачи с последней сохраненной части"""
+    job = db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача импорта не найдена")
+    if not mark_for_resume(db, job_id):
+        raise HTTPException(status_code=409, detail=f"Задачу в статусе {job.status} нельзя продолжить")
+    
+    submit_import_job(job_id)
+    db.refresh(job)
+    return job
+
 @router.get("/export/{dictionary_type}")
-async def export_dictionary_data(
+def export_dictionary_data(
     dictionary_type: str,
     file_format: str = "csv",
-    active_only: bool = True,
-    db: Session = Depends(get_db)
+    active_only: bool = True
 ):
     """Экспорт данных справочника в файл"""
-    if dictionary_type == "counterparties":
-        query = db.query(Counterparty)
-        if active_only:
-            query = query.filter(Counterparty.is_active == True)
-        items = query.order_by(Counterparty.name).all()
-        data = [CounterpartyOut.model_validate(item.__dict__).dict() for item in items]
-        filename = "counterparties"
-        
-    elif dictionary_type == "expense-articles":
-        query = db.query(ExpenseArticle)
-        if active_only:
-            query = query.filter(ExpenseArticle.is_active == True)
-        items = query.order_by(ExpenseArticle.name).all()
-        data = [ExpenseArticleOut.model_validate(item.__dict__).dict() for item in items]
-        filename = "expense_articles"
-        
-    elif dictionary_type == "vat-rates":
-        query = db.query(VatRate)
-        if active_only:
-            query = query.filter(VatRate.is_active == True)
-        items = query.order_by(VatRate.rate).all()
-        data = [VatRateOut.model_validate(item.__dict__).dict() for item in items]
-        filename = "vat_rates"
-        
-    else:
-        raise HTTPException(status_code=400, detail=f"Неподдерживаемый тип справочника: {dictionary_type}")
-    
-    # Генерация файла
-    if file_format.lower() == "csv":
-        file_content = FileProcessor.export_to_csv(data, filename)
-        media_type = "text/csv"
-        file_extension = "csv"
-    elif file_format.lower() in ["xlsx", "excel"]:
-        file_content = FileProcessor.export_to_excel(data, filename)
-        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        file_extension = "xlsx"
-    else:
-        raise HTTPException(status_code=400, detail="Неподдерживаемый формат файла")
-    
-    from fastapi.responses import Response
-    return Response(
-        content=file_content,
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}.{file_extension}"}
-    )
+    return FileProcessor.export_dictionary(dictionary_type, file_format, active_only)
 
 @router.get("/template/{dictionary_type}")
-async def get_import_template(dictionary_type: str):
+def get_import_template(dictionary_type: str, file_format: str = "xlsx"):
     """Получение шаблона для импорта"""
-    try:
-        file_content, filename = FileProcessor.get_import_template(dictionary_type)
-        
-        from fastapi.responses import Response
-        return Response(
-            content=file_content,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return FileProcessor.get_import_template(dictionary_type, file_format)
+
+def _bulk_create(db: Session, dictionary_type: str, items: List[dict], create_schema, out_schema) -> BulkOperationResponse:
+    """Проверка элементов схемой и их вставка одной пачкой; ошибки по индексу элемента"""
+    key = DICTIONARY_TABLES[dictionary_type]['key']
+    duplicate_message = DICTIONARY_TABLES[dictionary_type]['duplicate_message']
+    errors = []
+    valid_items = []
+    valid_indexes = []
+    seen_keys = set()
+    
+    for index, item_data in enumerate(items):
+        try:
+            data = create_schema(**item_data).dict()
+        except Exception as e:
+            errors.append({"index": index, "item": item_data, "error": str(e)})
+            continue
+        # Повтор внутри запроса считается дубликатом, как если бы первый уже был создан
+        item_key = tuple(data[column] for column in key)
+        if item_key in seen_keys:
+            errors.append({"index": index, "item": item_data, "error": duplicate_message})
+            continue
+        seen_keys.add(item_key)
+        valid_items.append(data)
+        valid_indexes.append(index)
+    
+    result = bulk_load(db, dictionary_type, valid_items, MODE_SKIP, audit_action=ACTION_CREATE)
+    db.commit()
+    
+    errors += [
+        {"index": valid_indexes[position], "item": items[valid_indexes[position]], "error": duplicate_message}
+        for position in result.conflicts
+    ] + [
+        {"index": valid_indexes[position], "item": items[valid_indexes[position]], "error": message}
+        for position, _, message in result.rejected
+    ]
+    errors.sort(key=lambda error: error["index"])
+    
+    return BulkOperationResponse(
+        success_count=len(result.inserted),
+        error_count=len(errors),
+        errors=errors,
+        created_items=[out_schema.model_validate(row).dict() for _, row in result.inserted]
+    )
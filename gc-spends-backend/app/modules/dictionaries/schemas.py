@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import uuid
 from datetime import datetime
 
@@ -97,6 +97,14 @@ class CounterpartyOut(BaseModel):
     class Config:
         from_attributes = True
 
+class CounterpartySuggestOut(BaseModel):
+    id: uuid.UUID
+    name: str
+    tax_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class CurrencyOut(BaseModel):
     code: str
     scale: int
@@ -159,6 +167,79 @@ class ImportResponse(BaseModel):
     errors: List[dict] = []
     warnings: List[dict] = []
 
+class ImportJobOut(BaseModel):
+    id: uuid.UUID
+    dictionary_type: str
+    mode: str
+    filename: str
+    status: str
+    total_rows: Optional[int] = None
+    processed_rows: int
+    imported_count: int
+    error_count: int
+    errors: List[dict] = []
+    last_chunk: int
+    error_message: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Audit schemas
+class AuditEntryOut(BaseModel):
+    id: uuid.UUID
+    action: str
+    item_id: str
+    item_name: Optional[str] = None
+    user_id: Optional[uuid.UUID] = None
+    user_name: str
+    timestamp: datetime
+    changes: Optional[Dict[str, Any]] = None
+
+class AuditHistoryOut(BaseModel):
+    entries: List[AuditEntryOut]
+    total: int
+    page: int
+    limit: int
+    total_pages: int
+    next_cursor: Optional[str] = None
+
+class AuditStatisticsOut(BaseModel):
+    total_actions: int
+    actions_by_type: Dict[str, int]
+    actions_by_user: Dict[str, int]
+    recent_activity: int
+    data_integrity_issues: int
+
+class IntegrityIssueOut(BaseModel):
+    id: str
+    type: str
+    severity: str
+    item_id: str
+    item_name: Optional[str] = None
+    description: str
+    suggestion: Optional[str] = None
+    affected_fields: List[str] = []
+    related_ids: List[str] = []
+
+class IntegrityCheckOut(BaseModel):
+    name: str
+    status: str
+    duration_ms: int
+    issue_count: int
+    truncated: bool
+
+class IntegrityReportOut(BaseModel):
+    issues: List[IntegrityIssueOut]
+    total: int
+    run_id: Optional[uuid.UUID] = None
+    trigger: Optional[str] = None
+    checked_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    checks: List[IntegrityCheckOut] = []
+
 # Error schemas
 class ValidationError(BaseModel):
     field: str
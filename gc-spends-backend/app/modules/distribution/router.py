@@ -1,104 +1,112 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, insert, select, literal, union_all
 from app.core.db import get_db
-from app.models import PaymentRequest, ExpenseSplit, Contract, Counterparty, ExpenseArticle, User, UserRole, Role, SubRegistrarAssignment, DistributorRequest, RegistrarAssignment
-from app.common.enums import RequestStatus, RoleCode
+from app.models import PaymentRequest, ExpenseSplit, Contract, Counterparty, ExpenseArticle, User, SubRegistrarAssignment, DistributorRequest, RegistrarAssignment, RequestEvent
+from app.common.enums import RequestStatus, DistributionStatus, SubRegistrarAssignmentStatus
+from app.core.cache import cache, invalidate_on_commit, watch_model
+from app.core.directory import users_with_role, has_role, current_user_has_role
+from app.core.priority import PriorityCalculationService, PRIORITY_STATS_NAMESPACE
+from app.core.request_stream import EVENT_CREATED, build_assignment_notification, build_notification, publish_request_changes
 from app.modules.users.schemas import UserOut
 from app.core.security import get_current_user
 from . import schemas
 import uuid
-from datetime import date, datetime
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/distribution", tags=["distribution"])
 
-@router.get("/contract-status/{counterparty_id}", response_model=schemas.ContractStatusOut)
-def get_contract_status(counterparty_id: uuid.UUID, db: Session = Depends(get_db)):
-    """Check if counterparty has an active contract for elevator or service provider categories"""
-    
-    # Get counterparty
-    counterparty = db.query(Counterparty).filter(Counterparty.id == counterparty_id).first()
-    if not counterparty:
-        raise HTTPException(status_code=404, detail="Counterparty not found")
-    
-    # Check if counterparty category requires contract check
-    if counterparty.category not in ["Элеватор", "Поставщик Услуг"]:
-        return schemas.ContractStatusOut(has_contract=False)
-    
-    # Look for active contract
-    contract = db.query(Contract).filter(
+# Counterparty categories whose requests need an active contract
+CONTRACT_CATEGORIES = ["Элеватор", "Поставщик Услуг"]
+CONTRACT_STATUS_NAMESPACE = "contract_status"
+CONTRACT_STATUS_TTL_SECONDS = 300
+
+watch_model(Contract, CONTRACT_STATUS_NAMESPACE)
+watch_model(Counterparty, CONTRACT_STATUS_NAMESPACE)
+
+def _load_contract_statuses(db: Session, counterparty_ids: List[uuid.UUID]) -> Dict[uuid.UUID, schemas.ContractStatusOut]:
+    """
+    Contract status of many counterparties with one query.
+
+    DISTINCT ON picks the most recent active contract per counterparty using the
+    (counterparty_id, is_active, contract_date) index. Unknown ids are left out.
+    """
+    rows = db.query(Counterparty.id, Counterparty.category, Contract).outerjoin(
+        Contract,
         and_(
-            Contract.counterparty_id == counterparty_id,
+            Contract.counterparty_id == Counterparty.id,
             Contract.is_active == True,
             Contract.contract_type.in_(["service", "supply"])
         )
-    ).first()
+    ).filter(
+        Counterparty.id.in_(counterparty_ids)
+    ).distinct(Counterparty.id).order_by(
+        Counterparty.id, Contract.contract_date.desc().nulls_last()
+    ).all()
     
-    if contract:
-        return schemas.ContractStatusOut(
-            has_contract=True,
-            contract_number=contract.contract_number,
-            contract_date=contract.contract_date,
-            contract_type=contract.contract_type,
-            validity_period=contract.validity_period,
-            rates=contract.rates,
-            contract_info=contract.contract_info,
-            contract_file_url=contract.contract_file_url
-        )
-    else:
-        return schemas.ContractStatusOut(has_contract=False)
+    statuses = {}
+    for counterparty_id, category, contract in rows:
+        # Check if counterparty category requires contract check
+        if contract is None or category not in CONTRACT_CATEGORIES:
+            statuses[counterparty_id] = schemas.ContractStatusOut(has_contract=False)
+        else:
+            statuses[counterparty_id] = schemas.ContractStatusOut(
+                has_contract=True,
+                contract_number=contract.contract_number,
+                contract_date=contract.contract_date,
+                contract_type=contract.contract_type,
+                validity_period=contract.validity_period,
+                rates=contract.rates,
+                contract_info=contract.contract_info,
+                contract_file_url=contract.contract_file_url
+            )
+    return statuses
+
+def get_contract_statuses(db: Session, counterparty_ids: List[uuid.UUID]) -> Dict[uuid.UUID, schemas.ContractStatusOut]:
+    """Cached contract status per counterparty, invalidated when contracts or counterparties change"""
+    return cache.get_many_or_set(
+        CONTRACT_STATUS_NAMESPACE,
+        counterparty_ids,
+        CONTRACT_STATUS_TTL_SECONDS,
+        lambda missing: _load_contract_statuses(db, missing)
+    )
+
+@router.get("/contract-status/{counterparty_id}", response_model=schemas.ContractStatusOut)
+def get_contract_status(counterparty_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Check if counterparty has an active contract for elevator or service provider categories"""
+    contract_status = get_contract_statuses(db, [counterparty_id]).get(counterparty_id)
+    if contract_status is None:
+        raise HTTPException(status_code=404, detail="Counterparty not found")
+    return contract_status
+
+@router.post("/contract-status", response_model=schemas.ContractStatusBatchOut)
+def get_contract_status_batch(payload: schemas.ContractStatusBatchRequest, db: Session = Depends(get_db)):
+    """Contract status of many counterparties in one call, e.g. for all counterparties of a classification form"""
+    statuses = get_contract_statuses(db, payload.counterparty_ids)
+    return schemas.ContractStatusBatchOut(
+        statuses=statuses,
+        not_found=[counterparty_id for counterparty_id in dict.fromkeys(payload.counterparty_ids) if counterparty_id not in statuses]
+    )
 
 @router.get("/sub-registrars", response_model=List[UserOut])
 def get_sub_registrars(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserOut = Depends(get_current_user)
 ):
     """Get all users with SUB_REGISTRAR role"""
     
-    # Check if current user has REGISTRAR or ADMIN role
-    user_roles = db.query(UserRole).filter(
-        and_(
-            UserRole.user_id == current_user.id,
-            UserRole.valid_from <= date.today(),
-            UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-        )
-    ).all()
-    
-    user_role_codes = []
-    for user_role in user_roles:
-        role = db.query(Role).filter(Role.id == user_role.role_id).first()
-        if role:
-            user_role_codes.append(role.code)
-    
     # Only allow REGISTRAR and ADMIN roles to access sub-registrars list
-    if not any(role_code in ["REGISTRAR", "ADMIN"] for role_code in user_role_codes):
+    if not current_user_has_role(current_user, "REGISTRAR", "ADMIN"):
         raise HTTPException(
             status_code=403,
             detail="Access denied. REGISTRAR or ADMIN role required."
         )
     
-    # Get SUB_REGISTRAR role
-    sub_registrar_role = db.query(Role).filter(Role.code == "SUB_REGISTRAR").first()
-    if not sub_registrar_role:
-        return []
-    
-    # Get users with SUB_REGISTRAR role
-    sub_registrar_user_roles = db.query(UserRole).filter(
-        and_(
-            UserRole.role_id == sub_registrar_role.id,
-            UserRole.valid_from <= date.today(),
-            UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-        )
-    ).all()
-    
-    user_ids = [ur.user_id for ur in sub_registrar_user_roles]
-    users = db.query(User).filter(User.id.in_(user_ids)).all()
-    
-    return [UserOut.model_validate(user.__dict__) for user in users]
+    return users_with_role(db, "SUB_REGISTRAR")
 
 @router.post("/classify", response_model=schemas.DistributionOut)
 def classify_request(payload: schemas.DistributionCreate, db: Session = Depends(get_db)):
@@ -124,21 +132,11 @@ def classify_request(payload: schemas.DistributionCreate, db: Session = Depends(
         raise HTTPException(status_code=404, detail="Responsible registrar not found")
     
     # Check if user has REGISTRAR role
-    registrar_role = db.query(Role).filter(Role.code == RoleCode.REGISTRAR.value).first()
-    if registrar_role:
-        user_role = db.query(UserRole).filter(
-            and_(
-                UserRole.user_id == payload.responsible_registrar_id,
-                UserRole.role_id == registrar_role.id,
-                UserRole.valid_from <= date.today(),
-                UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-            )
-        ).first()
-        if not user_role:
-            raise HTTPException(
-                status_code=400, 
-                detail="User does not have REGISTRAR role"
-            )
+    if not has_role(db, payload.responsible_registrar_id, "REGISTRAR"):
+        raise HTTPException(
+            status_code=400, 
+            detail="User does not have REGISTRAR role"
+        )
     
     # Validate expense splits
     total_amount = sum(split.amount for split in payload.expense_splits)
@@ -263,7 +261,7 @@ def get_pending_requests(
 ):
     """Get requests pending distribution"""
     # Verify user has REGISTRAR role
-    if not any(role.role.code == "REGISTRAR" for role in current_user.user_roles):
+    if not current_user_has_role(current_user, "REGISTRAR"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. REGISTRAR role required."
@@ -289,21 +287,11 @@ def send_requests_parallel(
 ):
     """Send requests to both SUB_REGISTRAR and DISTRIBUTOR in parallel"""
     # Verify user has REGISTRAR role
-    registrar_role = db.query(Role).filter(Role.code == RoleCode.REGISTRAR.value).first()
-    if registrar_role:
-        user_role = db.query(UserRole).filter(
-            and_(
-                UserRole.user_id == current_user.id,
-                UserRole.role_id == registrar_role.id,
-                UserRole.valid_from <= date.today(),
-                UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-            )
-        ).first()
-        if not user_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied. REGISTRAR role required."
-            )
+    if not current_user_has_role(current_user, "REGISTRAR"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. REGISTRAR role required."
+        )
     
     # Check if this is a split request
     is_split_request = payload.original_request_id is not None
@@ -472,6 +460,192 @@ def send_requests_parallel(
             detail=f"Failed to distribute request: {str(e)}"
         )
 
+@router.post("/send-requests/batch", response_model=schemas.BatchParallelDistributionOut)
+def send_requests_batch(
+    payload: schemas.BatchParallelDistributionCreate,
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Send many requests to SUB_REGISTRAR and DISTRIBUTOR in one call.
+
+    Every item is validated on its own and invalid items are reported in the
+    results; all valid items are applied together in one transaction.
+    """
+    # Verify user has REGISTRAR role
+    if not current_user_has_role(current_user, "REGISTRAR"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. REGISTRAR role required."
+        )
+    
+    items = payload.items
+    # Regular items distribute request_id itself; split items create request_id from original_request_id
+    source_ids = {item.original_request_id or item.request_id for item in items}
+    new_request_ids = {item.request_id for item in items if item.original_request_id}
+    requests = {
+        request.id: request
+        for request in db.query(PaymentRequest).filter(
+            PaymentRequest.id.in_(source_ids | new_request_ids)
+        ).with_for_update().all()
+    }
+    found = _find_existing_references(
+        db,
+        {item.sub_registrar_id for item in items} | {item.distributor_id for item in items},
+        {split.expense_item_id for item in items for split in item.expense_splits}
+    )
+    split_counts = _count_existing_splits(db, {item.original_request_id for item in items if item.original_request_id})
+    
+    rows = {"requests": [], "expense_splits": [], "sub_registrar_assignments": [], "distributor_requests": [], "events": []}
+    results = []
+    seen_request_ids = set()
+    for index, item in enumerate(items):
+        is_split_request = item.original_request_id is not None
+        source = requests.get(item.original_request_id or item.request_id)
+        if source is not None and source.deleted:
+            source = None
+        error = _batch_item_error(item, source, requests, found, seen_request_ids)
+        seen_request_ids.add(item.request_id)
+        if error:
+            results.append(schemas.BatchDistributionItemOut(index=index, request_id=item.request_id, status="failed", error=error))
+            continue
+        
+        total_amount = sum(split.amount for split in item.expense_splits)
+        if is_split_request:
+            split_counts[source.id] = split_counts.get(source.id, 0) + 1
+            split_number = split_counts[source.id]
+            rows["requests"].append({
+                "id": item.request_id,
+                "number": f"{source.number}-{split_number}",
+                "title": f"{source.title} (Часть {split_number})",
+                "amount_total": total_amount,
+                "currency_code": source.currency_code,
+                "counterparty_id": source.counterparty_id,
+                "created_by_user_id": source.created_by_user_id,
+                "status": RequestStatus.SUBMITTED.value,
+                "distribution_status": DistributionStatus.COMPLETED.value,
+                **_copied_request_fields(source)
+            })
+            rows["expense_splits"] += [{
+                "id": uuid.uuid4(),
+                "request_id": item.request_id,
+                "expense_item_id": split_data.expense_item_id,
+                "amount": split_data.amount,
+                "comment": split_data.comment,
+                "contract_id": split_data.contract_id,
+                "priority": split_data.priority
+            } for split_data in item.expense_splits]
+        else:
+            source.distribution_status = DistributionStatus.COMPLETED.value
+            source.status = RequestStatus.IN_REGISTER.value
+        
+        assignment_id = uuid.uuid4()
+        rows["sub_registrar_assignments"].append({
+            "id": assignment_id,
+            "request_id": item.request_id,
+            "sub_registrar_id": item.sub_registrar_id,
+            "status": SubRegistrarAssignmentStatus.ASSIGNED.value
+        })
+        distributor_request_ids = []
+        for split_data in item.expense_splits:
+            distributor_request_ids.append(uuid.uuid4())
+            rows["distributor_requests"].append({
+                "id": distributor_request_ids[-1],
+                "original_request_id": item.request_id,
+                "expense_article_id": split_data.expense_item_id,
+                "amount": split_data.amount,
+                "distributor_id": item.distributor_id,
+                "status": DistributionStatus.PENDING.value
+            })
+        rows["events"].append({
+            "id": uuid.uuid4(),
+            "request_id": item.request_id,
+            "event_type": "completed",
+            "actor_user_id": current_user.id,
+            "payload": f"Request distributed to sub-registrar and distributor. Total amount: {total_amount}"
+        })
+        results.append(schemas.BatchDistributionItemOut(
+            index=index,
+            request_id=item.request_id,
+            status="completed",
+            sub_registrar_assignment_id=assignment_id,
+            distributor_request_ids=distributor_request_ids,
+            total_amount=total_amount
+        ))
+    
+    try:
+        # Split requests first: the other rows reference them
+        for model, key in [
+            (PaymentRequest, "requests"),
+            (ExpenseSplit, "expense_splits"),
+            (SubRegistrarAssignment, "sub_registrar_assignments"),
+            (DistributorRequest, "distributor_requests"),
+            (RequestEvent, "events"),
+        ]:
+            if rows[key]:
+                db.execute(insert(model).values(rows[key]))
+        
+        # Bulk inserts bypass the ORM flush hooks: score, announce and invalidate explicitly
+        publish_request_changes(db, [
+            build_assignment_notification(row["request_id"], row["sub_registrar_id"])
+            for row in rows["sub_registrar_assignments"]
+        ])
+        if rows["requests"]:
+            PriorityCalculationService(db).recalculate_priorities(request_ids=[row["id"] for row in rows["requests"]])
+            publish_request_changes(db, [
+                build_notification(EVENT_CREATED, row["id"], row["number"], row["created_by_user_id"], None, row["status"])
+                for row in rows["requests"]
+            ])
+            invalidate_on_commit(db, PRIORITY_STATS_NAMESPACE)
+        
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to distribute requests: {str(e)}"
+        )
+    
+    succeeded = sum(1 for result in results if result.status == "completed")
+    return schemas.BatchParallelDistributionOut(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
+
+def _batch_item_error(item: schemas.ParallelDistributionCreate, source: Optional[PaymentRequest], requests: dict, found: dict, seen_request_ids: set) -> Optional[str]:
+    """Same checks as send_requests_parallel, against data loaded once for the whole batch"""
+    is_split_request = item.original_request_id is not None
+    if source is None:
+        return "Original request not found" if is_split_request else "Request not found"
+    if item.request_id in seen_request_ids:
+        return "Request appears more than once in the batch"
+    if is_split_request and item.request_id in requests:
+        return "Request with this ID already exists"
+    if source.status not in [RequestStatus.APPROVED.value, RequestStatus.CLASSIFIED.value]:
+        return "Request must be approved or registered to be distributed"
+    if item.sub_registrar_id not in found["users"]:
+        return "Sub-registrar not found"
+    if item.distributor_id not in found["users"]:
+        return "Distributor not found"
+    # For split requests, we don't validate against original request amount
+    total_amount = sum(split.amount for split in item.expense_splits)
+    if not is_split_request and abs(total_amount - float(source.amount_total)) > 0.01:
+        return f"Total split amount ({total_amount}) must equal request amount ({source.amount_total})"
+    if any(split.expense_item_id not in found["articles"] for split in item.expense_splits):
+        return "One or more expense items not found"
+    return None
+
+def _count_existing_splits(db: Session, original_ids: set) -> dict:
+    """Number of live "<number>-N" requests per original request"""
+    if not original_ids:
+        return {}
+    child = aliased(PaymentRequest)
+    rows = db.query(PaymentRequest.id, func.count(child.id)).outerjoin(
+        child, and_(child.deleted == False, child.number.like(PaymentRequest.number + "-%"))
+    ).filter(PaymentRequest.id.in_(original_ids)).group_by(PaymentRequest.id).all()
+    return {original_id: count for original_id, count in rows}
+
 @router.post("/split-request", response_model=schemas.SplitRequestOut)
 def split_request_by_articles(
     payload: schemas.SplitRequestCreate,
@@ -480,21 +654,11 @@ def split_request_by_articles(
 ):
     """Split request by expense articles - creates separate requests for each expense article"""
     # Verify user has REGISTRAR role
-    registrar_role = db.query(Role).filter(Role.code == RoleCode.REGISTRAR.value).first()
-    if registrar_role:
-        user_role = db.query(UserRole).filter(
-            and_(
-                UserRole.user_id == current_user.id,
-                UserRole.role_id == registrar_role.id,
-                UserRole.valid_from <= date.today(),
-                UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-            )
-        ).first()
-        if not user_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied. REGISTRAR role required."
-            )
+    if not current_user_has_role(current_user, "REGISTRAR"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. REGISTRAR role required."
+        )
     
     # Validate that we have at least 2 expense splits for splitting
     if len(payload.expense_splits) < 2:
@@ -503,8 +667,18 @@ def split_request_by_articles(
             detail="At least 2 expense articles are required for splitting a request"
         )
     
-    # Get original request
-    original_request = db.query(PaymentRequest).filter(and_(PaymentRequest.id == payload.original_request_id, PaymentRequest.deleted == False)).first()
+    # Every split needs a sub-registrar, either its own or the payload default
+    for i, split_data in enumerate(payload.expense_splits, 1):
+        if not (split_data.sub_registrar_id or payload.sub_registrar_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sub-registrar ID is required for expense split {i}"
+            )
+    
+    # Get original request (locked, so it cannot be split twice concurrently)
+    original_request = db.query(PaymentRequest).filter(
+        and_(PaymentRequest.id == payload.original_request_id, PaymentRequest.deleted == False)
+    ).with_for_update().first()
     if not original_request:
         raise HTTPException(status_code=404, detail="Original request not found")
     
@@ -515,30 +689,6 @@ def split_request_by_articles(
             detail="Original request must be approved, registered, or submitted to be split"
         )
     
-    # Validate sub-registrar exists and has correct role (only if provided)
-    if payload.sub_registrar_id:
-        sub_registrar = db.query(User).filter(User.id == payload.sub_registrar_id).first()
-        if not sub_registrar:
-            raise HTTPException(status_code=404, detail="Sub-registrar not found")
-    
-    # Validate distributor exists and has correct role
-    distributor = db.query(User).filter(User.id == payload.distributor_id).first()
-    if not distributor:
-        raise HTTPException(status_code=404, detail="Distributor not found")
-    
-    # Validate expense items exist
-    expense_item_ids = [split.expense_item_id for split in payload.expense_splits]
-    existing_items = db.query(ExpenseArticle).filter(ExpenseArticle.id.in_(expense_item_ids)).all()
-    if len(existing_items) != len(expense_item_ids):
-        raise HTTPException(status_code=400, detail="One or more expense items not found")
-    
-    # Validate individual sub-registrar assignments in expense splits
-    sub_registrar_ids = [split.sub_registrar_id for split in payload.expense_splits if split.sub_registrar_id]
-    if sub_registrar_ids:
-        existing_sub_registrars = db.query(User).filter(User.id.in_(sub_registrar_ids)).all()
-        if len(existing_sub_registrars) != len(sub_registrar_ids):
-            raise HTTPException(status_code=400, detail="One or more sub-registrars not found")
-    
     # Validate total amount matches original request
     total_amount = sum(split.amount for split in payload.expense_splits)
     if abs(total_amount - float(original_request.amount_total)) > 0.01:
@@ -547,163 +697,54 @@ def split_request_by_articles(
             detail=f"Total split amount ({total_amount}) must equal original request amount ({original_request.amount_total})"
         )
     
+    # Validate all referenced users and expense articles with a single query
+    sub_registrar_ids = {split.sub_registrar_id for split in payload.expense_splits if split.sub_registrar_id}
+    if payload.sub_registrar_id:
+        sub_registrar_ids.add(payload.sub_registrar_id)
+    expense_item_ids = {split.expense_item_id for split in payload.expense_splits}
+    found = _find_existing_references(db, sub_registrar_ids | {payload.distributor_id}, expense_item_ids)
+    
+    if payload.distributor_id not in found["users"]:
+        raise HTTPException(status_code=404, detail="Distributor not found")
+    if payload.sub_registrar_id and payload.sub_registrar_id not in found["users"]:
+        raise HTTPException(status_code=404, detail="Sub-registrar not found")
+    if not expense_item_ids <= found["articles"]:
+        raise HTTPException(status_code=400, detail="One or more expense items not found")
+    if not sub_registrar_ids <= found["users"]:
+        raise HTTPException(status_code=400, detail="One or more sub-registrars not found")
+    
     try:
         # Update original request status to indicate it's been split (but keep it active for tracking)
         original_request.status = RequestStatus.SPLITED.value
-        original_request.distribution_status = "completed"
-        
-        # Create split requests - one for each expense article
-        split_requests = []
-        for i, split_data in enumerate(payload.expense_splits, 1):
-            # Generate split request number
-            split_number = f"{original_request.number}-{i:02d}"
-            
-            # Create new payment request for this split
-            split_request = PaymentRequest(
-                id=uuid.uuid4(),
-                number=split_number,
-                title=f"{original_request.title} (Статья {i})",
-                amount_total=split_data.amount,
-                currency_code=original_request.currency_code,
-                counterparty_id=original_request.counterparty_id,
-                created_by_user_id=original_request.created_by_user_id,
-                status=RequestStatus.CLASSIFIED.value,
-                distribution_status="completed",
-                # Copy all informational fields from original request
-                due_date=original_request.due_date,
-                vat_total=original_request.vat_total,
-                expense_article_text=original_request.expense_article_text,
-                doc_number=original_request.doc_number,
-                doc_date=original_request.doc_date,
-                doc_type=original_request.doc_type,
-                paying_company=original_request.paying_company,
-                counterparty_category=original_request.counterparty_category,
-                vat_rate=original_request.vat_rate,
-                product_service=original_request.product_service,
-                volume=original_request.volume,
-                price_rate=original_request.price_rate,
-                period=original_request.period,
-                responsible_registrar_id=original_request.responsible_registrar_id,
-                # Split request specific fields
-                original_request_id=original_request.id,
-                split_sequence=i,
-                is_split_request=True,
-                deleted=False  # New split requests are not deleted
-            )
-            db.add(split_request)
-            split_requests.append(split_request)
-        
-        # Flush to ensure all split requests are created
-        db.flush()
-        
-        # Create expense splits for each split request
-        for i, (split_request, split_data) in enumerate(zip(split_requests, payload.expense_splits)):
-            expense_split = ExpenseSplit(
-                request_id=split_request.id,
-                expense_item_id=split_data.expense_item_id,
-                amount=split_data.amount,
-                comment=split_data.comment,
-                contract_id=split_data.contract_id,
-                priority=split_data.priority
-            )
-            db.add(expense_split)
-        
-        # Create Registrar Assignments for each split request (NEW INTEGRATION)
-        registrar_assignments = []
-        for i, (split_request, split_data) in enumerate(zip(split_requests, payload.expense_splits)):
-            # Use individual sub_registrar_id from expense split, fallback to payload.sub_registrar_id
-            assigned_sub_registrar_id = split_data.sub_registrar_id or payload.sub_registrar_id
-            
-            # Debug logging
-            print(f"Split {i+1}: Individual ID: {split_data.sub_registrar_id}, Payload ID: {payload.sub_registrar_id}, Assigned: {assigned_sub_registrar_id}")
-            
-            # Ensure we have a valid sub-registrar ID
-            if not assigned_sub_registrar_id:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Sub-registrar ID is required for expense split {i+1}. Individual ID: {split_data.sub_registrar_id}, Payload ID: {payload.sub_registrar_id}"
-                )
-            
-            registrar_assignment = RegistrarAssignment(
-                request_id=split_request.id,
-                assigned_sub_registrar_id=assigned_sub_registrar_id,
-                expense_article_id=split_data.expense_item_id,
-                assigned_amount=split_data.amount,
-                registrar_comments=split_data.comment or f"Заявка {i+1} из {len(split_requests)} - разделена регистратором",
-                registrar_id=current_user.id
-            )
-            db.add(registrar_assignment)
-            registrar_assignments.append(registrar_assignment)
+        original_request.distribution_status = DistributionStatus.COMPLETED.value
         
-        # Create sub-registrar assignments for each split request
-        sub_registrar_assignments = []
-        for i, (split_request, split_data) in enumerate(zip(split_requests, payload.expense_splits)):
-            # Use individual sub_registrar_id from expense split, fallback to payload.sub_registrar_id
-            assigned_sub_registrar_id = split_data.sub_registrar_id or payload.sub_registrar_id
-            
-            # Debug logging
-            print(f"Sub-registrar assignment {i+1}: Individual ID: {split_data.sub_registrar_id}, Payload ID: {payload.sub_registrar_id}, Assigned: {assigned_sub_registrar_id}")
-            
-            # Ensure we have a valid sub-registrar ID
-            if not assigned_sub_registrar_id:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Sub-registrar ID is required for expense split. Individual ID: {split_data.sub_registrar_id}, Payload ID: {payload.sub_registrar_id}"
-                )
-            
-            assignment = SubRegistrarAssignment(
-                request_id=split_request.id,
-                sub_registrar_id=assigned_sub_registrar_id,
-                status="assigned"
-            )
-            db.add(assignment)
-            sub_registrar_assignments.append(assignment)
+        plan = _build_split_plan(original_request, payload, current_user.id, total_amount)
         
-        # Create distributor requests for each split request
-        distributor_requests = []
-        for split_request, split_data in zip(split_requests, payload.expense_splits):
-            distributor_request = DistributorRequest(
-                original_request_id=split_request.id,
-                expense_article_id=split_data.expense_item_id,
-                amount=split_data.amount,
-                distributor_id=payload.distributor_id,
-                status="PENDING"
-            )
-            db.add(distributor_request)
-            distributor_requests.append(distributor_request)
-        
-        # Original request status already updated above (marked as split)
-        
-        # Create request events for original request and each split
-        from app.models import RequestEvent
-        
-        # Event for original request
-        original_event = RequestEvent(
-            request_id=original_request.id,
-            event_type="SPLIT_INTO_MULTIPLE",
-            actor_user_id=current_user.id,
-            payload=f"Request split into {len(split_requests)} separate requests. Total amount: {total_amount}"
-        )
-        db.add(original_event)
+        split_request_ids = db.execute(
+            insert(PaymentRequest).values(plan["requests"]).returning(PaymentRequest.id)
+        ).scalars().all()
+        db.execute(insert(ExpenseSplit).values(plan["expense_splits"]))
+        db.execute(insert(RegistrarAssignment).values(plan["registrar_assignments"]))
+        db.execute(insert(SubRegistrarAssignment).values(plan["sub_registrar_assignments"]))
+        db.execute(insert(DistributorRequest).values(plan["distributor_requests"]))
+        db.execute(insert(RequestEvent).values(plan["events"]))
         
-        # Events for each split request
-        for i, split_request in enumerate(split_requests, 1):
-            split_event = RequestEvent(
-                request_id=split_request.id,
-                event_type="CREATED_FROM_SPLIT",
-                actor_user_id=current_user.id,
-                payload=f"Split request created from original request {original_request.number}. Article {i}, Amount: {split_request.amount_total}, Status: CLASSIFIED"
-            )
-            db.add(split_event)
+        # Bulk inserts bypass the ORM flush hooks: score, announce and invalidate explicitly
+        PriorityCalculationService(db).recalculate_priorities(request_ids=split_request_ids)
+        publish_request_changes(db, [
+            build_assignment_notification(row["request_id"], row["sub_registrar_id"])
+            for row in plan["sub_registrar_assignments"]
+        ] + [
+            build_notification(EVENT_CREATED, row["id"], row["number"], row["created_by_user_id"], None, row["status"])
+            for row in plan["requests"]
+        ])
+        invalidate_on_commit(db, PRIORITY_STATS_NAMESPACE)
         
         db.commit()
         
-        # Extract IDs after commit
-        split_request_ids = [sr.id for sr in split_requests]
-        
         return schemas.SplitRequestOut(
             original_request_id=original_request.id,
-            split_requests=split_request_ids,
+            split_requests=[row["id"] for row in plan["requests"]],
             total_amount=total_amount,
             status="completed"
         )
@@ -715,6 +756,122 @@ def split_request_by_articles(
             detail=f"Failed to split request: {str(e)}"
         )
 
+def _find_existing_references(db: Session, user_ids: set, article_ids: set) -> dict:
+    """Look up which of the given users and expense articles exist, in one round trip"""
+    parts = []
+    if user_ids:
+        parts.append(select(literal("user").label("kind"), User.id.label("id")).where(User.id.in_(user_ids)))
+    if article_ids:
+        parts.append(select(literal("article").label("kind"), ExpenseArticle.id.label("id")).where(ExpenseArticle.id.in_(article_ids)))
+    found = {"users": set(), "articles": set()}
+    if not parts:
+        return found
+    for kind, found_id in db.execute(union_all(*parts)):
+        found["users" if kind == "user" else "articles"].add(found_id)
+    return found
+
+def _copied_request_fields(original_request: PaymentRequest) -> dict:
+    """Informational fields a split request inherits from its original request"""
+    return {
+        "due_date": original_request.due_date,
+        "vat_total": original_request.vat_total,
+        "expense_article_text": original_request.expense_article_text,
+        "doc_number": original_request.doc_number,
+        "doc_date": original_request.doc_date,
+        "doc_type": original_request.doc_type,
+        "paying_company": original_request.paying_company,
+        "counterparty_category": original_request.counterparty_category,
+        "vat_rate": original_request.vat_rate,
+        "product_service": original_request.product_service,
+        "volume": original_request.volume,
+        "price_rate": original_request.price_rate,
+        "period": original_request.period,
+        "responsible_registrar_id": original_request.responsible_registrar_id,
+    }
+
+def _build_split_plan(original_request: PaymentRequest, payload: schemas.SplitRequestCreate, registrar_id: uuid.UUID, total_amount: float) -> dict:
+    """Rows to insert for a validated split, one entry per expense split in every list"""
+    split_count = len(payload.expense_splits)
+    plan = {
+        "requests": [],
+        "expense_splits": [],
+        "registrar_assignments": [],
+        "sub_registrar_assignments": [],
+        "distributor_requests": [],
+        "events": [{
+            "id": uuid.uuid4(),
+            "request_id": original_request.id,
+            "event_type": "SPLIT_INTO_MULTIPLE",
+            "actor_user_id": registrar_id,
+            "payload": f"Request split into {split_count} separate requests. Total amount: {total_amount}"
+        }],
+    }
+    
+    for i, split_data in enumerate(payload.expense_splits, 1):
+        split_request_id = uuid.uuid4()
+        # Use individual sub_registrar_id from expense split, fallback to payload.sub_registrar_id
+        assigned_sub_registrar_id = split_data.sub_registrar_id or payload.sub_registrar_id
+        
+        plan["requests"].append({
+            "id": split_request_id,
+            "number": f"{original_request.number}-{i:02d}",
+            "title": f"{original_request.title} (Статья {i})",
+            "amount_total": split_data.amount,
+            "currency_code": original_request.currency_code,
+            "counterparty_id": original_request.counterparty_id,
+            "created_by_user_id": original_request.created_by_user_id,
+            "status": RequestStatus.CLASSIFIED.value,
+            "distribution_status": DistributionStatus.COMPLETED.value,
+            # Copy all informational fields from original request
+            **_copied_request_fields(original_request),
+            # Split request specific fields
+            "original_request_id": original_request.id,
+            "split_sequence": i,
+            "is_split_request": True,
+            "deleted": False
+        })
+        plan["expense_splits"].append({
+            "id": uuid.uuid4(),
+            "request_id": split_request_id,
+            "expense_item_id": split_data.expense_item_id,
+            "amount": split_data.amount,
+            "comment": split_data.comment,
+            "contract_id": split_data.contract_id,
+            "priority": split_data.priority
+        })
+        plan["registrar_assignments"].append({
+            "id": uuid.uuid4(),
+            "request_id": split_request_id,
+            "assigned_sub_registrar_id": assigned_sub_registrar_id,
+            "expense_article_id": split_data.expense_item_id,
+            "assigned_amount": split_data.amount,
+            "registrar_comments": split_data.comment or f"Заявка {i} из {split_count} - разделена регистратором",
+            "registrar_id": registrar_id
+        })
+        plan["sub_registrar_assignments"].append({
+            "id": uuid.uuid4(),
+            "request_id": split_request_id,
+            "sub_registrar_id": assigned_sub_registrar_id,
+            "status": SubRegistrarAssignmentStatus.ASSIGNED.value
+        })
+        plan["distributor_requests"].append({
+            "id": uuid.uuid4(),
+            "original_request_id": split_request_id,
+            "expense_article_id": split_data.expense_item_id,
+            "amount": split_data.amount,
+            "distributor_id": payload.distributor_id,
+            "status": DistributionStatus.PENDING.value
+        })
+        plan["events"].append({
+            "id": uuid.uuid4(),
+            "request_id": split_request_id,
+            "event_type": "CREATED_FROM_SPLIT",
+            "actor_user_id": registrar_id,
+            "payload": f"Split request created from original request {original_request.number}. Article {i}, Amount: {split_data.amount}, Status: CLASSIFIED"
+        })
+    
+    return plan
+
 @router.get("/split-requests/{original_request_id}", response_model=List[schemas.PendingRequestOut])
 def get_split_requests(
     original_request_id: uuid.UUID,
@@ -723,21 +880,11 @@ def get_split_requests(
 ):
     """Get all split requests for an original request"""
     # Verify user has REGISTRAR role
-    registrar_role = db.query(Role).filter(Role.code == RoleCode.REGISTRAR.value).first()
-    if registrar_role:
-        user_role = db.query(UserRole).filter(
-            and_(
-                UserRole.user_id == current_user.id,
-                UserRole.role_id == registrar_role.id,
-                UserRole.valid_from <= date.today(),
-                UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-            )
-        ).first()
-        if not user_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied. REGISTRAR role required."
-            )
+    if not current_user_has_role(current_user, "REGISTRAR"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. REGISTRAR role required."
+        )
     
     # Get all split requests for the original request (only non-deleted)
     split_requests = db.query(PaymentRequest).filter(
@@ -777,21 +924,11 @@ def distribute_request(
         )
     
     # Check if user has DISTRIBUTOR role
-    distributor_role = db.query(Role).filter(Role.code == RoleCode.DISTRIBUTOR.value).first()
-    if distributor_role:
-        user_role = db.query(UserRole).filter(
-            and_(
-                UserRole.user_id == current_user.id,
-                UserRole.role_id == distributor_role.id,
-                UserRole.valid_from <= date.today(),
-                UserRole.valid_to.is_(None) | (UserRole.valid_to >= date.today())
-            )
-        ).first()
-        if not user_role:
-            raise HTTPException(
-                status_code=400,
-                detail="User does not have DISTRIBUTOR role"
-            )
+    if not current_user_has_role(current_user, "DISTRIBUTOR"):
+        raise HTTPException(
+            status_code=400,
+            detail="User does not have DISTRIBUTOR role"
+        )
     
     # Update request status to distributed
     request.status = RequestStatus.DISTRIBUTED.value
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 import uuid
 from datetime import date
 
@@ -48,6 +48,13 @@ class ContractStatusOut(BaseModel):
     contract_info: Optional[str] = None
     contract_file_url: Optional[str] = None
 
+class ContractStatusBatchRequest(BaseModel):
+    counterparty_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=500)
+
+class ContractStatusBatchOut(BaseModel):
+    statuses: Dict[uuid.UUID, ContractStatusOut]
+    not_found: List[uuid.UUID]
+
 # Return Request Schema
 class ReturnRequestCreate(BaseModel):
     request_id: uuid.UUID
@@ -74,6 +81,23 @@ class ParallelDistributionOut(BaseModel):
     total_amount: float
     status: str
 
+class BatchParallelDistributionCreate(BaseModel):
+    items: List[ParallelDistributionCreate] = Field(..., min_length=1, max_length=500)
+
+class BatchDistributionItemOut(BaseModel):
+    index: int  # Position of the item in the request payload
+    request_id: uuid.UUID
+    status: str  # "completed" or "failed"
+    sub_registrar_assignment_id: Optional[uuid.UUID] = None
+    distributor_request_ids: List[uuid.UUID] = []
+    total_amount: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchParallelDistributionOut(BaseModel):
+    results: List[BatchDistributionItemOut]
+    succeeded: int
+    failed: int
+
 # Split Request Schemas
 class SplitRequestCreate(BaseModel):
     original_request_id: uuid.UUID
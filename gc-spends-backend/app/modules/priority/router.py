@@ -2,12 +2,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
+import uuid
+import time
 from app.core.db import get_db
-from app.core.priority import PriorityCalculationService, create_default_priority_rules
+from app.core.priority import PriorityCalculationService, create_default_priority_rules, invalidate_priority_rules
 from app.models import PaymentRequest, PaymentPriorityRule, PaymentPriority
 from app.core.security import get_current_user
 from app.models import User
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/priority", tags=["priority"])
 
@@ -25,6 +28,18 @@ class PriorityRuleUpdate(BaseModel):
     conditions: Optional[dict] = None
     is_active: Optional[bool] = None
 
+class PriorityRecalculateRequest(BaseModel):
+    statuses: Optional[List[str]] = None
+    currency_codes: Optional[List[str]] = None
+    request_ids: Optional[List[uuid.UUID]] = None
+    due_date_from: Optional[date] = None
+    due_date_to: Optional[date] = None
+
+class PrioritySimulateRequest(PriorityRecalculateRequest):
+    rules: List[PriorityRuleCreate] = Field(min_length=1)
+    include_active: bool = False  # Evaluate the draft rules together with the active ones
+    max_changes: int = Field(1000, ge=0, le=10000)
+
 @router.post("/rules")
 async def create_priority_rule(
     rule_data: PriorityRuleCreate,
@@ -46,6 +61,7 @@ async def create_priority_rule(
     db.add(rule)
     db.commit()
     db.refresh(rule)
+    invalidate_priority_rules()
     
     return {
         "id": str(rule.id),
@@ -57,6 +73,37 @@ async def create_priority_rule(
         "created_at": rule.created_at
     }
 
+@router.post("/rules/simulate")
+def simulate_priority_rules(
+    simulation: PrioritySimulateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    What-if evaluation of draft priority rules.
+    
+    Scores the filtered requests with the draft rules in chunks, without saving
+    anything, and returns the priority distribution before and after and the
+    requests whose priority or score would change.
+    """
+    started = time.perf_counter()
+    priority_service = PriorityCalculationService(db)
+    result = priority_service.simulate_rules(
+        [rule for rule in simulation.rules if rule.is_active],
+        include_active=simulation.include_active,
+        max_changes=simulation.max_changes,
+        statuses=simulation.statuses,
+        currency_codes=simulation.currency_codes,
+        request_ids=simulation.request_ids,
+        due_date_from=simulation.due_date_from,
+        due_date_to=simulation.due_date_to
+    )
+    
+    return {
+        **result,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
 @router.get("/rules")
 async def list_priority_rules(
     skip: int = Query(0, ge=0),
@@ -150,6 +197,7 @@ async def update_priority_rule(
     
     db.commit()
     db.refresh(rule)
+    invalidate_priority_rules()
     
     return {
         "id": str(rule.id),
@@ -177,6 +225,7 @@ async def delete_priority_rule(
     
     db.delete(rule)
     db.commit()
+    invalidate_priority_rules()
     
     return {"message": "Priority rule deleted successfully"}
 
@@ -209,20 +258,52 @@ async def calculate_request_priority(
         "previous_priority": request.priority
     }
 
+@router.post("/recalculate")
+def recalculate_priorities(
+    filters: PriorityRecalculateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Recalculate priorities for all requests matching the filters in one pass.
+    
+    Active rules are compiled once and requests are scored in bulk, so this is the
+    way to re-prioritise the backlog after a rule change.
+    """
+    started = time.perf_counter()
+    priority_service = PriorityCalculationService(db)
+    result = priority_service.recalculate_priorities(
+        statuses=filters.statuses,
+        currency_codes=filters.currency_codes,
+        request_ids=filters.request_ids,
+        due_date_from=filters.due_date_from,
+        due_date_to=filters.due_date_to
+    )
+    db.commit()
+    
+    return {
+        **result,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
 @router.get("/statistics")
 async def get_priority_statistics(
+    breakdown: bool = Query(False, description="Include counts and amounts per priority, status and currency"),
     db: Session = Depends(get_db)
 ):
     """
     Get priority statistics for payment requests.
     """
     priority_service = PriorityCalculationService(db)
-    stats = priority_service.get_priority_statistics()
+    stats = priority_service.get_priority_statistics(breakdown=breakdown)
     
-    return {
-        "priority_distribution": stats,
+    response = {
+        "priority_distribution": {key: value for key, value in stats.items() if key != "breakdown"},
         "escalation_rules": priority_service.get_priority_escalation_rules()
     }
+    if breakdown:
+        response["breakdown"] = stats["breakdown"]
+    return response
 
 @router.post("/initialize-defaults")
 async def initialize_default_priority_rules(
@@ -238,35 +319,36 @@ async def initialize_default_priority_rules(
 
 @router.get("/escalation-check")
 async def check_escalation_requirements(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
     """
     Check which payment requests require escalation.
-    """
-    priority_service = PriorityCalculationService(db)
     
-    # Get all payment requests that might need escalation
-    requests = db.query(PaymentRequest).filter(
-        PaymentRequest.deleted == False,
-        PaymentRequest.priority.in_([
-            PaymentPriority.HIGH,
-            PaymentPriority.URGENT,
-            PaymentPriority.CRITICAL
-        ])
-    ).all()
+    Returns only requests whose escalation deadline has passed, oldest first.
     
-    escalation_required = []
+    - **skip**: Number of records to skip
+    - **limit**: Maximum number of records to return
+    """
+    priority_service = PriorityCalculationService(db)
+    overdue = priority_service.get_overdue_escalations(skip=skip, limit=limit)
     
-    for request in requests:
-        if priority_service.should_escalate(request):
-            escalation_required.append({
-                "request_id": str(request.id),
-                "priority": request.priority,
-                "created_at": request.created_at,
-                "due_date": request.due_date
-            })
+    escalation_required = [
+        {
+            "request_id": str(request.id),
+            "priority": request.priority,
+            "created_at": request.created_at,
+            "due_date": request.due_date,
+            "escalation_due_at": request.escalation_due_at,
+            "escalated_at": request.escalated_at
+        }
+        for request in overdue["items"]
+    ]
     
     return {
         "escalation_required": escalation_required,
-        "count": len(escalation_required)
+        "count": overdue["total"],
+        "skip": skip,
+        "limit": limit
     }
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, select, union_all, literal_column, Float
 import uuid
-from datetime import date, datetime
+import json
+import base64
+import asyncio
+import time
+from datetime import date, datetime, timedelta
 from typing import List, Optional
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import get_db, SessionLocal
 from app.core.security import get_current_user_id
-from app.models import PaymentRequest, PaymentRequestLine, User, SubRegistrarAssignment
+from app.models import PaymentRequest, PaymentRequestLine, User, SubRegistrarAssignment, Counterparty
 from . import schemas
 from app.common.enums import RequestStatus
+from app.core.transitions import TRANSITIONS, apply_batch_transition
+from app.core.request_stream import EVENT_ASSIGNED, broker
+from app.core.dictionary_snapshot import snapshots
+from app.core.streaming_export import export_response, stream_query
+from app.core.request_counters import get_status_counts, SCOPE_ALL, SCOPE_CREATOR, SCOPE_SUB_REGISTRAR
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
@@ -147,62 +159,82 @@ def create_request(payload: schemas.RequestCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/statistics", response_model=schemas.RequestStatistics)
-def get_request_statistics(
-    role: Optional[str] = Query(None, description="Filter by role"),
-    user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
-    db: Session = Depends(get_db),
-    current_user_id: str = Depends(get_current_user_id)
-):
-    """Get request statistics based on role and user"""
-    query = db.query(PaymentRequest).filter(PaymentRequest.deleted == False)
-    
-    # Apply role-based filtering (handle both uppercase and lowercase)
+def _apply_role_filter(query, role: Optional[str], current_user_id: str):
+    """Restrict a PaymentRequest query to the requests a role works with"""
     if role in ["EXECUTOR", "executor"]:
         # For executor role, show only requests created by current user
         query = query.filter(PaymentRequest.created_by_user_id == uuid.UUID(current_user_id))
     elif role in ["REGISTRAR", "registrar"]:
-        # Registrar sees submitted, registered, approved, in_registry, and rejected requests
-        query = query.filter(PaymentRequest.status.in_([
-            RequestStatus.SUBMITTED.value, 
-            RequestStatus.CLASSIFIED.value,
-            RequestStatus.CLASSIFIED.value,
-            RequestStatus.IN_REGISTER.value,
-            RequestStatus.REJECTED.value
-        ]))
+        query = query.filter(PaymentRequest.status.in_([RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value]))
     elif role in ["SUB_REGISTRAR", "sub_registrar"]:
         # For sub-registrar role, only show requests assigned to this specific sub-registrar
         query = query.join(SubRegistrarAssignment, PaymentRequest.id == SubRegistrarAssignment.request_id)\
                     .filter(SubRegistrarAssignment.sub_registrar_id == uuid.UUID(current_user_id))\
-                    .filter(PaymentRequest.status.in_([RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value]))
+                    .filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
     elif role in ["DISTRIBUTOR", "distributor"]:
-        # Distributor sees approved requests
         query = query.filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
     elif role in ["TREASURER", "treasurer"]:
-        # Treasurer sees requests in registry
         query = query.filter(PaymentRequest.status == RequestStatus.IN_REGISTER.value)
-    
-    # Get all requests for statistics
-    all_requests = query.all()
+    return query
+
+def _statistics_scope(role: Optional[str], current_user_id: str):
+    """
+    Map a dashboard role to the request_status_counters scope it reads and the
+    statuses it is allowed to see (None means all statuses).
+    """
+    if role in ["EXECUTOR", "executor"]:
+        return SCOPE_CREATOR, uuid.UUID(current_user_id), None
+    if role in ["REGISTRAR", "registrar"]:
+        return SCOPE_ALL, None, {
+            RequestStatus.SUBMITTED.value,
+            RequestStatus.CLASSIFIED.value,
+            RequestStatus.IN_REGISTER.value,
+            RequestStatus.REJECTED.value
+        }
+    if role in ["SUB_REGISTRAR", "sub_registrar"]:
+        return SCOPE_SUB_REGISTRAR, uuid.UUID(current_user_id), {
+            RequestStatus.SUBMITTED.value,
+            RequestStatus.CLASSIFIED.value
+        }
+    if role in ["DISTRIBUTOR", "distributor"]:
+        return SCOPE_ALL, None, {RequestStatus.CLASSIFIED.value}
+    if role in ["TREASURER", "treasurer"]:
+        return SCOPE_ALL, None, {RequestStatus.IN_REGISTER.value}
+    return SCOPE_ALL, None, None
+
+@router.get("/statistics", response_model=schemas.RequestStatistics)
+def get_request_statistics(
+    role: Optional[str] = Query(None, description="Filter by role"),
+    user_id: Optional[uuid.UUID] = Query(None, description="Filter by user ID"),
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Get request statistics based on role and user"""
+    # Counts come from the request_status_counters materialized view, so the
+    # cost does not grow with the number of requests
+    scope, subject_id, visible_statuses = _statistics_scope(role, current_user_id)
+    counts = get_status_counts(db, scope, subject_id)
+    if visible_statuses is not None:
+        counts = {status: count for status, count in counts.items() if status in visible_statuses}
     
     # Calculate statistics
-    total_requests = len(all_requests)
-    draft = len([r for r in all_requests if r.status == RequestStatus.DRAFT.value])
-    submitted = len([r for r in all_requests if r.status == RequestStatus.SUBMITTED.value])
-    classified = len([r for r in all_requests if r.status == RequestStatus.CLASSIFIED.value])
-    approved = len([r for r in all_requests if r.status == RequestStatus.CLASSIFIED.value])
-    in_registry = len([r for r in all_requests if r.status == RequestStatus.IN_REGISTER.value])
-    to_pay = len([r for r in all_requests if r.status == RequestStatus.TO_PAY.value])
-    approved_for_payment = len([r for r in all_requests if r.status == RequestStatus.APPROVED_FOR_PAYMENT.value])
-    paid_full = len([r for r in all_requests if r.status == RequestStatus.PAID_FULL.value])
-    paid_partial = len([r for r in all_requests if r.status == RequestStatus.PAID_PARTIAL.value])
-    rejected = len([r for r in all_requests if r.status == RequestStatus.REJECTED.value])
-    returned = len([r for r in all_requests if r.status == RequestStatus.RETURNED.value])
-    cancelled = len([r for r in all_requests if r.status == RequestStatus.CANCELLED.value])
-    closed = len([r for r in all_requests if r.status == RequestStatus.CLOSED.value])
-    distributed = len([r for r in all_requests if r.status == RequestStatus.DISTRIBUTED.value])
-    report_published = len([r for r in all_requests if r.status == RequestStatus.REPORT_PUBLISHED.value])
-    export_linked = len([r for r in all_requests if r.status == RequestStatus.EXPORT_LINKED.value])
+    total_requests = sum(counts.values())
+    draft = counts.get(RequestStatus.DRAFT.value, 0)
+    submitted = counts.get(RequestStatus.SUBMITTED.value, 0)
+    classified = counts.get(RequestStatus.CLASSIFIED.value, 0)
+    approved = counts.get(RequestStatus.CLASSIFIED.value, 0)
+    in_registry = counts.get(RequestStatus.IN_REGISTER.value, 0)
+    to_pay = counts.get(RequestStatus.TO_PAY.value, 0)
+    approved_for_payment = counts.get(RequestStatus.APPROVED_FOR_PAYMENT.value, 0)
+    paid_full = counts.get(RequestStatus.PAID_FULL.value, 0)
+    paid_partial = counts.get(RequestStatus.PAID_PARTIAL.value, 0)
+    rejected = counts.get(RequestStatus.REJECTED.value, 0)
+    returned = counts.get(RequestStatus.RETURNED.value, 0)
+    cancelled = counts.get(RequestStatus.CANCELLED.value, 0)
+    closed = counts.get(RequestStatus.CLOSED.value, 0)
+    distributed = counts.get(RequestStatus.DISTRIBUTED.value, 0)
+    report_published = counts.get(RequestStatus.REPORT_PUBLISHED.value, 0)
+    export_linked = counts.get(RequestStatus.EXPORT_LINKED.value, 0)
     
     # Calculate overdue requests (submitted more than 5 hours ago)
     overdue = 0  # Simplified for now
@@ -286,20 +318,7 @@ def get_requests(
     query = db.query(PaymentRequest).filter(PaymentRequest.deleted == False)
     
     # Apply role-based filtering
-    if role in ["EXECUTOR", "executor"]:
-        # For executor role, show only requests created by current user
-        query = query.filter(PaymentRequest.created_by_user_id == uuid.UUID(current_user_id))
-    elif role in ["REGISTRAR", "registrar"]:
-        query = query.filter(PaymentRequest.status.in_([RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value]))
-    elif role in ["SUB_REGISTRAR", "sub_registrar"]:
-        # For sub-registrar role, only show requests assigned to this specific sub-registrar
-        query = query.join(SubRegistrarAssignment, PaymentRequest.id == SubRegistrarAssignment.request_id)\
-                    .filter(SubRegistrarAssignment.sub_registrar_id == uuid.UUID(current_user_id))\
-                    .filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
-    elif role in ["DISTRIBUTOR", "distributor"]:
-        query = query.filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
-    elif role in ["TREASURER", "treasurer"]:
-        query = query.filter(PaymentRequest.status == RequestStatus.IN_REGISTER.value)
+    query = _apply_role_filter(query, role, current_user_id)
     
     # Apply status filter
     if status:
@@ -345,6 +364,85 @@ def get_requests(
     
     return result
 
+# Columns of /requests/export: request fields, then its lines (one row per line)
+EXPORT_REQUEST_COLUMNS = [
+    ("number", PaymentRequest.number),
+    ("title", PaymentRequest.title),
+    ("status", PaymentRequest.status),
+    ("priority", PaymentRequest.priority),
+    ("counterparty", Counterparty.name),
+    ("counterparty_tax_id", Counterparty.tax_id),
+    ("currency_code", PaymentRequest.currency_code),
+    ("amount_total", PaymentRequest.amount_total),
+    ("vat_total", PaymentRequest.vat_total),
+    ("due_date", PaymentRequest.due_date),
+    ("expense_article_text", PaymentRequest.expense_article_text),
+    ("doc_number", PaymentRequest.doc_number),
+    ("doc_date", PaymentRequest.doc_date),
+    ("doc_type", PaymentRequest.doc_type),
+    ("paying_company", PaymentRequest.paying_company),
+    ("responsible_registrar_id", PaymentRequest.responsible_registrar_id),
+    ("created_at", PaymentRequest.created_at),
+    ("id", PaymentRequest.id),
+]
+EXPORT_LINE_COLUMNS = [
+    ("line_id", PaymentRequestLine.id),
+    ("line_article_id", PaymentRequestLine.article_id),
+    ("line_quantity", PaymentRequestLine.quantity),
+    ("line_amount_net", PaymentRequestLine.amount_net),
+    ("line_vat_rate_id", PaymentRequestLine.vat_rate_id),
+    ("line_currency_code", PaymentRequestLine.currency_code),
+    ("line_status", PaymentRequestLine.status),
+    ("line_note", PaymentRequestLine.note),
+]
+
+@router.get("/export")
+def export_requests(
+    format: str = Query("csv", description="Export format (csv, xlsx)"),
+    role: Optional[str] = Query(None, description="User role"),
+    status: Optional[str] = Query(None, description="Request status"),
+    responsible_registrar_id: Optional[uuid.UUID] = Query(None, description="Responsible registrar ID"),
+    created_from: Optional[date] = Query(None, description="Created on or after"),
+    created_to: Optional[date] = Query(None, description="Created on or before"),
+    include_lines: bool = Query(True, description="One row per request line"),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Export payment requests with the same filters as /requests/list.
+
+    Rows are read through a server-side cursor and written to the response as
+    they arrive, so memory use stays flat for any number of requests.
+    """
+    columns = EXPORT_REQUEST_COLUMNS + (EXPORT_LINE_COLUMNS if include_lines else [])
+    
+    def build_query(db: Session):
+        query = db.query(*[column for _, column in columns]).join(
+            Counterparty, Counterparty.id == PaymentRequest.counterparty_id
+        )
+        if include_lines:
+            query = query.outerjoin(PaymentRequestLine, PaymentRequestLine.request_id == PaymentRequest.id)
+        query = _apply_role_filter(query.filter(PaymentRequest.deleted == False), role, current_user_id)
+        if status:
+            query = query.filter(PaymentRequest.status == status)
+        if responsible_registrar_id:
+            query = query.filter(PaymentRequest.responsible_registrar_id == responsible_registrar_id)
+        if created_from:
+            query = query.filter(PaymentRequest.created_at >= created_from)
+        if created_to:
+            query = query.filter(PaymentRequest.created_at < created_to + timedelta(days=1))
+        order = [PaymentRequest.created_at.desc(), PaymentRequest.id]
+        if include_lines:
+            order.append(PaymentRequestLine.id)
+        return query.order_by(*order)
+    
+    return export_response(
+        [name for name, _ in columns],
+        stream_query(build_query),
+        format,
+        f"payment_requests_{datetime.now().strftime('%Y%m%d')}",
+        sheet_name="Requests"
+    )
+
 @router.get("/metrics/dashboard", response_model=schemas.DashboardMetrics)
 def get_dashboard_metrics(
     role: str = Query(..., description="User role"),
@@ -360,20 +458,7 @@ def get_dashboard_metrics(
     query = db.query(PaymentRequest).filter(PaymentRequest.deleted == False)
     
     # Apply role-based filtering for recent requests
-    if role in ["EXECUTOR", "executor"]:
-        # For executor role, show only requests created by current user
-        query = query.filter(PaymentRequest.created_by_user_id == uuid.UUID(current_user_id))
-    elif role in ["REGISTRAR", "registrar"]:
-        query = query.filter(PaymentRequest.status.in_([RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value]))
-    elif role in ["SUB_REGISTRAR", "sub_registrar"]:
-        # For sub-registrar role, only show requests assigned to this specific sub-registrar
-        query = query.join(SubRegistrarAssignment, PaymentRequest.id == SubRegistrarAssignment.request_id)\
-                    .filter(SubRegistrarAssignment.sub_registrar_id == uuid.UUID(current_user_id))\
-                    .filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
-    elif role in ["DISTRIBUTOR", "distributor"]:
-        query = query.filter(PaymentRequest.status == RequestStatus.CLASSIFIED.value)
-    elif role in ["TREASURER", "treasurer"]:
-        query = query.filter(PaymentRequest.status == RequestStatus.IN_REGISTER.value)
+    query = _apply_role_filter(query, role, current_user_id)
     
     recent_requests = query.order_by(PaymentRequest.number.desc()).limit(10).all()
     recent_requests_data = [schemas.RequestListOut.model_validate(req.__dict__) for req in recent_requests]
@@ -389,6 +474,234 @@ def get_dashboard_metrics(
         currency="KZT"  # Default currency
     )
 
+def _encode_search_cursor(rank: float, request_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, str(request_id)]).encode()).decode()
+
+def _decode_search_cursor(cursor: str):
+    try:
+        rank, request_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), uuid.UUID(request_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/search", response_model=schemas.RequestSearchOut)
+def search_requests(
+    q: str = Query(..., min_length=2, max_length=200, description="Search text"),
+    role: Optional[str] = Query(None, description="User role"),
+    status: Optional[str] = Query(None, description="Request status"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Search requests by title, number, document number, product/service and expense
+    article text (full-text, Russian + simple) and by counterparty name (trigram).
+    Results are ranked and paginated with a keyset cursor.
+    """
+    ts_query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), q).op("||")(
+        func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+    )
+    
+    # Both branches are index scans: GIN on search_vector, GIN trigram on counterparties.name
+    text_hits = select(
+        PaymentRequest.id.label("id"),
+        func.ts_rank_cd(PaymentRequest.search_vector, ts_query).label("rank")
+    ).where(PaymentRequest.search_vector.op("@@")(ts_query))
+    name_hits = select(
+        PaymentRequest.id.label("id"),
+        func.similarity(Counterparty.name, q).label("rank")
+    ).join(Counterparty, Counterparty.id == PaymentRequest.counterparty_id)\
+     .where(Counterparty.name.op("%")(q))
+    hits = union_all(text_hits, name_hits).subquery()
+    scored = select(
+        hits.c.id,
+        func.sum(hits.c.rank).cast(Float).label("rank")
+    ).group_by(hits.c.id).subquery()
+    
+    query = db.query(scored.c.id, scored.c.rank)\
+              .join(PaymentRequest, PaymentRequest.id == scored.c.id)\
+              .filter(PaymentRequest.deleted == False)
+    query = _apply_role_filter(query, role, current_user_id)
+    if status:
+        query = query.filter(PaymentRequest.status == status)
+    if cursor:
+        cursor_rank, cursor_id = _decode_search_cursor(cursor)
+        query = query.filter(or_(
+            scored.c.rank < cursor_rank,
+            and_(scored.c.rank == cursor_rank, scored.c.id < cursor_id)
+        ))
+    
+    page = query.order_by(scored.c.rank.desc(), scored.c.id.desc()).limit(limit + 1).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+    if not page:
+        return schemas.RequestSearchOut(items=[])
+    
+    # Snippets are only built for the rows of this page
+    headline = func.ts_headline(
+        literal_column("'russian'::regconfig"),
+        func.concat_ws(" ", PaymentRequest.title, PaymentRequest.number, PaymentRequest.doc_number,
+                       PaymentRequest.product_service, PaymentRequest.expense_article_text),
+        ts_query,
+        "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+    )
+    rows = db.query(PaymentRequest, Counterparty.name, headline)\
+             .outerjoin(Counterparty, Counterparty.id == PaymentRequest.counterparty_id)\
+             .filter(PaymentRequest.id.in_([row.id for row in page]))\
+             .all()
+    by_id = {req.id: (req, counterparty_name, snippet) for req, counterparty_name, snippet in rows}
+    
+    items = []
+    for row in page:
+        req, counterparty_name, snippet = by_id[row.id]
+        item = schemas.RequestListOut.model_validate(req, from_attributes=True).model_dump()
+        item.update(counterparty_name=counterparty_name, rank=row.rank, highlight=snippet)
+        items.append(schemas.RequestSearchHit(**item))
+    
+    last = page[-1]
+    return schemas.RequestSearchOut(
+        items=items,
+        next_cursor=_encode_search_cursor(last.rank, last.id) if has_more else None
+    )
+
+# How long a stream trusts its loaded sub-registrar assignments; assignment
+# notifications keep them current in between, the reload drops removed ones
+ASSIGNMENT_REFRESH_SECONDS = 60
+
+class _AssignedRequests:
+    """Ids of the requests assigned to a sub-registrar, kept in memory by one stream"""
+    
+    def __init__(self, sub_registrar_id: str):
+        self.sub_registrar_id = sub_registrar_id
+        self.request_ids: set = set()
+        self.loaded_at = 0.0
+    
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self.loaded_at > ASSIGNMENT_REFRESH_SECONDS
+    
+    def reload(self) -> None:
+        db = SessionLocal()
+        try:
+            self.request_ids = {
+                str(request_id) for request_id, in db.query(SubRegistrarAssignment.request_id).filter(
+                    SubRegistrarAssignment.sub_registrar_id == uuid.UUID(self.sub_registrar_id)
+                )
+            }
+        finally:
+            db.close()
+        self.loaded_at = time.monotonic()
+
+def _is_change_visible(
+    message: dict,
+    role: Optional[str],
+    current_user_id: str,
+    assigned: Optional[_AssignedRequests] = None
+) -> bool:
+    """
+    Check whether a request change notification belongs to the list the role sees
+    in get_requests. Both the old and the new status count, so clients also learn
+    about requests leaving their list. Assignment notifications only go to the
+    assigned sub-registrar.
+    """
+    if message.get("event") == EVENT_ASSIGNED:
+        return role in ["SUB_REGISTRAR", "sub_registrar"] and message.get("sub_registrar_id") == current_user_id
+    statuses = {message.get("status"), message.get("previous_status")}
+    if role in ["EXECUTOR", "executor"]:
+        return message.get("created_by_user_id") == current_user_id
+    elif role in ["REGISTRAR", "registrar"]:
+        return bool(statuses & {RequestStatus.SUBMITTED.value, RequestStatus.CLASSIFIED.value})
+    elif role in ["SUB_REGISTRAR", "sub_registrar"]:
+        return (
+            RequestStatus.CLASSIFIED.value in statuses
+            and assigned is not None
+            and message.get("request_id") in assigned.request_ids
+        )
+    elif role in ["DISTRIBUTOR", "distributor"]:
+        return RequestStatus.CLASSIFIED.value in statuses
+    elif role in ["TREASURER", "treasurer"]:
+        return RequestStatus.IN_REGISTER.value in statuses
+    return True
+
+@router.get("/stream")
+async def stream_request_changes(
+    request: Request,
+    role: Optional[str] = Query(None, description="User role"),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Server-sent events stream of new requests and status changes, filtered by role
+    like the request list. Replaces polling of the list and dashboard endpoints.
+    """
+    async def event_stream():
+        queue = broker.subscribe()
+        # Sub-registrars see only their assigned requests; the ids are checked in memory
+        assigned = _AssignedRequests(current_user_id) if role in ["SUB_REGISTRAR", "sub_registrar"] else None
+        try:
+            if assigned is not None:
+                await run_in_threadpool(assigned.reload)
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if assigned is not None:
+                    if message.get("event") == EVENT_ASSIGNED:
+                        if message.get("sub_registrar_id") == current_user_id:
+                            assigned.request_ids.add(message.get("request_id"))
+                    elif assigned.stale and RequestStatus.CLASSIFIED.value in {message.get("status"), message.get("previous_status")}:
+                        await run_in_threadpool(assigned.reload)
+                if not _is_change_visible(message, role, current_user_id, assigned):
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering the stream
+            "Content-Encoding": "identity"
+        }
+    )
+
+@router.post("/batch-transition", response_model=schemas.BatchTransitionOut)
+def batch_transition(
+    payload: schemas.BatchTransitionIn,
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """Apply one workflow action (approve, reject, add-to-registry, ...) to many requests in one call"""
+    if payload.action not in TRANSITIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid action. Must be one of: {', '.join(TRANSITIONS)}"
+        )
+    
+    results = apply_batch_transition(
+        db,
+        request_ids=payload.request_ids,
+        action=payload.action,
+        actor_user_id=uuid.UUID(current_user_id),
+        comment=payload.comment
+    )
+    db.commit()
+    
+    success_count = sum(1 for result in results if result["success"])
+    return schemas.BatchTransitionOut(
+        action=payload.action,
+        total=len(results),
+        success_count=success_count,
+        error_count=len(results) - success_count,
+        results=results
+    )
+
 @router.get("/{request_id}", response_model=schemas.RequestOut)
 def get_request(request_id: uuid.UUID, db: Session = Depends(get_db)):
     return _get_request_with_lines(request_id, db)
@@ -566,48 +879,58 @@ def classify_request(
             PaymentRequestLine.request_id == request_id
         ).delete()
         
+        # Use the specific user ID provided
+        registrar_user_id = uuid.UUID("8e1ff15d-79ea-48a6-ba30-59f64dcc9f6d")
+        
+        # Get or create a position for this user
+        from app.models import Position, Department
+        
+        # Department, position and VAT rate are the same for every split, so they
+        # are resolved once; departments and VAT rates come from the dictionary snapshots
+        departments = snapshots.get(db, "departments").items
+        default_department = departments[0] if departments else None
+        if not default_department:
+            # Create a default department
+            default_department = Department(
+                name="Default Department",
+                code="DEFAULT"
+            )
+            db.add(default_department)
+            db.flush()  # Flush to get the ID
+        
+        # Get or create a position for the registrar user
+        position = db.query(Position).filter(
+            Position.title == f"Position for User {registrar_user_id}"
+        ).first()
+        
+        if not position:
+            # Create a position for this user
+            position = Position(
+                department_id=default_department.id,
+                title=f"Position for User {registrar_user_id}",
+                description="Temporary position for classify request",
+                is_active=True
+            )
+            db.add(position)
+            db.flush()  # Flush to get the ID
+        
+        # Default VAT rate: the active rate equal to settings.default_vat_rate
+        default_vat_rate = next(
+            (
+                vat_rate for vat_rate in snapshots.get(db, "vat-rates").rows(active_only=True)
+                if abs(float(vat_rate.rate) - settings.default_vat_rate) < 1e-9
+            ),
+            None
+        )
+        if not default_vat_rate:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No active VAT rate {settings.default_vat_rate} available"
+            )
+        
         # Add new lines from expense splits
         total = 0
         for split in payload.expense_splits:
-            # Use the specific user ID provided
-            registrar_user_id = uuid.UUID("8e1ff15d-79ea-48a6-ba30-59f64dcc9f6d")
-            
-            # Get or create a position for this user
-            from app.models import Position, Department
-            from app.models import VatRate
-            
-            # First, get or create a default department
-            default_department = db.query(Department).first()
-            if not default_department:
-                # Create a default department
-                default_department = Department(
-                    name="Default Department",
-                    code="DEFAULT"
-                )
-                db.add(default_department)
-                db.flush()  # Flush to get the ID
-            
-            # Get or create a position for the registrar user
-            position = db.query(Position).filter(
-                Position.title == f"Position for User {registrar_user_id}"
-            ).first()
-            
-            if not position:
-                # Create a position for this user
-                position = Position(
-                    department_id=default_department.id,
-                    title=f"Position for User {registrar_user_id}",
-                    description="Temporary position for classify request",
-                    is_active=True
-                )
-                db.add(position)
-                db.flush()  # Flush to get the ID
-            
-            # Get default VAT rate
-            default_vat_rate = db.query(VatRate).filter(VatRate.is_active == True).first()
-            if not default_vat_rate:
-                raise HTTPException(status_code=400, detail="No VAT rates available")
-            
             db.add(PaymentRequestLine(
                 request_id=request_id,
                 article_id=split.article_id,
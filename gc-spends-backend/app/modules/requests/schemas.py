@@ -164,6 +164,34 @@ class RequestDistributorAction(BaseModel):
     allocations: List[dict] = []  # Payment allocations for approval
     priority: str | None = None
 
+class BatchTransitionIn(BaseModel):
+    request_ids: List[uuid.UUID] = Field(min_length=1, max_length=1000)
+    action: str  # see app.core.transitions.TRANSITIONS
+    comment: str | None = None
+
+class BatchTransitionResult(BaseModel):
+    request_id: uuid.UUID
+    success: bool
+    previous_status: str | None = None
+    status: str | None = None
+    error: str | None = None
+
+class BatchTransitionOut(BaseModel):
+    action: str
+    total: int
+    success_count: int
+    error_count: int
+    results: List[BatchTransitionResult]
+
+class RequestSearchHit(RequestListOut):
+    counterparty_name: str | None = None
+    rank: float
+    highlight: str | None = None  # Matched fragments wrapped in <mark></mark>
+
+class RequestSearchOut(BaseModel):
+    items: List[RequestSearchHit]
+    next_cursor: str | None = None  # Pass back as `cursor` to get the next page
+
 # Statistics schemas
 class ExpenseArticleInfo(BaseModel):
     id: str
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from app.core.db import get_db
+from app.core.dictionary_snapshot import snapshots
 from app.core.security import get_current_user, require_roles
 from app.models import Position, Department, User, UserPosition, Role, UserRole
 from . import schemas
@@ -17,12 +18,7 @@ router = APIRouter(prefix="/positions", tags=["positions"])
 @router.get("/departments", response_model=List[DepartmentOut])
 def list_departments(db: Session = Depends(get_db)):
     """Получить список всех департаментов"""
-    departments = db.query(Department).order_by(Department.name).all()
-    return [DepartmentOut(
-        id=dept.id,
-        name=dept.name,
-        code=dept.code
-    ) for dept in departments]
+    return Response(content=snapshots.get(db, "departments").json(), media_type="application/json")
 
 @router.post("/departments", response_model=DepartmentOut, status_code=201)
 def create_department(
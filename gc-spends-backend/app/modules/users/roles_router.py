@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.db import get_db
+from app.core.dictionary_snapshot import snapshots
 from app.core.security import get_current_user, require_roles
 from app.models import Role, UserRole
 from . import schemas
@@ -10,15 +11,14 @@ router = APIRouter(prefix="/roles", tags=["roles"])
 
 @router.get("", response_model=list[schemas.RoleOut])
 def list_roles(db: Session = Depends(get_db)):
-    roles = db.query(Role).order_by(Role.name).all()
-    return [schemas.RoleOut.model_validate(role.__dict__) for role in roles]
+    return Response(content=snapshots.get(db, "roles").json(), media_type="application/json")
 
 @router.get("/{role_id}", response_model=schemas.RoleOut)
 def get_role(role_id: uuid.UUID, db: Session = Depends(get_db)):
-    role = db.query(Role).filter(Role.id == role_id).first()
+    role = snapshots.get(db, "roles").by_id.get(role_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
-    return schemas.RoleOut.model_validate(role.__dict__)
+    return role
 
 @router.post("", response_model=schemas.RoleOut, status_code=201)
 def create_role(
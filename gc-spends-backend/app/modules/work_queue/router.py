@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.db import get_db
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.core.directory import current_user_has_role
+from app.core.work_queue import QUEUES, QUEUE_REGISTRAR, QUEUE_SUB_REGISTRAR, claim_next, get_claims, renew_claims, release_claims
+from app.modules.users.schemas import UserOut
+from . import schemas
+
+router = APIRouter(prefix="/work-queue", tags=["work-queue"])
+
+# Role required to pull from each queue
+QUEUE_ROLES = {
+    QUEUE_REGISTRAR: "REGISTRAR",
+    QUEUE_SUB_REGISTRAR: "SUB_REGISTRAR",
+}
+
+def _check_queue_access(queue: str, current_user: UserOut) -> None:
+    if queue not in QUEUES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown queue. Must be one of: {', '.join(QUEUES)}"
+        )
+    role_code = QUEUE_ROLES[queue]
+    if not current_user_has_role(current_user, role_code):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. {role_code} role required."
+        )
+
+@router.post("/{queue}/claim", response_model=schemas.WorkItemListOut)
+def claim_work_items(
+    queue: str,
+    limit: int = Query(10, ge=1, le=100, description="Number of requests to claim"),
+    lease_seconds: Optional[int] = Query(None, ge=30, le=86400, description="Lease duration"),
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Claim the next requests of a queue, highest priority score and earliest due date first.
+    
+    Claimed requests are hidden from other users until released or until the lease expires.
+    """
+    _check_queue_access(queue, current_user)
+    items = claim_next(
+        db, queue, current_user.id, limit,
+        lease_seconds or settings.work_queue_lease_seconds
+    )
+    db.commit()
+    return schemas.WorkItemListOut(queue=queue, items=items)
+
+@router.get("/{queue}/mine", response_model=schemas.WorkItemListOut)
+def get_my_work_items(
+    queue: str,
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """Get the requests of a queue currently claimed by the user"""
+    _check_queue_access(queue, current_user)
+    return schemas.WorkItemListOut(queue=queue, items=get_claims(db, queue, current_user.id))
+
+@router.post("/claims/renew", response_model=schemas.ClaimIdsOut)
+def renew_work_item_claims(
+    payload: schemas.ClaimIdsIn,
+    lease_seconds: Optional[int] = Query(None, ge=30, le=86400, description="Lease duration"),
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """Extend the lease of claims held by the user. Expired claims are not renewed."""
+    renewed = renew_claims(
+        db, payload.request_ids, current_user.id,
+        lease_seconds or settings.work_queue_lease_seconds
+    )
+    db.commit()
+    return schemas.ClaimIdsOut(request_ids=renewed, count=len(renewed))
+
+@router.post("/claims/release", response_model=schemas.ClaimIdsOut)
+def release_work_item_claims(
+    payload: schemas.ReleaseClaimsIn,
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """Return claimed requests to their queue"""
+    released = release_claims(db, payload.request_ids, current_user.id)
+    db.commit()
+    return schemas.ClaimIdsOut(request_ids=released, count=len(released))
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+import uuid
+
+class WorkItemOut(BaseModel):
+    id: uuid.UUID
+    number: str
+    title: str
+    status: str
+    amount_total: float
+    currency_code: str
+    counterparty_id: uuid.UUID
+    due_date: date
+    priority: str
+    priority_score: Optional[float] = None
+    claimed_by_user_id: Optional[uuid.UUID] = None
+    claim_expires_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class WorkItemListOut(BaseModel):
+    queue: str
+    items: List[WorkItemOut]
+
+class ClaimIdsIn(BaseModel):
+    request_ids: List[uuid.UUID] = Field(min_length=1, max_length=500)
+
+class ReleaseClaimsIn(BaseModel):
+    request_ids: Optional[List[uuid.UUID]] = None  # None releases all claims of the user
+
+class ClaimIdsOut(BaseModel):
+    request_ids: List[uuid.UUID]
+    count: int
@@ -0,0 +1,103 @@
+# tests/conftest.py
+import datetime
+import re
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.audit_log import audit_writer
+from app.core.cache import cache
+from app.core.db import engine, get_db
+from app.core.security import create_access_token
+from app.models import Counterparty, Currency, Role, User, UserRole
+
+SAVEPOINT_STATEMENT = re.compile(r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.IGNORECASE)
+
+@pytest.fixture(scope="session")
+def connection():
+    """A connection to settings.database_url (migrated with `alembic upgrade head`)."""
+    try:
+        conn = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not available: {e}")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def db(connection, monkeypatch):
+    """
+    Session inside a transaction that is rolled back after the test.
+
+    Commits made by the code under test only release a savepoint. Audit entries
+    are kept in memory instead of being written by the background writer.
+    """
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+    monkeypatch.setattr(audit_writer, "enqueue", lambda entries: None)
+    cache.clear()
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        cache.clear()
+
+
+@pytest.fixture
+def client(db, user):
+    """API client authenticated as `user`, sharing the test session."""
+    from app.main import api
+    
+    api.dependency_overrides[get_db] = lambda: db
+    test_client = TestClient(api)
+    test_client.headers["Authorization"] = f"Bearer {create_access_token(str(user.id))}"
+    yield test_client
+    api.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def statements():
+    """Records the SQL statements sent to the database while the test runs."""
+    executed = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Savepoints come from the `db` fixture, not from the code under test
+        if not SAVEPOINT_STATEMENT.match(statement):
+            executed.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def user(db):
+    user = User(full_name="Registrar", email=f"registrar-{uuid.uuid4().hex[:8]}@example.kz", password_hash="x")
+    db.add(user)
+    db.flush()
+    return user
+
+
+def grant_role(db: Session, user: User, code: str) -> None:
+    role = db.query(Role).filter(Role.code == code).first()
+    if role is None:
+        role = Role(code=code, name=code)
+        db.add(role)
+        db.flush()
+    db.add(UserRole(user_id=user.id, role_id=role.id, valid_from=datetime.date(2020, 1, 1)))
+    db.flush()
+
+
+@pytest.fixture
+def counterparty(db):
+    if db.get(Currency, "KZT") is None:
+        db.add(Currency(code="KZT", scale=2))
+    counterparty = Counterparty(name=f"ТОО Тест {uuid.uuid4().hex[:6]}", tax_id=uuid.uuid4().hex[:12], category="Элеватор")
+    db.add(counterparty)
+    db.flush()
+    return counterparty
@@ -0,0 +1,39 @@
+# tests/test_cache.py
+from app.core.cache import TTLCache
+
+
+def test_value_loaded_across_an_invalidation_is_not_stored():
+    cache = TTLCache()
+    
+    def loader():
+        # A writer commits while the reader is still loading
+        cache.invalidate("counters")
+        return "before write"
+    
+    assert cache.get_or_set("counters", "all", 60, loader) == "before write"
+    assert cache.get_or_set("counters", "all", 60, lambda: "after write") == "after write"
+    assert cache.get_or_set("counters", "all", 60, lambda: "reloaded") == "after write"
+
+
+def test_many_loaded_across_a_clear_are_not_stored():
+    cache = TTLCache()
+    
+    def loader(keys):
+        cache.clear()
+        return {key: "before write" for key in keys}
+    
+    assert cache.get_many_or_set("statuses", [1, 2], 60, loader) == {1: "before write", 2: "before write"}
+    assert cache.get_many_or_set("statuses", [1, 2], 60, lambda keys: {key: "after write" for key in keys}) == {
+        1: "after write", 2: "after write"
+    }
+
+
+def test_invalidating_another_namespace_keeps_the_value():
+    cache = TTLCache()
+    
+    def loader():
+        cache.invalidate("other")
+        return "value"
+    
+    cache.get_or_set("counters", "all", 60, loader)
+    assert cache.get_or_set("counters", "all", 60, lambda: "reloaded") == "value"
@@ -0,0 +1,68 @@
+# tests/test_priority_statistics.py
+import datetime
+import uuid
+
+from app.common.enums import PaymentPriority
+from app.core.priority import PriorityCalculationService
+from app.models import PaymentRequest
+
+
+def _requests(db, user, counterparty, priorities):
+    for i, priority in enumerate(priorities):
+        db.add(PaymentRequest(
+            number=f"REQ-{uuid.uuid4().hex[:8]}",
+            created_by_user_id=user.id,
+            counterparty_id=counterparty.id,
+            title=f"Оплата услуг {i}",
+            status="submitted",
+            currency_code="KZT",
+            amount_total=1000,
+            vat_total=0,
+            due_date=datetime.date.today() + datetime.timedelta(days=30),
+            priority=priority,
+        ))
+    db.flush()
+
+
+def _total(stats):
+    return sum(stats[priority.value]["count"] for priority in PaymentPriority)
+
+
+def test_statistics_use_a_single_statement(db, user, counterparty, statements):
+    service = PriorityCalculationService(db)
+    before = service.get_priority_statistics()
+    _requests(db, user, counterparty, [PaymentPriority.NORMAL] * 5)
+    # Flushing PaymentRequest changes does not drop the cache, committing does
+    db.commit()
+    
+    statements.clear()
+    stats = service.get_priority_statistics()
+    
+    assert len(statements) == 1
+    # Priority rules may re-score the new requests, so compare totals
+    assert _total(stats) == _total(before) + 5
+
+
+def test_statistics_breakdown_uses_a_single_statement(db, user, counterparty, statements):
+    _requests(db, user, counterparty, [PaymentPriority.HIGH, PaymentPriority.LOW, PaymentPriority.LOW])
+    
+    statements.clear()
+    stats = PriorityCalculationService(db).get_priority_statistics(breakdown=True)
+    
+    assert len(statements) == 1
+    assert sum(row["count"] for row in stats["breakdown"]) == _total(stats)
+
+
+def test_statistics_are_cached_until_requests_change(db, user, counterparty, statements):
+    service = PriorityCalculationService(db)
+    service.get_priority_statistics()
+    
+    statements.clear()
+    service.get_priority_statistics()
+    assert statements == []
+    
+    _requests(db, user, counterparty, [PaymentPriority.URGENT])
+    db.commit()
+    statements.clear()
+    service.get_priority_statistics()
+    assert len(statements) == 1
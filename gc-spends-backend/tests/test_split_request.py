@@ -0,0 +1,54 @@
+# tests/test_split_request.py
+import datetime
+import uuid
+
+import pytest
+
+from app.models import ExpenseArticle, PaymentRequest, User
+from tests.conftest import grant_role
+
+
+def _split(db, client, user, counterparty, statements, article_count):
+    sub_registrar = User(full_name="Sub-registrar", email=f"sub-{uuid.uuid4().hex[:8]}@example.kz", password_hash="x")
+    articles = [ExpenseArticle(code=f"T{uuid.uuid4().hex[:8]}", name=f"Статья {i}") for i in range(article_count)]
+    original = PaymentRequest(
+        number=f"REQ-{uuid.uuid4().hex[:8]}",
+        created_by_user_id=user.id,
+        counterparty_id=counterparty.id,
+        title="Оплата услуг элеватора",
+        status="classified",
+        currency_code="KZT",
+        amount_total=100 * article_count,
+        vat_total=0,
+        due_date=datetime.date.today() + datetime.timedelta(days=5),
+    )
+    db.add_all([sub_registrar, original, *articles])
+    db.flush()
+    payload = {
+        "original_request_id": str(original.id),
+        "distributor_id": str(user.id),
+        "expense_splits": [
+            {"expense_item_id": str(article.id), "amount": 100, "sub_registrar_id": str(sub_registrar.id)}
+            for article in articles
+        ],
+    }
+    
+    statements.clear()
+    response = client.post("/distribution/split-request", json=payload)
+    
+    assert response.status_code == 200, response.text
+    assert len(response.json()["split_requests"]) == article_count
+    return len(statements)
+
+
+@pytest.fixture
+def registrar(db, user):
+    grant_role(db, user, "REGISTRAR")
+    return user
+
+
+def test_split_statement_count_does_not_grow_with_articles(db, client, registrar, counterparty, statements):
+    few = _split(db, client, registrar, counterparty, statements, 5)
+    many = _split(db, client, registrar, counterparty, statements, 50)
+    
+    assert many == few